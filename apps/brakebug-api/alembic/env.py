@@ -9,7 +9,8 @@ from app.config import settings  # 👈 Importa a URL correta - acessa as variá
 config = context.config
 
 # Configura os loggers, se o arquivo de config estiver presente
-if config.config_file_name is not None:
+# (o bootstrap do app desativa para não sobrescrever o logging do uvicorn)
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # Importa a Base de dados
@@ -32,6 +33,18 @@ from app.assurelog.models.user import User
 # Define a metadata usada para geração automática
 target_metadata = Base.metadata
 
+from app.models.produto_busca import OBJETOS_BUSCA
+
+# Objetos criados fora do Base.metadata (bootstrap e busca textual FTS5/tsvector)
+OBJETOS_IGNORADOS = OBJETOS_BUSCA | {"schema_fingerprint"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Ignora no autogenerate os objetos que não pertencem aos modelos."""
+    if reflected and name and (name in OBJETOS_IGNORADOS or name.startswith("produtos_fts_")):
+        return False
+    return True
+
 
 def run_migrations_offline() -> None:
     """Executa as migrações no modo offline."""
@@ -39,6 +52,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -58,7 +72,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
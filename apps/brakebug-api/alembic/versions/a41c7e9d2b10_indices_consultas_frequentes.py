@@ -0,0 +1,55 @@
+"""indices_consultas_frequentes
+
+Revision ID: a41c7e9d2b10
+Revises: 16c705735e2e
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c7e9d2b10'
+down_revision: Union[str, None] = '16c705735e2e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Movimentações: filtros por produto/tipo ordenados por data e listagem das recentes
+    op.create_index('ix_movimentacoes_produto_id_data', 'movimentacoes', ['produto_id', sa.text('data DESC')], unique=False, if_not_exists=True)
+    op.create_index('ix_movimentacoes_tipo_data', 'movimentacoes', ['tipo', sa.text('data DESC')], unique=False, if_not_exists=True)
+    op.create_index('ix_movimentacoes_data', 'movimentacoes', [sa.text('data DESC')], unique=False, if_not_exists=True)
+
+    # Produtos: listagem por categoria e índice parcial do /baixo-estoque
+    op.create_index('ix_produtos_categoria_id_nome', 'produtos', ['categoria_id', 'nome'], unique=False, if_not_exists=True)
+    op.create_index(
+        'ix_produtos_estoque_baixo', 'produtos', ['id'], unique=False, if_not_exists=True,
+        postgresql_where=sa.text('quantidade < quantidade_minima'),
+        sqlite_where=sa.text('quantidade < quantidade_minima'),
+    )
+
+    # Vendas: itens e pagamentos buscados pela compra
+    op.create_index(op.f('ix_compra_itens_compra_id'), 'compra_itens', ['compra_id'], unique=False, if_not_exists=True)
+    op.create_index(op.f('ix_pagamentos_compra_id'), 'pagamentos', ['compra_id'], unique=False, if_not_exists=True)
+
+    # Assurelog: casos de teste por relatório e relatórios do usuário por data de criação
+    op.create_index(op.f('ix_test_cases_report_id'), 'test_cases', ['report_id'], unique=False, if_not_exists=True)
+    op.create_index('ix_reports_user_id_created_at', 'reports', ['user_id', 'created_at'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reports_user_id_created_at', table_name='reports', if_exists=True)
+    op.drop_index(op.f('ix_test_cases_report_id'), table_name='test_cases', if_exists=True)
+    op.drop_index(op.f('ix_pagamentos_compra_id'), table_name='pagamentos', if_exists=True)
+    op.drop_index(op.f('ix_compra_itens_compra_id'), table_name='compra_itens', if_exists=True)
+    op.drop_index('ix_produtos_estoque_baixo', table_name='produtos', if_exists=True)
+    op.drop_index('ix_produtos_categoria_id_nome', table_name='produtos', if_exists=True)
+    op.drop_index('ix_movimentacoes_data', table_name='movimentacoes', if_exists=True)
+    op.drop_index('ix_movimentacoes_tipo_data', table_name='movimentacoes', if_exists=True)
+    op.drop_index('ix_movimentacoes_produto_id_data', table_name='movimentacoes', if_exists=True)
@@ -0,0 +1,46 @@
+"""movimentacoes_usuario_opcional
+
+Revision ID: a7c5e2f09d13
+Revises: f2b6d81c4e97
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Índices com data DESC (a41c7e9d2b10): a cópia da tabela no SQLite perde a ordenação
+INDICES_DATA = (
+    ('ix_movimentacoes_produto_id_data', ['produto_id', sa.text('data DESC')]),
+    ('ix_movimentacoes_tipo_data', ['tipo', sa.text('data DESC')]),
+    ('ix_movimentacoes_data', [sa.text('data DESC')]),
+)
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c5e2f09d13'
+down_revision: Union[str, None] = 'f2b6d81c4e97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _alterar_usuario_id(nullable: bool) -> None:
+    # batch: no SQLite a coluna só muda recriando a tabela; no Postgres é um ALTER COLUMN
+    with op.batch_alter_table('movimentacoes') as batch_op:
+        batch_op.alter_column('usuario_id', existing_type=sa.Integer(), nullable=nullable)
+    if op.get_bind().dialect.name == 'sqlite':
+        for nome, colunas in INDICES_DATA:
+            op.drop_index(nome, table_name='movimentacoes', if_exists=True)
+            op.create_index(nome, 'movimentacoes', colunas, unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Saídas geradas por compras de clientes não têm usuário interno (finalizar_compra)
+    _alterar_usuario_id(nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Falha se já houver vendas de clientes registradas (usuario_id nulo)
+    _alterar_usuario_id(nullable=False)
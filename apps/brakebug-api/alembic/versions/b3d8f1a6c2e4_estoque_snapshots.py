@@ -0,0 +1,38 @@
+"""estoque_snapshots
+
+Revision ID: b3d8f1a6c2e4
+Revises: a7c5e2f09d13
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d8f1a6c2e4'
+down_revision: Union[str, None] = 'a7c5e2f09d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fotografias diárias do estoque (geradas pela aplicação; a primeira parte do estoque atual)
+    op.create_table(
+        'estoque_snapshots',
+        sa.Column('data', sa.Date(), nullable=False),
+        sa.Column('produto_id', sa.Integer(), nullable=False),
+        sa.Column('quantidade', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['produto_id'], ['produtos.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('data', 'produto_id'),
+    )
+    op.create_index('ix_estoque_snapshots_produto_id', 'estoque_snapshots', ['produto_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_estoque_snapshots_produto_id', table_name='estoque_snapshots')
+    op.drop_table('estoque_snapshots')
@@ -0,0 +1,44 @@
+"""busca_textual_produtos
+
+Revision ID: c52e8f3a9d14
+Revises: a41c7e9d2b10
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Mesmas instruções usadas pelo create_all (app/models/produto_busca.py)
+from app.models.produto_busca import DDL_BUSCA_POSTGRES, DDL_BUSCA_SQLITE
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52e8f3a9d14'
+down_revision: Union[str, None] = 'a41c7e9d2b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialeto = op.get_bind().dialect.name
+    # Outros bancos continuam com a busca por ILIKE
+    instrucoes = {"sqlite": DDL_BUSCA_SQLITE, "postgresql": DDL_BUSCA_POSTGRES}.get(dialeto, [])
+    for instrucao in instrucoes:
+        op.execute(sa.text(instrucao))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialeto = op.get_bind().dialect.name
+    if dialeto == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS produtos_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS produtos_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS produtos_fts_ai")
+        op.execute("DROP TABLE IF EXISTS produtos_fts")
+    elif dialeto == "postgresql":
+        # A configuração de busca e a extensão unaccent ficam (podem ser usadas por outros objetos)
+        op.execute("DROP INDEX IF EXISTS ix_produtos_busca")
+        op.execute("ALTER TABLE produtos DROP COLUMN IF EXISTS busca_vetor")
@@ -0,0 +1,62 @@
+"""movimentacoes_rollup
+
+Revision ID: c6e2a9d4f718
+Revises: b3d8f1a6c2e4
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Mesmas instruções usadas pelo create_all (app/models/movimentacao_rollup.py)
+from app.models.movimentacao_rollup import DDL_ROLLUP_POSTGRES, DDL_ROLLUP_SQLITE, recalcular_rollup
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e2a9d4f718'
+down_revision: Union[str, None] = 'b3d8f1a6c2e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'movimentacoes_rollup',
+        sa.Column('produto_id', sa.Integer(), nullable=False),
+        sa.Column('dia', sa.Date(), nullable=False),
+        sa.Column('tipo', sa.String(length=20), nullable=False),
+        sa.Column('quantidade', sa.BigInteger(), nullable=False),
+        sa.Column('movimentacoes', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['produto_id'], ['produtos.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('produto_id', 'dia', 'tipo'),
+    )
+    op.create_index(
+        'ix_movimentacoes_rollup_dia', 'movimentacoes_rollup', ['dia', 'tipo', 'quantidade', 'movimentacoes'], unique=False
+    )
+    dialeto = op.get_bind().dialect.name
+    # Outros bancos não recebem os triggers (as tendências agregam direto de movimentacoes)
+    instrucoes = {"sqlite": DDL_ROLLUP_SQLITE, "postgresql": DDL_ROLLUP_POSTGRES}.get(dialeto, [])
+    for instrucao in instrucoes:
+        op.execute(sa.text(instrucao))
+
+    # Totais do histórico existente; para bases grandes, scripts/reconstruir_rollup_movimentacoes.py
+    # refaz o mesmo cálculo em lotes de dias
+    if dialeto in ("sqlite", "postgresql"):
+        recalcular_rollup(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialeto = op.get_bind().dialect.name
+    if dialeto == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS movimentacoes_rollup_au")
+        op.execute("DROP TRIGGER IF EXISTS movimentacoes_rollup_ad")
+        op.execute("DROP TRIGGER IF EXISTS movimentacoes_rollup_ai")
+    elif dialeto == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS movimentacoes_rollup_movimentacoes ON movimentacoes")
+        op.execute("DROP FUNCTION IF EXISTS movimentacoes_rollup_atualizar()")
+    op.drop_index('ix_movimentacoes_rollup_dia', table_name='movimentacoes_rollup')
+    op.drop_table('movimentacoes_rollup')
@@ -0,0 +1,43 @@
+"""estoque_snapshots_triggers
+
+Revision ID: d5f3b7e1a9c6
+Revises: c6e2a9d4f718
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Mesmas instruções usadas pelo create_all (app/models/estoque_snapshot.py)
+from app.models.estoque_snapshot import DDL_SNAPSHOTS_POSTGRES, DDL_SNAPSHOTS_SQLITE
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f3b7e1a9c6'
+down_revision: Union[str, None] = 'c6e2a9d4f718'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Movimentações de dias já fotografados passam a corrigir as fotografias; as já
+    # desalinhadas antes desta revisão não são recalculadas aqui
+    dialeto = op.get_bind().dialect.name
+    instrucoes = {"sqlite": DDL_SNAPSHOTS_SQLITE, "postgresql": DDL_SNAPSHOTS_POSTGRES}.get(dialeto, [])
+    for instrucao in instrucoes:
+        op.execute(sa.text(instrucao))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialeto = op.get_bind().dialect.name
+    if dialeto == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS estoque_snapshots_au")
+        op.execute("DROP TRIGGER IF EXISTS estoque_snapshots_ad")
+        op.execute("DROP TRIGGER IF EXISTS estoque_snapshots_ai")
+    elif dialeto == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS estoque_snapshots_movimentacoes ON movimentacoes")
+        op.execute("DROP FUNCTION IF EXISTS estoque_snapshots_ajustar()")
@@ -0,0 +1,37 @@
+"""versao_catalogo
+
+Revision ID: d8b1f4c27e63
+Revises: c52e8f3a9d14
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b1f4c27e63'
+down_revision: Union[str, None] = 'c52e8f3a9d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tabela = op.create_table(
+        'catalogo_versao',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('versao', sa.BigInteger(), nullable=False),
+        sa.Column('atualizado_em', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    # Linha única incrementada pelas escritas no catálogo
+    op.bulk_insert(tabela, [{'id': 1, 'versao': 0, 'atualizado_em': datetime.utcnow()}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('catalogo_versao')
@@ -0,0 +1,56 @@
+"""resumo_estoque
+
+Revision ID: e4a9c3d75b20
+Revises: d8b1f4c27e63
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Mesmas instruções usadas pelo create_all (app/models/estoque_resumo.py)
+from app.models.estoque_resumo import DDL_RESUMO_POSTGRES, DDL_RESUMO_SQLITE, recalcular_resumo
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9c3d75b20'
+down_revision: Union[str, None] = 'd8b1f4c27e63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'estoque_resumo',
+        sa.Column('categoria_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('total_produtos', sa.Integer(), nullable=False),
+        sa.Column('estoque_baixo', sa.Integer(), nullable=False),
+        sa.Column('quantidade_total', sa.BigInteger(), nullable=False),
+        sa.Column('valor_custo', sa.Numeric(precision=16, scale=2), nullable=False),
+        sa.Column('valor_venda', sa.Numeric(precision=16, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('categoria_id'),
+    )
+    dialeto = op.get_bind().dialect.name
+    # Outros bancos não recebem os triggers (o dashboard agrega direto de produtos)
+    instrucoes = {"sqlite": DDL_RESUMO_SQLITE, "postgresql": DDL_RESUMO_POSTGRES}.get(dialeto, [])
+    for instrucao in instrucoes:
+        op.execute(sa.text(instrucao))
+
+    # Contadores iniciais calculados uma única vez a partir dos produtos existentes
+    recalcular_resumo(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialeto = op.get_bind().dialect.name
+    if dialeto == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS estoque_resumo_au")
+        op.execute("DROP TRIGGER IF EXISTS estoque_resumo_ad")
+        op.execute("DROP TRIGGER IF EXISTS estoque_resumo_ai")
+    elif dialeto == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS estoque_resumo_produtos ON produtos")
+        op.execute("DROP FUNCTION IF EXISTS estoque_resumo_atualizar()")
+    op.drop_table('estoque_resumo')
@@ -0,0 +1,54 @@
+"""alertas_estoque
+
+Revision ID: f2b6d81c4e97
+Revises: e4a9c3d75b20
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Mesmas instruções usadas pelo create_all (app/models/alerta_estoque.py)
+from app.models.alerta_estoque import DDL_ALERTAS_POSTGRES, DDL_ALERTAS_SQLITE
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6d81c4e97'
+down_revision: Union[str, None] = 'e4a9c3d75b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'alertas_estoque',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('produto_id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=20), nullable=False),
+        sa.Column('quantidade', sa.Integer(), nullable=True),
+        sa.Column('quantidade_minima', sa.Integer(), nullable=True),
+        sa.Column('criado_em', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['produto_id'], ['produtos.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_alertas_estoque_criado_em'), 'alertas_estoque', ['criado_em'], unique=False)
+    dialeto = op.get_bind().dialect.name
+    # Outros bancos não recebem o trigger (o stream envia apenas o snapshot)
+    instrucoes = {"sqlite": DDL_ALERTAS_SQLITE, "postgresql": DDL_ALERTAS_POSTGRES}.get(dialeto, [])
+    for instrucao in instrucoes:
+        op.execute(sa.text(instrucao))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialeto = op.get_bind().dialect.name
+    if dialeto == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS alertas_estoque_au")
+    elif dialeto == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS alertas_estoque_produtos ON produtos")
+        op.execute("DROP FUNCTION IF EXISTS alertas_estoque_registrar()")
+    op.drop_index(op.f('ix_alertas_estoque_criado_em'), table_name='alertas_estoque')
+    op.drop_table('alertas_estoque')
@@ -1,7 +1,8 @@
 # analyze_excel.py (refatorado)
-import pandas as pd
 import os
 
+from app.utils.recursos import carregar
+
 def analyze_excel(file_path):
     """
     Lê um arquivo Excel de um caminho fornecido e retorna informações de análise.
@@ -18,7 +19,8 @@ def analyze_excel(file_path):
         return {"error": f"Erro: O arquivo não foi encontrado no caminho especificado: {file_path}"}
         
     try:
-        # Lê o arquivo Excel usando o caminho fornecido.
+        # Lê o arquivo Excel usando o caminho fornecido (pandas carregado sob demanda).
+        pd = carregar("excel")
         df = pd.read_excel(file_path)
         
         # Converte as primeiras 5 linhas para um formato JSON/dict
@@ -46,5 +48,5 @@ if __name__ == "__main__":
         print("\nColunas encontradas:")
         print(analysis_result["columns"])
         print("\nPrimeiras 5 linhas:")
-        print(pd.DataFrame(analysis_result["head"]).to_string())
+        print(carregar("excel").DataFrame(analysis_result["head"]).to_string())
 
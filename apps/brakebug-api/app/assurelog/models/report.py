@@ -1,5 +1,5 @@
 from datetime import date, datetime
-from sqlalchemy import ( Column, Integer, String, Date, DateTime, ForeignKey, Text)
+from sqlalchemy import ( Column, Integer, String, Date, DateTime, ForeignKey, Text, Index)
 from sqlalchemy.dialects.postgresql import JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -9,6 +9,10 @@ from app.database import Base
 
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (
+        # get_reports: relatórios do usuário ordenados por created_at
+        Index("ix_reports_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
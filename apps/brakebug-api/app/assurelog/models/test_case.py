@@ -12,7 +12,7 @@ class TestCase(Base):
 
     id = Column(Integer, primary_key=True, index=True)
 
-    report_id = Column( Integer, ForeignKey("reports.id", ondelete="CASCADE"), nullable=False)
+    report_id = Column( Integer, ForeignKey("reports.id", ondelete="CASCADE"), nullable=False, index=True)
 
     tc_number = Column(String(50), nullable=False)
     title = Column(String(255), nullable=False)
@@ -2,7 +2,6 @@ import os
 import tempfile
 from typing import List
 
-import pandas as pd
 from fastapi import (
     APIRouter,
     UploadFile,
@@ -19,6 +18,7 @@ from app.assurelog.models.report import Report
 from app.assurelog.models.test_case import TestCase
 from app.assurelog.models.user import User
 from app.services.auth import get_current_user
+from app.utils.recursos import carregar
 
 router = APIRouter(
     prefix="/api/excel",
@@ -57,6 +57,8 @@ def import_excel(
         temp_file.write(file.file.read())
 
     try:
+        # pandas é carregado sob demanda (import pesado)
+        pd = carregar("excel")
         df = pd.read_excel(temp_path)
 
         missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
@@ -174,6 +176,7 @@ def validate_excel(
         temp_file.write(file.file.read())
 
     try:
+        pd = carregar("excel")
         df = pd.read_excel(temp_path)
 
         missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
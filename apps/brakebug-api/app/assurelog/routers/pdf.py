@@ -7,9 +7,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
-from weasyprint import HTML
-
 from app.database import get_db
+from app.utils.recursos import carregar
 from app.assurelog.models.report import Report
 from app.assurelog.models.test_case import TestCase
 from app.assurelog.auth.dependencies import get_current_user
@@ -454,7 +453,8 @@ def export_report_pdf(
 
     file_path = os.path.join(output_dir, filename)
 
-    HTML(string=html).write_pdf(file_path)
+    # WeasyPrint é carregado apenas no primeiro PDF gerado
+    carregar("pdf").HTML(string=html).write_pdf(file_path)
 
     return FileResponse(
         file_path,
@@ -487,7 +487,7 @@ def export_all_reports(
     filename = f"all_reports_{uuid.uuid4().hex}.pdf"
     file_path = os.path.join(os.getcwd(), "generated_pdfs", filename)
 
-    HTML(string=combined_html).write_pdf(file_path)
+    carregar("pdf").HTML(string=combined_html).write_pdf(file_path)
 
     return FileResponse(
         file_path,
@@ -1,14 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import or_ 
+from sqlalchemy import func, or_, select
+from collections import defaultdict
 from datetime import datetime
 from typing import Optional
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.assurelog.models.report import Report
 from app.assurelog.models.test_case import TestCase
 from app.assurelog.models.user import User
 from app.services.auth import get_current_user
+from app.utils.consultas_sql import orcamento_consultas
+from app.utils.serializacao import CodificadorLinhas, relacoes_solicitadas, resposta_json
 from app.assurelog.schemas.report import (
     ReportCreate,
     ReportUpdate,
@@ -25,6 +28,16 @@ router = APIRouter(
     tags=["Reports"]
 )
 
+# get_reports devolve todos os relatórios do filtro: colunas serializadas direto em JSON.
+# A listagem mostra só a contagem de casos; os casos (com evidências) vêm com expand=test_cases
+CODIFICADOR_REPORTS = CodificadorLinhas(
+    ReportSchema, Report, excluir=("test_cases",),
+    adicionais={
+        "test_cases_count": select(func.count(TestCase.id)).where(TestCase.report_id == Report.id).scalar_subquery()
+    },
+)
+CODIFICADOR_TEST_CASES = CodificadorLinhas(TestCaseSchema, TestCase)
+
 # =========================================================
 # REPORTS
 # =========================================================
@@ -41,25 +54,29 @@ def get_reports(
     environment: Optional[str] = Query(None),
     sort_by: str = Query("created_at"),
     sort_order: str = Query("desc"),
+    fields: Optional[str] = Query(None, description="Campos do relatório separados por vírgula (ex.: id,title,date,test_cases_count)"),
+    expand: Optional[str] = Query(None, description="Relações a incluir: test_cases"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
-    Listar relatórios do usuário atual (ou todos se admin)
+    Listar relatórios do usuário atual (ou todos se admin).
+    Cada relatório traz test_cases_count; os casos de teste só com expand=test_cases.
     """
+    relacoes = relacoes_solicitadas(expand, ("test_cases",))
+    codificador = CODIFICADOR_REPORTS.parcial(fields, Report.id)
+
     # query = db.query(Report)
-    query = (
-        db.query(Report)
-        .options(selectinload(Report.test_cases))
-    )
+    # Linhas do Core (sem ORM): relatórios e, se pedidos, os casos de teste numa segunda consulta
+    query = codificador.select()
 
     # Controle de acesso
     if not current_user.is_admin():
-        query = query.filter(Report.user_id == current_user.id)
+        query = query.where(Report.user_id == current_user.id)
 
     # Busca geral
     if search:
-        query = query.filter(
+        query = query.where(
             or_(
                 Report.title.ilike(f"%{search}%"),
                 Report.feature_scenario.ilike(f"%{search}%"),
@@ -70,32 +87,32 @@ def get_reports(
         )
 
     if responsible:
-        query = query.filter(Report.made_by.ilike(f"%{responsible}%"))
+        query = query.where(Report.made_by.ilike(f"%{responsible}%"))
 
     if date_from:
         try:
             df = datetime.strptime(date_from, "%Y-%m-%d").date()
-            query = query.filter(Report.date >= df)
+            query = query.where(Report.date >= df)
         except ValueError:
             pass
 
     if date_to:
         try:
             dt = datetime.strptime(date_to, "%Y-%m-%d").date()
-            query = query.filter(Report.date <= dt)
+            query = query.where(Report.date <= dt)
         except ValueError:
             pass
 
     if status_filter:
-        query = query.filter(
+        query = query.where(
             Report.test_cases.any(TestCase.status == status_filter)
         )
 
     if feature:
-        query = query.filter(Report.feature_scenario.ilike(f"%{feature}%"))
+        query = query.where(Report.feature_scenario.ilike(f"%{feature}%"))
 
     if environment:
-        query = query.filter(Report.test_environment.ilike(f"%{environment}%"))
+        query = query.where(Report.test_environment.ilike(f"%{environment}%"))
 
     # Ordenação
     order_column = {
@@ -109,12 +126,27 @@ def get_reports(
         order_column.asc() if sort_order == "asc" else order_column.desc()
     )
 
-    results = query.all()
+    linhas = db.execute(query).all()
+    reports = codificador.dicts(linhas)
+
+    if "test_cases" in relacoes:
+        casos = defaultdict(list)
+        if reports:
+            ids = query.with_only_columns(Report.id).order_by(None)
+            resultado = db.execute(
+                CODIFICADOR_TEST_CASES.select()
+                .where(TestCase.report_id.in_(ids))
+                .order_by(TestCase.report_id, TestCase.id)
+            )
+            for caso in CODIFICADOR_TEST_CASES.dicts(resultado):
+                casos[caso["report_id"]].append(caso)
+        for report, linha in zip(reports, linhas):
+            report["test_cases"] = casos[linha.id]
 
-    return {
-    "reports": results,
-    "total": len(results)
-    } 
+    return resposta_json({
+    "reports": reports,
+    "total": len(reports)
+    })
 
 
 # @router.post(
@@ -191,16 +223,21 @@ def create_report(
     return report
 
 
-@router.get("/{report_id}", response_model=ReportSchema)
+@router.get(
+    "/{report_id}",
+    response_model=ReportSchema,
+    # usuário + relatório + casos de teste (selectinload)
+    dependencies=[Depends(orcamento_consultas(3, repeticoes=1))],
+)
 def get_report(
     report_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obter relatório específico
     """
-    report = db.query(Report).get(report_id)
+    report = db.get(Report, report_id, options=[selectinload(Report.test_cases)])
     if not report:
         raise HTTPException(status_code=404, detail="Relatório não encontrado")
 
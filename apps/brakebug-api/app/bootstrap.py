@@ -0,0 +1,192 @@
+"""
+Bootstrap do schema do banco de dados.
+
+Executado uma vez no startup (lifespan do FastAPI) em vez de no import do app.main:
+- compara o fingerprint do schema (heads do alembic + tabelas dos modelos) com o
+  gravado no banco e não faz nada quando já estão iguais (1 consulta);
+- quando diferente, apenas um worker aplica as migrações (advisory lock);
+- a criação do schema em banco vazio é opt-in, via linha de comando:
+
+    python -m app.bootstrap criar      # cria tabelas (create_all) e marca o alembic em head
+    python -m app.bootstrap verificar  # mesmo fluxo do startup
+    python -m app.bootstrap status     # mostra o fingerprint esperado e o gravado
+"""
+import argparse
+import hashlib
+import logging
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select, text
+
+from app.database import Base, engine
+from app import models  # noqa: F401 - registra os modelos no metadata
+from app.assurelog.models import report, test_case, user  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Chave do pg_advisory_lock usada para serializar o bootstrap entre workers
+ADVISORY_LOCK_ID = 720651500
+
+# Tabela auxiliar fora do Base.metadata (não aparece no autogenerate do alembic)
+schema_fingerprint = Table(
+    "schema_fingerprint",
+    MetaData(),
+    Column("fingerprint", String(64), primary_key=True),
+    Column("atualizado_em", DateTime, default=datetime.utcnow),
+)
+
+
+def alembic_config() -> Config:
+    """
+    Configuração do alembic apontando para o diretório da API, sem reconfigurar logging.
+    """
+    config = Config(str(BASE_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BASE_DIR / "alembic"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def calcular_fingerprint(config: Optional[Config] = None) -> str:
+    """
+    Hash das heads do alembic e das tabelas/colunas declaradas nos modelos.
+    Muda sempre que surge uma migração nova ou um modelo é alterado.
+    """
+    heads = sorted(ScriptDirectory.from_config(config or alembic_config()).get_heads())
+    partes = [",".join(heads)]
+    for tabela in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        colunas = ",".join(f"{c.name}:{c.type}" for c in tabela.columns)
+        partes.append(f"{tabela.name}({colunas})")
+    return hashlib.sha256("|".join(partes).encode()).hexdigest()
+
+
+def fingerprint_gravado(conn) -> Optional[str]:
+    if not inspect(conn).has_table(schema_fingerprint.name):
+        return None
+    return conn.execute(select(schema_fingerprint.c.fingerprint)).scalar()
+
+
+def gravar_fingerprint(fingerprint: str):
+    with engine.begin() as conn:
+        schema_fingerprint.create(conn, checkfirst=True)
+        conn.execute(schema_fingerprint.delete())
+        conn.execute(schema_fingerprint.insert().values(fingerprint=fingerprint, atualizado_em=datetime.utcnow()))
+
+
+@contextmanager
+def lock_bootstrap():
+    """
+    Garante que apenas um worker execute o bootstrap por vez.
+    Postgres/MySQL usam lock do próprio banco; SQLite usa lock de arquivo local.
+    """
+    dialeto = engine.dialect.name
+
+    if dialeto == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+        return
+
+    if dialeto == "mysql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT GET_LOCK('brakebug_schema_bootstrap', 600)"))
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT RELEASE_LOCK('brakebug_schema_bootstrap')"))
+        return
+
+    try:
+        import fcntl
+    except ImportError:  # Windows (desenvolvimento): sem múltiplos workers
+        yield
+        return
+
+    caminho = Path(tempfile.gettempdir()) / f"brakebug_bootstrap_{hashlib.md5(str(engine.url).encode()).hexdigest()}.lock"
+    with open(caminho, "w") as arquivo_lock:
+        fcntl.flock(arquivo_lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(arquivo_lock, fcntl.LOCK_UN)
+
+
+def criar_schema():
+    """
+    Cria todas as tabelas em um banco vazio e marca o alembic como atualizado (head).
+    """
+    config = alembic_config()
+    with lock_bootstrap():
+        Base.metadata.create_all(bind=engine)
+        command.stamp(config, "heads")
+        gravar_fingerprint(calcular_fingerprint(config))
+    logger.info("Schema criado e alembic marcado em head")
+
+
+def garantir_schema() -> bool:
+    """
+    Fluxo do startup. Retorna True se alguma alteração de schema foi aplicada.
+    """
+    config = alembic_config()
+    esperado = calcular_fingerprint(config)
+
+    with engine.connect() as conn:
+        if fingerprint_gravado(conn) == esperado:
+            logger.info("Schema já atualizado (fingerprint %s), bootstrap ignorado", esperado[:12])
+            return False
+
+    with lock_bootstrap():
+        # Outro worker pode ter concluído o bootstrap enquanto aguardávamos o lock
+        with engine.connect() as conn:
+            if fingerprint_gravado(conn) == esperado:
+                return False
+            tabelas = set(inspect(conn).get_table_names())
+
+        tabelas_modelos = set(Base.metadata.tables)
+        if not tabelas & tabelas_modelos:
+            logger.warning(
+                "Banco sem tabelas da aplicação. Crie o schema com: python -m app.bootstrap criar"
+            )
+            return False
+
+        if "alembic_version" in tabelas:
+            logger.info("Aplicando migrações do alembic")
+            command.upgrade(config, "heads")
+
+        # Tabelas que não possuem migração (ex.: assurelog) continuam vindo dos modelos
+        Base.metadata.create_all(bind=engine, checkfirst=True)
+        gravar_fingerprint(esperado)
+
+    logger.info("Bootstrap do schema concluído (fingerprint %s)", esperado[:12])
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bootstrap do schema do banco de dados")
+    parser.add_argument("acao", nargs="?", default="verificar", choices=["verificar", "criar", "status"])
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s [%(name)s] %(message)s")
+
+    if args.acao == "criar":
+        criar_schema()
+    elif args.acao == "status":
+        with engine.connect() as conn:
+            print("Esperado:", calcular_fingerprint())
+            print("Gravado: ", fingerprint_gravado(conn))
+    else:
+        garantir_schema()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,81 @@ class Settings(BaseSettings):
     # Configurações do banco de dados
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./synchrogest.db")
     # DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./brakebuglabs.db")
+    # URL assíncrona opcional; se ausente é derivada da DATABASE_URL (asyncpg/aiosqlite)
+    ASYNC_DATABASE_URL: Optional[str] = os.getenv("ASYNC_DATABASE_URL")
+    # Réplica de leitura opcional (endpoints somente leitura usam get_read_db)
+    DATABASE_READ_URL: Optional[str] = os.getenv("DATABASE_READ_URL")
+    ASYNC_DATABASE_READ_URL: Optional[str] = os.getenv("ASYNC_DATABASE_READ_URL")
+
+    # Configurações do pool de conexões
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # segundos aguardando conexão livre
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # -1 desativa
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+    # Perfil SQLite (aplicado em cada nova conexão quando DATABASE_URL é sqlite)
+    SQLITE_PRAGMAS_ENABLED: bool = os.getenv("SQLITE_PRAGMAS_ENABLED", "true").lower() == "true"
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # negativo = KiB (64 MiB)
+    SQLITE_BUSY_TIMEOUT: int = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # ms
+    SQLITE_TEMP_STORE: str = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+
+    # Bootstrap do schema no startup: "auto" (migra quando o fingerprint muda) ou "off"
+    SCHEMA_BOOTSTRAP: str = os.getenv("SCHEMA_BOOTSTRAP", "auto")
+
+    # Subsistemas pesados pré-carregados em background após o startup (ex.: "pdf,excel")
+    PREWARM_FEATURES: str = os.getenv("PREWARM_FEATURES", "")
+
+    # Contador de consultas por requisição (cabeçalhos X-DB-Queries / X-DB-Time-ms)
+    SQL_METRICS_ENABLED: bool = os.getenv("SQL_METRICS_ENABLED", "true").lower() == "true"
+    SQL_STRICT_MODE: bool = os.getenv("SQL_STRICT_MODE", "false").lower() == "true"  # falha a requisição (testes)
+    SQL_QUERY_BUDGET: int = int(os.getenv("SQL_QUERY_BUDGET", "30"))  # orçamento padrão por requisição
+    SQL_MAX_REPEATED: int = int(os.getenv("SQL_MAX_REPEATED", "10"))  # repetições do mesmo formato (N+1)
+
+    # Registro de consultas lentas (0 desativa) com EXPLAIN automático dos SELECTs
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    SLOW_QUERY_EXPLAIN: bool = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+    SLOW_QUERY_BUFFER: int = int(os.getenv("SLOW_QUERY_BUFFER", "200"))  # registros mantidos em memória
+    SLOW_QUERY_LOG_FILE: str = os.getenv("SLOW_QUERY_LOG_FILE", "logs/consultas_lentas.log")  # vazio desativa
     
+    # Busca textual do catálogo (FTS5 no SQLite, tsvector no Postgres); false volta ao ILIKE
+    PRODUTOS_BUSCA_TEXTUAL: bool = os.getenv("PRODUTOS_BUSCA_TEXTUAL", "true").lower() == "true"
+
+    # Autocomplete em memória (/api/produtos/suggest): recarga periódica do índice (0 desativa)
+    SUGESTOES_RECARGA_SEGUNDOS: int = int(os.getenv("SUGESTOES_RECARGA_SEGUNDOS", "300"))
+
+    # Cache HTTP do catálogo (ETag/304 pela versão do catálogo + respostas serializadas em memória)
+    CATALOGO_CACHE_ENABLED: bool = os.getenv("CATALOGO_CACHE_ENABLED", "true").lower() == "true"
+    CATALOGO_CACHE_ITENS: int = int(os.getenv("CATALOGO_CACHE_ITENS", "256"))  # URLs guardadas por worker
+    CATALOGO_CACHE_S_MAXAGE: int = int(os.getenv("CATALOGO_CACHE_S_MAXAGE", "10"))  # segundos na CDN
+    CATALOGO_CACHE_STALE: int = int(os.getenv("CATALOGO_CACHE_STALE", "60"))  # stale-while-revalidate
+
+    # Compressão das respostas (zstd/br usam os pacotes zstandard/brotli de requirements.txt)
+    COMPRESSAO_ENABLED: bool = os.getenv("COMPRESSAO_ENABLED", "true").lower() == "true"
+    COMPRESSAO_MINIMO_BYTES: int = int(os.getenv("COMPRESSAO_MINIMO_BYTES", "1024"))  # respostas menores saem sem compressão
+    COMPRESSAO_NIVEL_GZIP: int = int(os.getenv("COMPRESSAO_NIVEL_GZIP", "6"))
+    COMPRESSAO_NIVEL_BROTLI: int = int(os.getenv("COMPRESSAO_NIVEL_BROTLI", "4"))  # 0-11; 4 é rápido o bastante para respostas dinâmicas
+    COMPRESSAO_NIVEL_ZSTD: int = int(os.getenv("COMPRESSAO_NIVEL_ZSTD", "3"))
+    COMPRESSAO_CACHE_ITENS: int = int(os.getenv("COMPRESSAO_CACHE_ITENS", "128"))  # corpos comprimidos guardados por worker
+
+    # Alertas de estoque baixo (SSE em /api/alertas/estoque)
+    ALERTAS_INTERVALO_SEGUNDOS: float = float(os.getenv("ALERTAS_INTERVALO_SEGUNDOS", "2"))  # eventos de outros workers
+    ALERTAS_HEARTBEAT_SEGUNDOS: float = float(os.getenv("ALERTAS_HEARTBEAT_SEGUNDOS", "15"))  # comentário contra timeout de proxy
+    ALERTAS_REPLAY_MAXIMO: int = int(os.getenv("ALERTAS_REPLAY_MAXIMO", "1000"))  # acima disso o cliente recebe um snapshot
+    ALERTAS_FILA: int = int(os.getenv("ALERTAS_FILA", "1000"))  # eventos pendentes por assinante antes de desconectá-lo
+    ALERTAS_RETENCAO_DIAS: int = int(os.getenv("ALERTAS_RETENCAO_DIAS", "7"))
+
+    # Fotografias diárias do estoque (GET /api/produtos/estoque-em)
+    ESTOQUE_SNAPSHOTS_ENABLED: bool = os.getenv("ESTOQUE_SNAPSHOTS_ENABLED", "true").lower() == "true"
+    ESTOQUE_SNAPSHOT_INTERVALO_SEGUNDOS: float = float(os.getenv("ESTOQUE_SNAPSHOT_INTERVALO_SEGUNDOS", "3600"))  # verificação de dias pendentes
+    ESTOQUE_SNAPSHOT_RETENCAO_DIAS: int = int(os.getenv("ESTOQUE_SNAPSHOT_RETENCAO_DIAS", "90"))  # fins de mês são mantidos sempre
+
+    # Exportação de movimentações (GET /api/movimentacoes/export): linhas por bloco do cursor
+    EXPORTACAO_LOTE: int = int(os.getenv("EXPORTACAO_LOTE", "2000"))
+
     # Configurações de segurança
     SECRET_KEY: str = os.getenv("SECRET_KEY", "temporarysecretkey123456789abcdefghijklmnopqrstuvwxyz")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
@@ -1,18 +1,196 @@
-from sqlalchemy import create_engine
+from importlib.util import find_spec
+from typing import Optional
+
+from sqlalchemy import Select, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import settings
+from app.utils.consultas_lentas import registrar_consultas_lentas
+from app.utils.consultas_sql import instrumentar_consultas
+from app.utils.pool_metrics import PoolMetrics, instrumentar_pool, pool_instrumentado
 # print("🚀 DATABASE_URL carregada:", settings.DATABASE_URL)
 
+# Drivers assíncronos usados para cada backend suportado
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+}
 
-# Criar engine do SQLAlchemy
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-)
+
+def montar_url_async(database_url: str) -> str:
+    """
+    Converte a DATABASE_URL síncrona na URL equivalente com driver assíncrono.
+    Ex.: sqlite:///./db.sqlite -> sqlite+aiosqlite:///./db.sqlite
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(f"Banco '{backend}' não possui driver assíncrono configurado")
+    if find_spec(driver) is None:
+        # Falha aqui, com o nome do pacote, em vez de um ImportError no create_async_engine
+        raise ValueError(f"Driver assíncrono '{driver}' do banco '{backend}' não instalado (ver requirements.txt)")
+    return url.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+def opcoes_pool(database_url: str, pool_base, metricas: PoolMetrics) -> dict:
+    """
+    Monta os argumentos de pool do create_engine a partir das Settings.
+    """
+    opcoes = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # SQLite em memória usa um pool próprio, sem fila para dimensionar
+        return opcoes
+    opcoes.update(
+        poolclass=pool_instrumentado(pool_base, metricas),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return opcoes
+
+
+def pragmas_sqlite() -> dict:
+    """
+    Perfil de produção do SQLite: WAL permite leitores concorrentes com o escritor,
+    synchronous=NORMAL é seguro em WAL e mmap/cache reduzem leituras de disco.
+    busy_timeout vem primeiro para que a troca de journal_mode aguarde locks.
+    """
+    return {
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+
+
+def configurar_sqlite(sync_engine, pragmas: Optional[dict] = None):
+    """
+    Aplica os PRAGMAs do perfil SQLite em cada conexão aberta pela engine.
+    Funciona também com aiosqlite (passar async_engine.sync_engine).
+    """
+    pragmas = pragmas_sqlite() if pragmas is None else pragmas
+
+    @event.listens_for(sync_engine, "connect")
+    def _aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for nome, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nome}={valor}")
+        cursor.close()
+
+
+# Métricas de pool por engine (expostas em /api/diagnostico/pool)
+metricas_pool = {}
+
+
+def _criar_engines(nome: str, database_url: str, async_url: Optional[str] = None):
+    """
+    Cria o par de engines (síncrona e assíncrona) para uma URL, já instrumentadas.
+    """
+    metricas_pool[nome] = PoolMetrics(nome)
+    metricas_pool[f"{nome}_async"] = PoolMetrics(f"{nome}_async")
+
+    sync_engine = create_engine(
+        database_url, connect_args={"check_same_thread": False} if database_url.startswith("sqlite") else {},
+        **opcoes_pool(database_url, QueuePool, metricas_pool[nome])
+    )
+    async_url = async_url or montar_url_async(database_url)
+    engine_async = create_async_engine(
+        async_url,
+        **opcoes_pool(async_url, AsyncAdaptedQueuePool, metricas_pool[f"{nome}_async"])
+    )
+
+    instrumentar_pool(sync_engine, metricas_pool[nome])
+    instrumentar_pool(engine_async.sync_engine, metricas_pool[f"{nome}_async"])
+
+    if settings.SQL_METRICS_ENABLED:
+        instrumentar_consultas(sync_engine)
+        instrumentar_consultas(engine_async.sync_engine)
+
+    if settings.SLOW_QUERY_MS > 0:
+        registrar_consultas_lentas(sync_engine)
+        registrar_consultas_lentas(engine_async.sync_engine)
+
+    if sync_engine.dialect.name == "sqlite" and settings.SQLITE_PRAGMAS_ENABLED:
+        configurar_sqlite(sync_engine)
+        configurar_sqlite(engine_async.sync_engine)
+    return sync_engine, engine_async
+
+
+class RoutingSession(Session):
+    """
+    Sessão que envia leituras para a réplica até a primeira escrita.
+    A partir da primeira escrita (flush, INSERT/UPDATE/DELETE ou SELECT ... FOR UPDATE)
+    a sessão fica fixada no primário, garantindo que ela leia o que acabou de gravar.
+    """
+
+    def __init__(self, primario=None, replica=None, **kw):
+        super().__init__(**kw)
+        self._primario = primario
+        self._replica = replica
+        self.fixada_no_primario = False
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.fixada_no_primario or self._replica is None:
+            return self._primario
+
+        if self._flushing or isinstance(clause, UpdateBase) or (
+            isinstance(clause, Select) and clause._for_update_arg is not None
+        ):
+            self.fixada_no_primario = True
+            return self._primario
+
+        if isinstance(clause, Select):
+            return self._replica
+
+        # SQL textual ou conexão explícita: na dúvida, primário
+        return self._primario
+
+
+# Criar engine do SQLAlchemy (primário) e sua versão assíncrona (asyncpg/aiosqlite)
+engine, async_engine = _criar_engines("principal", settings.DATABASE_URL, settings.ASYNC_DATABASE_URL)
+
+# Réplica de leitura opcional para endpoints somente leitura
+read_engine = async_read_engine = None
+if settings.DATABASE_READ_URL:
+    read_engine, async_read_engine = _criar_engines(
+        "replica", settings.DATABASE_READ_URL, settings.ASYNC_DATABASE_READ_URL
+    )
 
 # Criar sessão local
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sessão assíncrona: expire_on_commit=False evita lazy loads implícitos após o commit
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Sessões de leitura: sem réplica configurada, são as mesmas sessões do primário
+if read_engine is not None:
+    ReadSessionLocal = sessionmaker(
+        class_=RoutingSession, primario=engine, replica=read_engine,
+        autocommit=False, autoflush=False
+    )
+    AsyncReadSessionLocal = async_sessionmaker(
+        class_=AsyncSession, sync_session_class=RoutingSession,
+        primario=async_engine.sync_engine, replica=async_read_engine.sync_engine,
+        autoflush=False, expire_on_commit=False
+    )
+else:
+    ReadSessionLocal = SessionLocal
+    AsyncReadSessionLocal = AsyncSessionLocal
+
 # Criar base para os modelos
 Base = declarative_base()
 
@@ -27,3 +205,42 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Função de dependência para obter uma sessão assíncrona do banco de dados.
+    Deve ser usada em rotas async def para não bloquear o event loop.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db():
+    """
+    Dependência para rotas somente leitura: usa a réplica (DATABASE_READ_URL)
+    quando configurada e fixa no primário após a primeira escrita.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    """
+    Versão assíncrona de get_read_db para rotas async def.
+    """
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+def estatisticas_pool() -> list:
+    """
+    Estado atual e contadores acumulados dos pools de conexão.
+    """
+    engines = [("principal", engine), ("principal_async", async_engine.sync_engine)]
+    if read_engine is not None:
+        engines += [("replica", read_engine), ("replica_async", async_read_engine.sync_engine)]
+    return [metricas_pool[nome].resumo(sync_engine.pool) for nome, sync_engine in engines]
@@ -1,8 +1,13 @@
 
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import auth, usuarios, categorias, produtos, movimentacoes
-from app.routers import clientes, compra_clientes, pagamentos
+from app.routers import clientes, compra_clientes, pagamentos, diagnostico, dashboard, alertas
 from app.routers.auth_cliente import router as auth_cliente_router
 from app.routers.cliente_publico import router as cliente_publico_router
 
@@ -10,17 +15,67 @@ from app.assurelog.routers.report_secure import router as report_router
 # from app.assurelog.routers.test_case import TestCase
 
 
-# IMPORTANTE: criação automática de tabelas
-from app.database import Base, engine
+from app.config import settings
+from app.database import async_engine, engine
+from app.services.alertas_estoque import monitor_alertas
+from app.services.estoque_snapshots import agendador_snapshots
+from app.services.sugestoes_produtos import indice_sugestoes
+from app.utils.compressao import CompressaoMiddleware
+from app.utils.consultas_sql import ContadorConsultasMiddleware
+from app.utils.paginacao import CABECALHO_PROXIMO_CURSOR
+
+logger = logging.getLogger(__name__)
+
+
+async def recarregar_sugestoes():
+    """
+    Monta o índice de sugestões e o recarrega periodicamente (alterações de outros workers).
+    """
+    while True:
+        try:
+            await run_in_threadpool(indice_sugestoes.recarregar)
+        except Exception as e:
+            logger.warning("Não foi possível montar o índice de sugestões: %s", e)
+        if settings.SUGESTOES_RECARGA_SEGUNDOS <= 0:
+            return
+        await asyncio.sleep(settings.SUGESTOES_RECARGA_SEGUNDOS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 🔹 Bootstrap do schema no startup (não mais no import): ignorado quando o
+    # fingerprint gravado já corresponde às migrações/modelos atuais
+    if settings.SCHEMA_BOOTSTRAP != "off":
+        from app.bootstrap import garantir_schema
+        garantir_schema()
+
+    # 🔹 WeasyPrint/pandas são carregados sob demanda; opcionalmente pré-aquecidos em background
+    if settings.PREWARM_FEATURES:
+        from app.utils.recursos import preaquecer
+        preaquecer(nome.strip() for nome in settings.PREWARM_FEATURES.split(",") if nome.strip())
+
+    # 🔹 Índice do autocomplete montado em background (até ficar pronto, /suggest consulta o banco)
+    tarefa_sugestoes = asyncio.create_task(recarregar_sugestoes())
+
+    # 🔹 Leitor dos alertas de estoque baixo (stream SSE em /api/alertas/estoque)
+    await monitor_alertas.iniciar()
+
+    # 🔹 Fotografias diárias do estoque (consultas /api/produtos/estoque-em)
+    await agendador_snapshots.iniciar()
+    yield
+    await agendador_snapshots.parar()
+    await monitor_alertas.parar()
+    tarefa_sugestoes.cancel()
+    await async_engine.dispose()
+    engine.dispose()
 
-# 🔹 Criação automática das tabelas
-Base.metadata.create_all(bind=engine)
 
 # 🔹 Inicialização da aplicação
 app = FastAPI(
     title="BrakebugLabs",
     description="API para sistema de gerenciamento",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # 🔹 Configuração de CORS (deve vir ANTES dos routers)
@@ -42,14 +97,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[CABECALHO_PROXIMO_CURSOR],  # lido pelo front-end para paginar
 )
 
+# 🔹 Contagem de consultas SQL por requisição (cabeçalhos X-DB-Queries / X-DB-Time-ms)
+if settings.SQL_METRICS_ENABLED:
+    app.add_middleware(ContadorConsultasMiddleware)
+
+# 🔹 Compressão gzip/br/zstd negociada pelo Accept-Encoding (adicionado por último = mais externo)
+if settings.COMPRESSAO_ENABLED:
+    app.add_middleware(CompressaoMiddleware)
+
 # Incluir routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Autenticação"])
 app.include_router(usuarios.router, prefix="/api/portal/admin/usuarios", tags=["Usuários"])
 app.include_router(categorias.router, prefix="/api/categorias", tags=["Categorias"])
 app.include_router(produtos.router, prefix="/api/produtos", tags=["Produtos"])
 app.include_router(movimentacoes.router, prefix="/api/movimentacoes", tags=["Movimentações"])
+app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+app.include_router(alertas.router, prefix="/api/alertas", tags=["Alertas"])
 
 # # Rotas cliente
 app.include_router(auth_cliente_router, prefix="/api/auth/clientes", tags=["AuthCliente"])
@@ -60,6 +126,9 @@ app.include_router(cliente_publico_router, prefix="/api/public/clientes", tags=[
 # Rotas de pagamentos
 app.include_router(pagamentos.router, prefix="/api/pagamentos", tags=["Pagamentos"])
 
+# Rotas de diagnóstico (apenas administradores)
+app.include_router(diagnostico.router, prefix="/api/diagnostico", tags=["Diagnóstico"])
+
 # Rotas assurelog
 app.include_router(report_router, prefix="/api/reports", tags=["Reports"])
 # app.include_router(TestCase.router, prefix="/api/test_case", tags=["TestCase"])
@@ -7,6 +7,12 @@ from app.models.compra_itens import CompraItem
 from app.models.clientes import Cliente
 from app.models.pagamentos import Pagamento
 from app.models.log import Log
+from app.models.catalogo_versao import CatalogoVersao
+from app.models.estoque_resumo import EstoqueResumo  # inclui os triggers que mantêm o resumo
+from app.models.alerta_estoque import AlertaEstoque  # inclui o trigger que registra os cruzamentos do mínimo
+from app.models.estoque_snapshot import EstoqueSnapshot  # inclui os triggers que corrigem fotografias passadas
+from app.models.movimentacao_rollup import MovimentacaoRollup  # inclui os triggers que mantêm os totais diários
+from app.models import produto_busca  # noqa: F401 - DDL da busca textual (FTS5/tsvector)
 
 # Exportar todos os modelos para facilitar importações
 __all__ = [
@@ -18,5 +24,10 @@ __all__ = [
     "CompraItens",
     "Clientes",
     "Pagamentos",
-    "Log"
+    "Log",
+    "CatalogoVersao",
+    "EstoqueResumo",
+    "AlertaEstoque",
+    "EstoqueSnapshot",
+    "MovimentacaoRollup"
 ]
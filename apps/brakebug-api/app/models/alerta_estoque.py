@@ -0,0 +1,86 @@
+"""
+Eventos de estoque baixo (stream GET /api/alertas/estoque), registrados por triggers em produtos.
+
+O trigger compara a situação antes e depois de cada UPDATE de quantidade/quantidade_minima
+e grava uma linha só quando o produto cruza o mínimo (entra ou sai do estoque baixo),
+na mesma transação da venda ou movimentação que causou o cruzamento. O id crescente é
+o cursor de replay do stream (Last-Event-ID).
+Produtos cadastrados já abaixo do mínimo não geram evento: aparecem no snapshot inicial.
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, DDL, DateTime, ForeignKey, Integer, String, event, func
+
+from app.database import Base
+from app.models.produto import Produto
+
+TIPO_ESTOQUE_BAIXO = "estoque_baixo"
+TIPO_ESTOQUE_NORMALIZADO = "estoque_normalizado"
+
+
+class AlertaEstoque(Base):
+    __tablename__ = "alertas_estoque"
+
+    id = Column(Integer, primary_key=True)
+    produto_id = Column(Integer, ForeignKey("produtos.id", ondelete="CASCADE"), nullable=False)
+    tipo = Column(String(20), nullable=False)  # estoque_baixo | estoque_normalizado
+    quantidade = Column(Integer, nullable=True)
+    quantidade_minima = Column(Integer, nullable=True)
+    criado_em = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+def _abaixo_minimo(linha: str) -> str:
+    return f"(coalesce({linha}.quantidade, 0) < coalesce({linha}.quantidade_minima, 0))"
+
+
+def abaixo_minimo():
+    """
+    O critério do trigger como expressão do SQLAlchemy (quantidades nulas contam como 0).
+    """
+    return func.coalesce(Produto.quantidade, 0) < func.coalesce(Produto.quantidade_minima, 0)
+
+
+def _registrar(linha: str, agora: str) -> str:
+    return (
+        f"INSERT INTO alertas_estoque (produto_id, tipo, quantidade, quantidade_minima, criado_em) "
+        f"VALUES ({linha}.id, "
+        f"CASE WHEN {_abaixo_minimo(linha)} THEN '{TIPO_ESTOQUE_BAIXO}' ELSE '{TIPO_ESTOQUE_NORMALIZADO}' END, "
+        f"{linha}.quantidade, {linha}.quantidade_minima, {agora})"
+    )
+
+
+DDL_ALERTAS_SQLITE = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS alertas_estoque_au AFTER UPDATE OF quantidade, quantidade_minima ON produtos
+    WHEN {_abaixo_minimo("new")} <> {_abaixo_minimo("old")}
+    BEGIN
+        {_registrar("new", "CURRENT_TIMESTAMP")};
+    END
+    """,
+]
+
+DDL_ALERTAS_POSTGRES = [
+    f"""
+    CREATE OR REPLACE FUNCTION alertas_estoque_registrar() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        {_registrar("NEW", "timezone('utc', now())")};
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS alertas_estoque_produtos ON produtos",
+    f"""
+    CREATE TRIGGER alertas_estoque_produtos
+    AFTER UPDATE OF quantidade, quantidade_minima ON produtos
+    FOR EACH ROW WHEN ({_abaixo_minimo("NEW")} IS DISTINCT FROM {_abaixo_minimo("OLD")})
+    EXECUTE FUNCTION alertas_estoque_registrar()
+    """,
+]
+
+
+# Criados depois da tabela de eventos (o trigger fica em produtos, que já existe)
+for _instrucao in DDL_ALERTAS_SQLITE:
+    event.listen(AlertaEstoque.__table__, "after_create", DDL(_instrucao).execute_if(dialect="sqlite"))
+
+for _instrucao in DDL_ALERTAS_POSTGRES:
+    event.listen(AlertaEstoque.__table__, "after_create", DDL(_instrucao).execute_if(dialect="postgresql"))
@@ -0,0 +1,24 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, event
+from datetime import datetime
+from app.database import Base
+
+# Linha única da tabela (a versão é global para o catálogo)
+ID_CATALOGO = 1
+
+
+class CatalogoVersao(Base):
+    """
+    Versão do catálogo de produtos, incrementada a cada escrita que altera linhas de
+    produtos (na transação das escritas de cadastro, logo após o commit das de estoque).
+    Serve de validador (ETag/Last-Modified) do cache HTTP.
+    """
+    __tablename__ = "catalogo_versao"
+
+    id = Column(Integer, primary_key=True)
+    versao = Column(BigInteger, nullable=False, default=0)
+    atualizado_em = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+@event.listens_for(CatalogoVersao.__table__, "after_create")
+def _inserir_linha_inicial(tabela, conexao, **kwargs):
+    conexao.execute(tabela.insert().values(id=ID_CATALOGO, versao=0, atualizado_em=datetime.utcnow()))
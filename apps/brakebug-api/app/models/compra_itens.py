@@ -6,7 +6,7 @@ class CompraItem(Base):
     __tablename__ = "compra_itens"
 
     id = Column(Integer, primary_key=True, index=True)
-    compra_id = Column(Integer, ForeignKey("compra_clientes.id"), nullable=False)
+    compra_id = Column(Integer, ForeignKey("compra_clientes.id"), nullable=False, index=True)
     produto_id = Column(Integer, ForeignKey("produtos.id"), nullable=False)
     nome = Column(String(255), nullable=False)  # VARCHAR precisa de tamanho no MySQL
     quantidade = Column(Integer, nullable=False)
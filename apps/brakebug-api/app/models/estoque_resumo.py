@@ -0,0 +1,149 @@
+"""
+Contadores do estoque por categoria (GET /api/dashboard), mantidos por triggers em produtos.
+
+Os triggers rodam na mesma transação de qualquer escrita em produtos — ORM, upsert em
+lote ou UPDATE direto —, então o resumo acompanha o estoque sem depender de cada
+endpoint e o dashboard lê uma linha por categoria em vez de varrer a tabela.
+Produtos sem categoria ficam na linha categoria_id = 0.
+"""
+from sqlalchemy import BigInteger, Column, DDL, Integer, Numeric, case, event, func, select
+
+from app.database import Base
+from app.models.produto import Produto
+
+
+class EstoqueResumo(Base):
+    __tablename__ = "estoque_resumo"
+
+    categoria_id = Column(Integer, primary_key=True, autoincrement=False)  # 0 = sem categoria
+    total_produtos = Column(Integer, nullable=False, default=0)
+    estoque_baixo = Column(Integer, nullable=False, default=0)
+    quantidade_total = Column(BigInteger, nullable=False, default=0)
+    valor_custo = Column(Numeric(16, 2), nullable=False, default=0)
+    valor_venda = Column(Numeric(16, 2), nullable=False, default=0)
+
+
+# Bancos em que os triggers mantêm o resumo
+DIALETOS_RESUMO = ("sqlite", "postgresql")
+
+COLUNAS_GATILHO = "categoria_id, quantidade, quantidade_minima, preco_custo, preco_venda"
+
+
+def _categoria(linha: str) -> str:
+    return f"coalesce({linha}.categoria_id, 0)"
+
+
+def _ajuste(linha: str, sinal: str) -> str:
+    """
+    UPDATE que soma (+) ou subtrai (-) do resumo a contribuição de uma linha de produtos (new/old).
+    """
+    quantidade = f"coalesce({linha}.quantidade, 0)"
+    baixo = f"CASE WHEN {quantidade} < coalesce({linha}.quantidade_minima, 0) THEN 1 ELSE 0 END"
+    return (
+        f"UPDATE estoque_resumo SET "
+        f"total_produtos = total_produtos {sinal} 1, "
+        f"estoque_baixo = estoque_baixo {sinal} {baixo}, "
+        f"quantidade_total = quantidade_total {sinal} {quantidade}, "
+        f"valor_custo = valor_custo {sinal} {quantidade} * {linha}.preco_custo, "
+        f"valor_venda = valor_venda {sinal} {quantidade} * {linha}.preco_venda "
+        f"WHERE categoria_id = {_categoria(linha)}"
+    )
+
+
+def _garantir_linha(linha: str, sufixo: str = "") -> str:
+    return (
+        f"INSERT INTO estoque_resumo "
+        f"(categoria_id, total_produtos, estoque_baixo, quantidade_total, valor_custo, valor_venda) "
+        f"SELECT {_categoria(linha)}, 0, 0, 0, 0, 0{sufixo}"
+    )
+
+
+# No SQLite, um INSERT OR IGNORE dentro do trigger herdaria a política de conflito do
+# comando externo (o upsert em lote falharia): a linha é criada só quando não existe
+_SE_NAO_EXISTE = " WHERE NOT EXISTS (SELECT 1 FROM estoque_resumo WHERE categoria_id = {categoria})"
+
+
+DDL_RESUMO_SQLITE = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS estoque_resumo_ai AFTER INSERT ON produtos BEGIN
+        {_garantir_linha("new", _SE_NAO_EXISTE.format(categoria=_categoria("new")))};
+        {_ajuste("new", "+")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS estoque_resumo_ad AFTER DELETE ON produtos BEGIN
+        {_ajuste("old", "-")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS estoque_resumo_au AFTER UPDATE OF {COLUNAS_GATILHO} ON produtos BEGIN
+        {_ajuste("old", "-")};
+        {_garantir_linha("new", _SE_NAO_EXISTE.format(categoria=_categoria("new")))};
+        {_ajuste("new", "+")};
+    END
+    """,
+]
+
+DDL_RESUMO_POSTGRES = [
+    f"""
+    CREATE OR REPLACE FUNCTION estoque_resumo_atualizar() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            {_ajuste("OLD", "-")};
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            {_garantir_linha("NEW", " ON CONFLICT (categoria_id) DO NOTHING")};
+            {_ajuste("NEW", "+")};
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS estoque_resumo_produtos ON produtos",
+    f"""
+    CREATE TRIGGER estoque_resumo_produtos
+    AFTER INSERT OR DELETE OR UPDATE OF {COLUNAS_GATILHO} ON produtos
+    FOR EACH ROW EXECUTE FUNCTION estoque_resumo_atualizar()
+    """,
+]
+
+
+def agregado_produtos():
+    """
+    Os mesmos contadores calculados direto de produtos (varredura completa): usados para
+    preencher/reparar o resumo e nos bancos sem os triggers.
+    """
+    quantidade = func.coalesce(Produto.quantidade, 0)
+    categoria = func.coalesce(Produto.categoria_id, 0)
+    baixo = case((quantidade < func.coalesce(Produto.quantidade_minima, 0), 1), else_=0)
+    return select(
+        categoria.label("categoria_id"),
+        func.count().label("total_produtos"),
+        func.sum(baixo).label("estoque_baixo"),
+        func.sum(quantidade).label("quantidade_total"),
+        func.sum(quantidade * Produto.preco_custo).label("valor_custo"),
+        func.sum(quantidade * Produto.preco_venda).label("valor_venda"),
+    ).group_by(categoria)
+
+
+def origem_resumo(dialeto: str):
+    """
+    Tabela de onde ler os contadores: o resumo mantido pelos triggers ou, nos bancos
+    sem os triggers, a agregação direta (mesmas colunas).
+    """
+    if dialeto in DIALETOS_RESUMO:
+        return EstoqueResumo.__table__
+    return agregado_produtos().subquery("estoque_resumo")
+
+
+def recalcular_resumo(conn):
+    tabela = EstoqueResumo.__table__
+    conn.execute(tabela.delete())
+    conn.execute(tabela.insert().from_select([coluna.name for coluna in tabela.columns], agregado_produtos()))
+
+
+for _instrucao in DDL_RESUMO_SQLITE:
+    event.listen(Produto.__table__, "after_create", DDL(_instrucao).execute_if(dialect="sqlite"))
+
+for _instrucao in DDL_RESUMO_POSTGRES:
+    event.listen(Produto.__table__, "after_create", DDL(_instrucao).execute_if(dialect="postgresql"))
@@ -0,0 +1,93 @@
+"""
+Fotografias diárias do estoque por produto (consultas "quanto havia na data X").
+
+Cada linha é a quantidade do produto ao fim do dia `data` (UTC, o mesmo relógio de
+movimentacoes.data). Os dias são gerados em sequência por app/services/estoque_snapshots.py:
+dia anterior + movimentações do dia, então a fotografia e o delta usado nas consultas
+vêm do mesmo razão. Depois de gerada, a fotografia não é recalculada: movimentações
+gravadas, excluídas ou alteradas com data de um dia já fotografado ajustam, por triggers
+na mesma transação, as fotografias desse dia em diante.
+"""
+from sqlalchemy import DDL, Column, Date, ForeignKey, Index, Integer, event
+
+from app.database import Base
+from app.models.movimentacao import Movimentacao
+
+
+class EstoqueSnapshot(Base):
+    __tablename__ = "estoque_snapshots"
+
+    data = Column(Date, primary_key=True)
+    produto_id = Column(Integer, ForeignKey("produtos.id", ondelete="CASCADE"), primary_key=True)
+    quantidade = Column(Integer, nullable=False, default=0)
+
+
+# Exclusão de produto (ON DELETE CASCADE) sem varrer a tabela inteira
+Index("ix_estoque_snapshots_produto_id", EstoqueSnapshot.produto_id)
+
+
+COLUNAS_GATILHO = "produto_id, tipo, quantidade, data"
+
+
+def _sinal(linha: str) -> str:
+    return f"CASE WHEN {linha}.tipo = 'entrada' THEN {linha}.quantidade ELSE -{linha}.quantidade END"
+
+
+def _ajustar(linha: str, dia: str, operador: str) -> str:
+    # Fotografia do dia D = fim do dia: inclui as movimentações com data até D
+    return (
+        f"UPDATE estoque_snapshots SET quantidade = quantidade {operador} {_sinal(linha)} "
+        f"WHERE produto_id = {linha}.produto_id AND data >= {dia}"
+    )
+
+
+# SQLite: data como texto ISO (o formato do tipo Date do SQLAlchemy)
+DDL_SNAPSHOTS_SQLITE = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS estoque_snapshots_ai AFTER INSERT ON movimentacoes
+    WHEN new.data IS NOT NULL BEGIN
+        {_ajustar("new", "date(new.data)", "+")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS estoque_snapshots_ad AFTER DELETE ON movimentacoes
+    WHEN old.data IS NOT NULL BEGIN
+        {_ajustar("old", "date(old.data)", "-")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS estoque_snapshots_au AFTER UPDATE OF {COLUNAS_GATILHO} ON movimentacoes BEGIN
+        {_ajustar("old", "date(old.data)", "-")};
+        {_ajustar("new", "date(new.data)", "+")};
+    END
+    """,
+]
+
+DDL_SNAPSHOTS_POSTGRES = [
+    f"""
+    CREATE OR REPLACE FUNCTION estoque_snapshots_ajustar() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' AND OLD.data IS NOT NULL THEN
+            {_ajustar("OLD", "OLD.data::date", "-")};
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.data IS NOT NULL THEN
+            {_ajustar("NEW", "NEW.data::date", "+")};
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS estoque_snapshots_movimentacoes ON movimentacoes",
+    f"""
+    CREATE TRIGGER estoque_snapshots_movimentacoes
+    AFTER INSERT OR DELETE OR UPDATE OF {COLUNAS_GATILHO} ON movimentacoes
+    FOR EACH ROW EXECUTE FUNCTION estoque_snapshots_ajustar()
+    """,
+]
+
+
+for _instrucao in DDL_SNAPSHOTS_SQLITE:
+    event.listen(Movimentacao.__table__, "after_create", DDL(_instrucao).execute_if(dialect="sqlite"))
+
+for _instrucao in DDL_SNAPSHOTS_POSTGRES:
+    event.listen(Movimentacao.__table__, "after_create", DDL(_instrucao).execute_if(dialect="postgresql"))
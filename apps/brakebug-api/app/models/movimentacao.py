@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -9,7 +9,8 @@ class Movimentacao(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     produto_id = Column(Integer, ForeignKey("produtos.id"), nullable=False)
-    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    # Nulo nas saídas geradas por compras de clientes (não há usuário interno)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=True)
     # tipo = Column(Enum("entrada", "saida", name="tipo_enum"), nullable=False)
     tipo = Column(String(20), nullable=False)
     quantidade = Column(Integer, nullable=False)
@@ -20,4 +21,10 @@ class Movimentacao(Base):
     # Relacionamentos
     produto = relationship("Produto", back_populates="movimentacoes")
     usuario = relationship("Usuario", back_populates="movimentacoes")
-  
+
+
+# Índices dos filtros de listar_movimentacoes (produto/tipo + ORDER BY data DESC)
+# e de listar_movimentacoes_recentes (apenas ORDER BY data DESC LIMIT N)
+Index("ix_movimentacoes_produto_id_data", Movimentacao.produto_id, Movimentacao.data.desc())
+Index("ix_movimentacoes_tipo_data", Movimentacao.tipo, Movimentacao.data.desc())
+Index("ix_movimentacoes_data", Movimentacao.data.desc())
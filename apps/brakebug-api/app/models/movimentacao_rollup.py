@@ -0,0 +1,182 @@
+"""
+Totais diários de movimentações por produto e tipo (GET /api/movimentacoes/tendencias).
+
+Mantidos por triggers em movimentacoes, na mesma transação da escrita — criar_movimentacao,
+excluir_movimentacao, lote, finalizar_compra —, então os gráficos de entradas x saídas
+leem uma linha por produto/dia/tipo em vez de agregar o histórico a cada requisição.
+O dia é a data UTC de movimentacoes.data. A reconstrução a partir do histórico fica em
+app/services/rollup_movimentacoes.py (scripts/reconstruir_rollup_movimentacoes.py).
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, Column, DDL, Date, ForeignKey, Index, Integer, String, cast, event, func, select
+
+from app.database import Base
+from app.models.movimentacao import Movimentacao
+
+
+class MovimentacaoRollup(Base):
+    __tablename__ = "movimentacoes_rollup"
+
+    produto_id = Column(Integer, ForeignKey("produtos.id", ondelete="CASCADE"), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    tipo = Column(String(20), primary_key=True)
+    quantidade = Column(BigInteger, nullable=False, default=0)
+    movimentacoes = Column(Integer, nullable=False, default=0)
+
+
+# Tendência de todos os produtos (soma por dia): índice de cobertura, a soma lê só o índice
+Index(
+    "ix_movimentacoes_rollup_dia",
+    MovimentacaoRollup.dia, MovimentacaoRollup.tipo, MovimentacaoRollup.quantidade, MovimentacaoRollup.movimentacoes,
+)
+
+# Bancos em que os triggers mantêm o rollup
+DIALETOS_ROLLUP = ("sqlite", "postgresql")
+
+COLUNAS_GATILHO = "produto_id, tipo, quantidade, data"
+
+
+def _chave(linha: str, dia: str) -> str:
+    return f"produto_id = {linha}.produto_id AND dia = {dia} AND tipo = {linha}.tipo"
+
+
+# SQLite: dia como texto ISO (o formato do tipo Date do SQLAlchemy); linha criada só quando
+# não existe (INSERT OR IGNORE herdaria a política de conflito do comando externo)
+def _somar_sqlite(linha: str) -> str:
+    dia = f"date({linha}.data)"
+    return (
+        f"INSERT INTO movimentacoes_rollup (produto_id, dia, tipo, quantidade, movimentacoes) "
+        f"SELECT {linha}.produto_id, {dia}, {linha}.tipo, 0, 0 "
+        f"WHERE NOT EXISTS (SELECT 1 FROM movimentacoes_rollup WHERE {_chave(linha, dia)});\n"
+        f"        UPDATE movimentacoes_rollup SET quantidade = quantidade + {linha}.quantidade, "
+        f"movimentacoes = movimentacoes + 1 WHERE {_chave(linha, dia)}"
+    )
+
+
+def _subtrair(linha: str, dia: str) -> str:
+    return (
+        f"UPDATE movimentacoes_rollup SET quantidade = quantidade - {linha}.quantidade, "
+        f"movimentacoes = movimentacoes - 1 WHERE {_chave(linha, dia)};\n"
+        f"        DELETE FROM movimentacoes_rollup WHERE {_chave(linha, dia)} AND movimentacoes <= 0"
+    )
+
+
+DDL_ROLLUP_SQLITE = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS movimentacoes_rollup_ai AFTER INSERT ON movimentacoes
+    WHEN new.data IS NOT NULL BEGIN
+        {_somar_sqlite("new")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS movimentacoes_rollup_ad AFTER DELETE ON movimentacoes
+    WHEN old.data IS NOT NULL BEGIN
+        {_subtrair("old", "date(old.data)")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS movimentacoes_rollup_au AFTER UPDATE OF {COLUNAS_GATILHO} ON movimentacoes BEGIN
+        {_subtrair("old", "date(old.data)")};
+        INSERT INTO movimentacoes_rollup (produto_id, dia, tipo, quantidade, movimentacoes)
+        SELECT new.produto_id, date(new.data), new.tipo, 0, 0
+        WHERE new.data IS NOT NULL AND NOT EXISTS (SELECT 1 FROM movimentacoes_rollup WHERE {_chave("new", "date(new.data)")});
+        UPDATE movimentacoes_rollup SET quantidade = quantidade + new.quantidade, movimentacoes = movimentacoes + 1
+        WHERE {_chave("new", "date(new.data)")};
+    END
+    """,
+]
+
+DDL_ROLLUP_POSTGRES = [
+    f"""
+    CREATE OR REPLACE FUNCTION movimentacoes_rollup_atualizar() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' AND OLD.data IS NOT NULL THEN
+            {_subtrair("OLD", "OLD.data::date")};
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.data IS NOT NULL THEN
+            INSERT INTO movimentacoes_rollup (produto_id, dia, tipo, quantidade, movimentacoes)
+            VALUES (NEW.produto_id, NEW.data::date, NEW.tipo, NEW.quantidade, 1)
+            ON CONFLICT (produto_id, dia, tipo) DO UPDATE SET
+                quantidade = movimentacoes_rollup.quantidade + EXCLUDED.quantidade,
+                movimentacoes = movimentacoes_rollup.movimentacoes + 1;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS movimentacoes_rollup_movimentacoes ON movimentacoes",
+    f"""
+    CREATE TRIGGER movimentacoes_rollup_movimentacoes
+    AFTER INSERT OR DELETE OR UPDATE OF {COLUNAS_GATILHO} ON movimentacoes
+    FOR EACH ROW EXECUTE FUNCTION movimentacoes_rollup_atualizar()
+    """,
+]
+
+
+def dia_movimentacao(dialeto: str):
+    """
+    Dia (UTC) de movimentacoes.data no formato que o banco guarda em colunas Date
+    (no SQLite, CAST AS DATE viraria número; date() devolve o texto ISO).
+    """
+    if dialeto == "sqlite":
+        return func.date(Movimentacao.data)
+    return cast(Movimentacao.data, Date)
+
+
+def agregado_movimentacoes(dialeto: str, inicio: Optional[datetime] = None, fim: Optional[datetime] = None):
+    """
+    Os mesmos totais calculados direto de movimentacoes (data em [inicio, fim)): usados
+    para preencher/reconstruir o rollup e nos bancos sem os triggers.
+    """
+    dia = dia_movimentacao(dialeto)
+    consulta = (
+        select(
+            Movimentacao.produto_id.label("produto_id"),
+            dia.label("dia"),
+            Movimentacao.tipo.label("tipo"),
+            func.sum(Movimentacao.quantidade).label("quantidade"),
+            func.count().label("movimentacoes"),
+        )
+        .where(Movimentacao.data.is_not(None))
+        .group_by(Movimentacao.produto_id, dia, Movimentacao.tipo)
+    )
+    if inicio is not None:
+        consulta = consulta.where(Movimentacao.data >= inicio)
+    if fim is not None:
+        consulta = consulta.where(Movimentacao.data < fim)
+    return consulta
+
+
+def origem_rollup(dialeto: str):
+    """
+    Tabela de onde ler os totais diários: o rollup mantido pelos triggers ou, nos bancos
+    sem os triggers, a agregação direta (mesmas colunas).
+    """
+    if dialeto in DIALETOS_ROLLUP:
+        return MovimentacaoRollup.__table__
+    return agregado_movimentacoes(dialeto).subquery("movimentacoes_rollup")
+
+
+def recalcular_rollup(conn, inicio: Optional[datetime] = None, fim: Optional[datetime] = None):
+    """
+    Substitui os totais do intervalo [inicio, fim) (dias inteiros) pelos do histórico.
+    """
+    tabela = MovimentacaoRollup.__table__
+    remocao = tabela.delete()
+    if inicio is not None:
+        remocao = remocao.where(tabela.c.dia >= inicio.date())
+    if fim is not None:
+        remocao = remocao.where(tabela.c.dia < fim.date())
+    conn.execute(remocao)
+    conn.execute(tabela.insert().from_select(
+        [coluna.name for coluna in tabela.columns], agregado_movimentacoes(conn.dialect.name, inicio, fim)
+    ))
+
+
+for _instrucao in DDL_ROLLUP_SQLITE:
+    event.listen(Movimentacao.__table__, "after_create", DDL(_instrucao).execute_if(dialect="sqlite"))
+
+for _instrucao in DDL_ROLLUP_POSTGRES:
+    event.listen(Movimentacao.__table__, "after_create", DDL(_instrucao).execute_if(dialect="postgresql"))
@@ -8,7 +8,7 @@ class Pagamento(Base):
     __tablename__ = "pagamentos"
 
     id = Column(Integer, primary_key=True, index=True)
-    compra_id = Column(Integer, ForeignKey("compra_clientes.id"), nullable=False)
+    compra_id = Column(Integer, ForeignKey("compra_clientes.id"), nullable=False, index=True)
     cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False)
     metodo = Column(String(50), nullable=False)  # ex: "cartao", "pix", "boleto"
     # status = Column(Enum("pendente", "aprovado", "recusado", name="status_enum", native_enum=False), default="pendente")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Numeric, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Numeric, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -24,4 +24,15 @@ class Produto(Base):
     # Relacionamentos
     categoria = relationship("Categoria", back_populates="produtos")
     movimentacoes = relationship("Movimentacao", back_populates="produto")
-   
+
+
+# Listagem por categoria ordenada por nome (listar_produtos)
+Index("ix_produtos_categoria_id_nome", Produto.categoria_id, Produto.nome)
+
+# Índice parcial de /baixo-estoque: contém apenas os produtos abaixo do mínimo
+Index(
+    "ix_produtos_estoque_baixo",
+    Produto.id,
+    postgresql_where=Produto.quantidade < Produto.quantidade_minima,
+    sqlite_where=Produto.quantidade < Produto.quantidade_minima,
+)
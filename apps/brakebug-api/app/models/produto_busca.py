@@ -0,0 +1,88 @@
+"""
+Objetos de banco da busca textual de produtos (não mapeados pelo ORM).
+
+- SQLite: tabela virtual FTS5 (produtos_fts) com conteúdo externo em produtos,
+  tokenizer unicode61 sem acentos e triggers que mantêm o índice em sincronia.
+- Postgres: configuração "portugues_sem_acento" (unaccent + stemmer português),
+  coluna gerada produtos.busca_vetor (tsvector) e índice GIN.
+
+Bancos existentes recebem esses objetos pela migração c52e8f3a9d14; os eventos
+abaixo cobrem o create_all (python -m app.bootstrap criar, scripts de benchmark).
+"""
+from sqlalchemy import DDL, event
+
+from app.models.produto import Produto
+
+CONFIG_BUSCA = "portugues_sem_acento"
+
+DDL_BUSCA_SQLITE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS produtos_fts USING fts5(
+        nome, codigo_sku, descricao,
+        content='produtos', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS produtos_fts_ai AFTER INSERT ON produtos BEGIN
+        INSERT INTO produtos_fts(rowid, nome, codigo_sku, descricao)
+        VALUES (new.id, new.nome, new.codigo_sku, new.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS produtos_fts_ad AFTER DELETE ON produtos BEGIN
+        INSERT INTO produtos_fts(produtos_fts, rowid, nome, codigo_sku, descricao)
+        VALUES ('delete', old.id, old.nome, old.codigo_sku, old.descricao);
+    END
+    """,
+    # Apenas alterações nos campos pesquisáveis reindexam (movimentações de estoque não)
+    """
+    CREATE TRIGGER IF NOT EXISTS produtos_fts_au AFTER UPDATE OF nome, codigo_sku, descricao ON produtos BEGIN
+        INSERT INTO produtos_fts(produtos_fts, rowid, nome, codigo_sku, descricao)
+        VALUES ('delete', old.id, old.nome, old.codigo_sku, old.descricao);
+        INSERT INTO produtos_fts(rowid, nome, codigo_sku, descricao)
+        VALUES (new.id, new.nome, new.codigo_sku, new.descricao);
+    END
+    """,
+    "INSERT INTO produtos_fts(produtos_fts) VALUES ('rebuild')",
+]
+
+DDL_BUSCA_POSTGRES = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{CONFIG_BUSCA}') THEN
+            CREATE TEXT SEARCH CONFIGURATION {CONFIG_BUSCA} (COPY = portuguese);
+            ALTER TEXT SEARCH CONFIGURATION {CONFIG_BUSCA}
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+        END IF;
+    END
+    $$
+    """,
+    # Coluna gerada: o Postgres recalcula o vetor em todo INSERT/UPDATE (nome e SKU pesam mais)
+    f"""
+    ALTER TABLE produtos ADD COLUMN IF NOT EXISTS busca_vetor tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{CONFIG_BUSCA}'::regconfig, coalesce(nome, '')), 'A') ||
+        setweight(to_tsvector('{CONFIG_BUSCA}'::regconfig, coalesce(codigo_sku, '')), 'A') ||
+        setweight(to_tsvector('{CONFIG_BUSCA}'::regconfig, coalesce(descricao, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_produtos_busca ON produtos USING GIN (busca_vetor)",
+]
+
+# Objetos ignorados pelo autogenerate do alembic (não fazem parte do Base.metadata)
+OBJETOS_BUSCA = {"produtos_fts", "busca_vetor", "ix_produtos_busca"}
+
+
+for _instrucao in DDL_BUSCA_SQLITE:
+    event.listen(Produto.__table__, "after_create", DDL(_instrucao).execute_if(dialect="sqlite"))
+
+for _instrucao in DDL_BUSCA_POSTGRES:
+    event.listen(Produto.__table__, "after_create", DDL(_instrucao).execute_if(dialect="postgresql"))
+
+# A tabela FTS5 de conteúdo externo não pode sobreviver à tabela produtos
+event.listen(
+    Produto.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS produtos_fts").execute_if(dialect="sqlite"),
+)
@@ -18,9 +18,9 @@ class Usuario(Base):
     data_criacao = Column(DateTime, default=datetime.utcnow)
     ultimo_login = Column(DateTime, nullable=True)
 
-    # @property
-    # def is_admin(self):
-    #     return self.nivel_acesso == "admin"
+    # Mesmo contrato do User do assurelog (as rotas de relatórios chamam current_user.is_admin())
+    def is_admin(self) -> bool:
+        return self.nivel_acesso == "admin"
 
     
     # Relacionamentos
@@ -0,0 +1,56 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+
+from app.database import AsyncSessionLocal
+from app.models.usuario import Usuario
+from app.services.alertas_estoque import monitor_alertas
+from app.services.auth import get_current_user
+
+router = APIRouter()
+
+# EventSource não envia cabeçalhos: o token também é aceito na query string
+oauth2_opcional = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+
+
+async def usuario_do_stream(
+    token_cabecalho: Optional[str] = Depends(oauth2_opcional),
+    token: Optional[str] = Query(None, description="JWT de acesso (para EventSource, que não envia Authorization)"),
+) -> Usuario:
+    if not (token_cabecalho or token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Credenciais inválidas",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Sessão própria, fechada antes do stream: a conexão não fica presa enquanto o cliente está conectado
+    async with AsyncSessionLocal() as db:
+        return await get_current_user(token_cabecalho or token, db)
+
+
+@router.get("/estoque")
+async def stream_alertas_estoque(
+    ultimo_id: Optional[int] = Query(None, ge=0, description="Cursor de replay (alternativa ao cabeçalho Last-Event-ID)"),
+    last_event_id: Optional[str] = Header(None),
+    current_user: Usuario = Depends(usuario_do_stream),
+):
+    """
+    Stream SSE dos cruzamentos do estoque mínimo (eventos `estoque_baixo` e `estoque_normalizado`).
+
+    Sem cursor, o primeiro evento é um `snapshot` com os produtos em estoque baixo
+    (`truncado: true` quando há mais que o limite do snapshot); ao reconectar, o
+    navegador envia Last-Event-ID e recebe apenas os eventos perdidos.
+    """
+    if last_event_id is not None:
+        try:
+            ultimo_id = int(last_event_id)
+        except ValueError:
+            ultimo_id = None
+
+    return StreamingResponse(
+        monitor_alertas.assinar(ultimo_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,39 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.models.categoria import Categoria
+from app.models.produto import Produto
 from app.models.usuario import Usuario
 from app.schemas.categoria import CategoriaCreate, CategoriaUpdate, Categoria as CategoriaSchema
 from app.services.auth import get_current_user
+from app.utils.paginacao import OrdemKeyset
 
 router = APIRouter()
 
+ORDEM_CATEGORIAS = OrdemKeyset("categorias", Categoria.id)
+
 @router.get("/", response_model=List[CategoriaSchema])
 async def listar_categorias(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
-    Lista todas as categorias
+    Lista todas as categorias.
+    A próxima página é indicada pelo cabeçalho X-Next-Cursor (use ?cursor= em vez de skip).
     """
-    categorias = db.query(Categoria).offset(skip).limit(limit).all()
+    query = ORDEM_CATEGORIAS.aplicar(select(Categoria), cursor)
+    if not cursor:
+        query = query.offset(skip)
+
+    result = await db.execute(query.limit(limit))
+    categorias = result.scalars().all()
+    ORDEM_CATEGORIAS.definir_proximo(response, categorias, limit)
     return categorias
 
 @router.post("/", response_model=CategoriaSchema, status_code=status.HTTP_201_CREATED)
 async def criar_categoria(
     categoria: CategoriaCreate, 
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Cria uma nova categoria
     """
     # Verificar se já existe uma categoria com o mesmo nome
-    db_categoria = db.query(Categoria).filter(Categoria.nome == categoria.nome).first()
+    db_categoria = await db.scalar(select(Categoria).where(Categoria.nome == categoria.nome))
     if db_categoria:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,8 +61,8 @@ async def criar_categoria(
     )
     
     db.add(db_categoria)
-    db.commit()
-    db.refresh(db_categoria)
+    await db.commit()
+    await db.refresh(db_categoria)
     
     return db_categoria
 
@@ -56,12 +70,12 @@ async def criar_categoria(
 async def obter_categoria(
     categoria_id: int, 
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Obtém uma categoria pelo ID
     """
-    categoria = db.query(Categoria).filter(Categoria.id == categoria_id).first()
+    categoria = await db.get(Categoria, categoria_id)
     if categoria is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -75,12 +89,12 @@ async def atualizar_categoria(
     categoria_id: int, 
     categoria_update: CategoriaUpdate, 
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Atualiza uma categoria pelo ID
     """
-    categoria = db.query(Categoria).filter(Categoria.id == categoria_id).first()
+    categoria = await db.get(Categoria, categoria_id)
     if categoria is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -89,7 +103,7 @@ async def atualizar_categoria(
     
     # Verificar se o novo nome já existe (se for diferente do atual)
     if categoria_update.nome is not None and categoria_update.nome != categoria.nome:
-        db_categoria = db.query(Categoria).filter(Categoria.nome == categoria_update.nome).first()
+        db_categoria = await db.scalar(select(Categoria).where(Categoria.nome == categoria_update.nome))
         if db_categoria:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -103,8 +117,8 @@ async def atualizar_categoria(
     if categoria_update.descricao is not None:
         categoria.descricao = categoria_update.descricao
     
-    db.commit()
-    db.refresh(categoria)
+    await db.commit()
+    await db.refresh(categoria)
     
     return categoria
 
@@ -112,12 +126,12 @@ async def atualizar_categoria(
 async def excluir_categoria(
     categoria_id: int, 
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Exclui uma categoria pelo ID
     """
-    categoria = db.query(Categoria).filter(Categoria.id == categoria_id).first()
+    categoria = await db.get(Categoria, categoria_id)
     if categoria is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -125,13 +139,16 @@ async def excluir_categoria(
         )
     
     # Verificar se existem produtos associados a esta categoria
-    if categoria.produtos:
+    produto_associado = await db.scalar(
+        select(Produto.id).where(Produto.categoria_id == categoria_id).limit(1)
+    )
+    if produto_associado is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Não é possível excluir categoria com produtos associados"
         )
     
-    db.delete(categoria)
-    db.commit()
+    await db.delete(categoria)
+    await db.commit()
     
     return None
@@ -1,41 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.models.clientes import Cliente as ClienteModel
 from app.schemas.clientes import ClienteCreate, ClienteUpdate, ClienteResponse as ClienteSchema
 from app.models.usuario import Usuario
 from app.services.auth import get_current_user
+from app.utils.paginacao import OrdemKeyset
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 router = APIRouter()
 
+ORDEM_CLIENTES = OrdemKeyset("clientes", ClienteModel.id)
+
 # ----------------------------
 # LISTAR CLIENTES
 # ----------------------------
 @router.get("/", response_model=List[ClienteSchema])
 async def listar_clientes(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     search: Optional[str] = None,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
-    Lista todos os clientes com opção de filtro por nome ou email
+    Lista todos os clientes com opção de filtro por nome ou email.
+    A próxima página é indicada pelo cabeçalho X-Next-Cursor (use ?cursor= em vez de skip).
     """
-    query = db.query(ClienteModel)
+    query = select(ClienteModel)
 
     if search:
         search_term = f"%{search}%"
-        query = query.filter(
+        query = query.where(
             (ClienteModel.nome.ilike(search_term)) | (ClienteModel.email.ilike(search_term))
         )
 
-    clientes = query.offset(skip).limit(limit).all()
+    query = ORDEM_CLIENTES.aplicar(query, cursor)
+    if not cursor:
+        query = query.offset(skip)
+
+    result = await db.execute(query.limit(limit))
+    clientes = result.scalars().all()
+    ORDEM_CLIENTES.definir_proximo(response, clientes, limit)
     return clientes
 
 # ----------------------------
@@ -45,24 +59,24 @@ async def listar_clientes(
 async def criar_cliente(
     cliente: ClienteCreate,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Cria um novo cliente.
     Apenas usuários autenticados podem criar clientes.
     """
     # Verificar se o email já existe
-    db_cliente = db.query(ClienteModel).filter(ClienteModel.email == cliente.email).first()
+    db_cliente = await db.scalar(select(ClienteModel).where(ClienteModel.email == cliente.email))
     if db_cliente:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Já existe um cliente com este email.")
 
-    # Hash da senha
-    hashed_password = pwd_context.hash(cliente.senha)
+    # Hash da senha (bcrypt é CPU-bound, roda fora do event loop)
+    hashed_password = await run_in_threadpool(pwd_context.hash, cliente.senha)
 
     novo_cliente = ClienteModel(**cliente.dict(exclude={"senha"}), senha_hash=hashed_password)
     db.add(novo_cliente)
-    db.commit()
-    db.refresh(novo_cliente)
+    await db.commit()
+    await db.refresh(novo_cliente)
 
     return novo_cliente
 
@@ -73,9 +87,9 @@ async def criar_cliente(
 async def obter_cliente(
     cliente_id: int,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    cliente = db.query(ClienteModel).filter(ClienteModel.id == cliente_id).first()
+    cliente = await db.get(ClienteModel, cliente_id)
     if not cliente:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado.")
     return cliente
@@ -88,28 +102,28 @@ async def atualizar_cliente(
     cliente_id: int,
     cliente_update: ClienteUpdate,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    cliente = db.query(ClienteModel).filter(ClienteModel.id == cliente_id).first()
+    cliente = await db.get(ClienteModel, cliente_id)
     if not cliente:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado.")
 
     # Verificar se o novo email já está sendo usado
     if cliente_update.email and cliente_update.email != cliente.email:
-        existe_email = db.query(ClienteModel).filter(ClienteModel.email == cliente_update.email).first()
+        existe_email = await db.scalar(select(ClienteModel).where(ClienteModel.email == cliente_update.email))
         if existe_email:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email já cadastrado para outro cliente.")
 
     # Atualiza campos
     update_data = cliente_update.dict(exclude_unset=True)
     if "senha" in update_data and update_data["senha"]:
-        update_data["senha_hash"] = pwd_context.hash(update_data.pop("senha"))
+        update_data["senha_hash"] = await run_in_threadpool(pwd_context.hash, update_data.pop("senha"))
 
     for key, value in update_data.items():
         setattr(cliente, key, value)
 
-    db.commit()
-    db.refresh(cliente)
+    await db.commit()
+    await db.refresh(cliente)
     return cliente
 
 # ----------------------------
@@ -119,12 +133,12 @@ async def atualizar_cliente(
 async def deletar_cliente(
     cliente_id: int,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    cliente = db.query(ClienteModel).filter(ClienteModel.id == cliente_id).first()
+    cliente = await db.get(ClienteModel, cliente_id)
     if not cliente:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado.")
 
-    db.delete(cliente)
-    db.commit()
+    await db.delete(cliente)
+    await db.commit()
     return None
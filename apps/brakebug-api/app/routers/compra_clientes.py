@@ -1,22 +1,38 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import select
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app import models, schemas
 from app.models.compra_clientes import CompraCliente
 from app.models.compra_itens import CompraItem
-from app.models.produto import Produto
 from app.models.movimentacao import Movimentacao
 from app.schemas.compra_clientes import CompraClienteCreate, CompraClienteResponse
+from app.services.alertas_estoque import monitor_alertas
 from app.services.auth_cliente import get_current_cliente
+from app.services.cache_catalogo import publicar_versao_catalogo
+from app.services.estoque import baixar_estoque, situacao_estoque
+from app.utils.consultas_sql import orcamento_consultas
 
 router = APIRouter(tags=["Compras"])
 
+
+async def _obter_compra_com_itens(db: AsyncSession, compra_id: int):
+    """
+    Busca uma compra já carregando os itens (selectinload) para serialização.
+    """
+    return await db.scalar(
+        select(CompraCliente)
+        .options(selectinload(CompraCliente.itens))
+        .where(CompraCliente.id == compra_id)
+    )
+
 @router.post("/", response_model=CompraClienteResponse, status_code=status.HTTP_201_CREATED)
-def finalizar_compra(
+async def finalizar_compra(
     compra: CompraClienteCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     cliente = Depends(get_current_cliente)
 ):
     """
@@ -27,6 +43,24 @@ def finalizar_compra(
     if not compra.itens or len(compra.itens) == 0:
         raise HTTPException(status_code=400, detail="A compra deve conter pelo menos um item.")
 
+    if any(item.quantidade <= 0 for item in compra.itens):
+        raise HTTPException(status_code=400, detail="A quantidade de cada item deve ser maior que zero.")
+
+    # Baixa do estoque primeiro, um UPDATE condicional por item (sem ler o produto antes).
+    # Em ordem de produto_id: compras concorrentes travam as linhas na mesma ordem (sem deadlock)
+    for item in sorted(compra.itens, key=lambda item: item.produto_id):
+        if await baixar_estoque(db, item.produto_id, item.quantidade) is None:
+            situacao = await situacao_estoque(db, item.produto_id)
+            if situacao is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Produto com ID {item.produto_id} não encontrado"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Estoque insuficiente para o produto '{situacao.nome}'. Disponível: {situacao.quantidade}"
+            )
+
     # Criar o registro da compra
     nova_compra = CompraCliente(
         cliente_id=cliente.id,
@@ -34,9 +68,9 @@ def finalizar_compra(
         valor_total=compra.total
     )
     db.add(nova_compra)
-    db.flush()  # gera o ID da compra antes de adicionar itens
+    await db.flush()  # gera o ID da compra antes de adicionar itens
 
-    # Para cada item comprado, criar o registro e gerar movimentação de saída
+    # Para cada item comprado, criar o registro e a movimentação de saída
     for item in compra.itens:
         # Salvar item da compra
         novo_item = CompraItem(
@@ -48,22 +82,6 @@ def finalizar_compra(
         )
         db.add(novo_item)
 
-        # Atualizar estoque do produto
-        produto = db.query(Produto).filter(Produto.id == item.produto_id).first()
-        if not produto:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Produto com ID {item.produto_id} não encontrado"
-            )
-
-        if produto.quantidade < item.quantidade:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Estoque insuficiente para o produto '{produto.nome}'. Disponível: {produto.quantidade}"
-            )
-
-        produto.quantidade -= item.quantidade
-
         # Criar movimentação de saída
         movimentacao = Movimentacao(
             produto_id=item.produto_id,
@@ -75,41 +93,50 @@ def finalizar_compra(
         )
         db.add(movimentacao)
 
-    db.commit()
-    db.refresh(nova_compra)
+    await db.commit()
+    # Estoque alterado: invalida as respostas em cache do catálogo (fora da transação da venda)
+    await publicar_versao_catalogo(db)
+    # Vendas que levaram produtos abaixo do mínimo: alerta imediato aos assinantes
+    monitor_alertas.notificar()
 
-    return nova_compra
+    # Recarrega a compra com os itens (evita lazy load fora do contexto async)
+    return await _obter_compra_com_itens(db, nova_compra.id)
 
 
-@router.get("/", response_model=list[CompraClienteResponse])
-def listar_compras(db: Session = Depends(get_db)):
+@router.get(
+    "/",
+    response_model=list[CompraClienteResponse],
+    # compras + itens (selectinload): continua em 2 consultas independente do volume
+    dependencies=[Depends(orcamento_consultas(2, repeticoes=1))],
+)
+async def listar_compras(db: AsyncSession = Depends(get_async_read_db)):
     """
     Lista todas as compras registradas.
     """
-    compras = db.query(CompraCliente).all()
-    return compras
+    result = await db.execute(select(CompraCliente).options(selectinload(CompraCliente.itens)))
+    return result.scalars().all()
 
 
 @router.get("/{compra_id}", response_model=CompraClienteResponse)
-def obter_compra(compra_id: int, db: Session = Depends(get_db)):
+async def obter_compra(compra_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """
     Obtém os detalhes de uma compra específica.
     """
-    compra = db.query(CompraCliente).filter(CompraCliente.id == compra_id).first()
+    compra = await _obter_compra_com_itens(db, compra_id)
     if not compra:
         raise HTTPException(status_code=404, detail="Compra não encontrada")
     return compra
 
 
 @router.delete("/{compra_id}")
-def deletar_compra(compra_id: int, db: Session = Depends(get_db)):
+async def deletar_compra(compra_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Remove uma compra e (opcionalmente) pode reverter as movimentações associadas.
     """
-    compra = db.query(CompraCliente).filter(CompraCliente.id == compra_id).first()
+    compra = await db.get(CompraCliente, compra_id)
     if not compra:
         raise HTTPException(status_code=404, detail="Compra não encontrada")
 
-    db.delete(compra)
-    db.commit()
+    await db.delete(compra)
+    await db.commit()
     return {"message": "Compra removida com sucesso"}
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from decimal import Decimal
+
+from app.database import get_async_read_db
+from app.models.categoria import Categoria
+from app.models.estoque_resumo import origem_resumo
+from app.models.movimentacao import Movimentacao
+from app.models.produto import Produto
+from app.models.usuario import Usuario
+from app.schemas.dashboard import Dashboard
+from app.services.auth import get_current_user
+from app.utils.consultas_sql import orcamento_consultas
+
+router = APIRouter()
+
+
+@router.get(
+    "/",
+    response_model=Dashboard,
+    # autenticação + resumo + estoque baixo + movimentações, independente do tamanho do catálogo
+    dependencies=[Depends(orcamento_consultas(4, repeticoes=1))],
+)
+async def obter_dashboard(
+    limite_estoque_baixo: int = Query(10, ge=0, le=100),
+    limite_movimentacoes: int = Query(10, ge=0, le=100),
+    current_user: Usuario = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Retorna em uma chamada os totais do estoque (SKUs, estoque baixo, valor a custo e
+    a venda), os totais por categoria, os produtos abaixo do mínimo e as últimas movimentações
+    """
+    resumo = origem_resumo(db.get_bind().dialect.name)
+    result = await db.execute(
+        select(resumo, Categoria.nome)
+        .outerjoin(Categoria, Categoria.id == resumo.c.categoria_id)
+        .where(resumo.c.total_produtos > 0)
+        .order_by(resumo.c.categoria_id)
+    )
+    categorias = [
+        {**linha._mapping, "categoria_id": linha.categoria_id or None}
+        for linha in result
+    ]
+
+    estoque_baixo = []
+    if limite_estoque_baixo:
+        # Usa o índice parcial ix_produtos_estoque_baixo
+        result = await db.execute(
+            select(Produto.id, Produto.nome, Produto.codigo_sku, Produto.quantidade, Produto.quantidade_minima)
+            .where(Produto.quantidade < Produto.quantidade_minima)
+            .order_by(Produto.id)
+            .limit(limite_estoque_baixo)
+        )
+        estoque_baixo = [dict(linha._mapping) for linha in result]
+
+    movimentacoes = []
+    if limite_movimentacoes:
+        result = await db.execute(
+            select(
+                Movimentacao.id, Movimentacao.produto_id, Produto.nome.label("produto_nome"),
+                Movimentacao.tipo, Movimentacao.quantidade, Movimentacao.data,
+            )
+            .join(Produto, Produto.id == Movimentacao.produto_id)
+            .order_by(Movimentacao.data.desc(), Movimentacao.id.desc())
+            .limit(limite_movimentacoes)
+        )
+        movimentacoes = [dict(linha._mapping) for linha in result]
+
+    return {
+        "total_produtos": sum(c["total_produtos"] for c in categorias),
+        "total_estoque_baixo": sum(c["estoque_baixo"] for c in categorias),
+        "quantidade_total": sum(c["quantidade_total"] for c in categorias),
+        "valor_estoque_custo": sum((Decimal(str(c["valor_custo"])) for c in categorias), Decimal("0.00")),
+        "valor_estoque_venda": sum((Decimal(str(c["valor_venda"])) for c in categorias), Decimal("0.00")),
+        "categorias": categorias,
+        "estoque_baixo": estoque_baixo,
+        "movimentacoes_recentes": movimentacoes,
+    }
@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, Query, status
+
+from app.config import settings
+from app.database import estatisticas_pool
+from app.models.usuario import Usuario
+from app.services.alertas_estoque import monitor_alertas
+from app.services.auth import check_admin_user
+from app.services.cache_catalogo import cache_catalogo
+from app.services.estoque_snapshots import agendador_snapshots
+from app.utils.compressao import CODIFICACOES, cache_compressao, metricas_compressao
+from app.utils.consultas_lentas import consultas_lentas
+from app.utils.consultas_sql import metricas_rotas
+
+router = APIRouter()
+
+@router.get("/pool")
+async def obter_metricas_pool(
+    current_user: Usuario = Depends(check_admin_user)
+):
+    """
+    Retorna as métricas dos pools de conexão (em uso, overflow e tempo de espera)
+    """
+    return {"pools": estatisticas_pool()}
+
+
+@router.get("/consultas")
+async def obter_metricas_consultas(
+    current_user: Usuario = Depends(check_admin_user)
+):
+    """
+    Retorna a quantidade média/máxima de consultas SQL por rota (rotas com N+1 aparecem primeiro)
+    """
+    return {"rotas": metricas_rotas.resumo()}
+
+
+@router.get("/consultas-lentas")
+async def listar_consultas_lentas(
+    limite: int = Query(50, ge=1, le=500),
+    current_user: Usuario = Depends(check_admin_user)
+):
+    """
+    Lista as consultas mais recentes acima de SLOW_QUERY_MS, com rota, handler e plano (EXPLAIN)
+    """
+    return {
+        "limite_ms": settings.SLOW_QUERY_MS,
+        "consultas": consultas_lentas.listar(limite),
+    }
+
+
+@router.delete("/consultas-lentas", status_code=status.HTTP_204_NO_CONTENT)
+async def limpar_consultas_lentas(
+    current_user: Usuario = Depends(check_admin_user)
+):
+    """
+    Limpa o buffer em memória (o arquivo rotativo é mantido)
+    """
+    consultas_lentas.limpar()
+
+
+@router.get("/cache-catalogo")
+async def obter_metricas_cache_catalogo(
+    current_user: Usuario = Depends(check_admin_user)
+):
+    """
+    Retorna acertos (corpo em memória), 304 e falhas do cache do catálogo neste worker
+    """
+    return cache_catalogo.resumo()
+
+
+@router.get("/alertas-estoque")
+async def obter_metricas_alertas_estoque(
+    current_user: Usuario = Depends(check_admin_user)
+):
+    """
+    Retorna assinantes conectados, posição do leitor e eventos entregues pelo stream de alertas neste worker
+    """
+    return monitor_alertas.resumo()
+
+
+@router.get("/snapshots-estoque")
+async def obter_situacao_snapshots_estoque(
+    current_user: Usuario = Depends(check_admin_user)
+):
+    """
+    Retorna o último dia fotografado, a última execução e as falhas da geração das fotografias do estoque neste worker
+    """
+    return agendador_snapshots.resumo()
+
+
+@router.get("/compressao")
+async def obter_metricas_compressao(
+    current_user: Usuario = Depends(check_admin_user)
+):
+    """
+    Retorna, por rota, bytes antes/depois da compressão, razão e tempo de CPU gasto comprimindo neste worker
+    """
+    return {
+        "codificacoes": list(CODIFICACOES),
+        "corpos_em_cache": len(cache_compressao),
+        "rotas": metricas_compressao.resumo(),
+    }
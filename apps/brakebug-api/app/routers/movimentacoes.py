@@ -1,72 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
 from datetime import datetime, date
-from sqlalchemy import desc
+from sqlalchemy import desc, select
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.models.movimentacao import Movimentacao
-from app.models.produto import Produto
 from app.models.usuario import Usuario
 from app.schemas.movimentacao import MovimentacaoCreate, MovimentacaoUpdate, Movimentacao as MovimentacaoSchema
+from app.schemas.movimentacao import MovimentacaoLote, MovimentacaoLoteResultado, TendenciaMovimentacoes
+from app.services.alertas_estoque import monitor_alertas
 from app.services.auth import get_current_user
+from app.services.cache_catalogo import publicar_versao_catalogo
+from app.services.estoque import alterar_estoque, situacao_estoque
+from app.services.exportacao_movimentacoes import FORMATOS, exportar_movimentacoes, filtrar_movimentacoes
+from app.services.movimentacoes_lote import gravar_movimentacoes
+from app.services.rollup_movimentacoes import tendencias
+from app.utils.consultas_sql import orcamento_consultas
+from app.utils.paginacao import OrdemKeyset
 
 router = APIRouter()
 
+ORDEM_MOVIMENTACOES = OrdemKeyset("movimentacoes", Movimentacao.data, Movimentacao.id, descendente=True)
+
 @router.get("/", response_model=List[MovimentacaoSchema])
 async def listar_movimentacoes(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
     produto_id: Optional[int] = None,
     tipo: Optional[str] = None,
     data_inicio: Optional[date] = None,
     data_fim: Optional[date] = None,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
-    Lista todas as movimentações com opções de filtro
+    Lista todas as movimentações com opções de filtro.
+    A próxima página é indicada pelo cabeçalho X-Next-Cursor (use ?cursor= em vez de skip).
     """
-    query = db.query(Movimentacao)
-    
-    # Aplicar filtros se fornecidos
-    if produto_id:
-        query = query.filter(Movimentacao.produto_id == produto_id)
-    
-    if tipo:
-        query = query.filter(Movimentacao.tipo == tipo)
-    
-    if data_inicio:
-        query = query.filter(Movimentacao.data >= datetime.combine(data_inicio, datetime.min.time()))
+    # Aplicar filtros se fornecidos (os mesmos da exportação)
+    query = filtrar_movimentacoes(select(Movimentacao), produto_id, tipo, data_inicio, data_fim)
     
-    if data_fim:
-        query = query.filter(Movimentacao.data <= datetime.combine(data_fim, datetime.max.time()))
-    
-    
-    # Ordenar por data (mais recente primeiro)
-    query = query.order_by(desc(Movimentacao.data))
+    # Ordenar por data (mais recente primeiro) e continuar após o cursor, se informado
+    query = ORDEM_MOVIMENTACOES.aplicar(query, cursor)
+    if not cursor:
+        query = query.offset(skip)
     
     # Aplicar paginação
-    movimentacoes = query.offset(skip).limit(limit).all()
+    result = await db.execute(query.limit(limit))
+    movimentacoes = result.scalars().all()
+    ORDEM_MOVIMENTACOES.definir_proximo(response, movimentacoes, limit)
     return movimentacoes
 
 @router.post("/", response_model=MovimentacaoSchema, status_code=status.HTTP_201_CREATED)
 async def criar_movimentacao(
     movimentacao: MovimentacaoCreate, 
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Cria uma nova movimentação de estoque
     """
-    # Verificar se o produto existe
-    produto = db.query(Produto).filter(Produto.id == movimentacao.produto_id).first()
-    if not produto:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Produto não encontrado"
-        ) 
-    
     # Verificar se a quantidade é válida
     if movimentacao.quantidade <= 0:
         raise HTTPException(
@@ -74,11 +73,18 @@ async def criar_movimentacao(
             detail="A quantidade deve ser maior que zero"
         )
     
-    # Verificar estoque disponível para saídas
-    if movimentacao.tipo == "saida" and produto.quantidade < movimentacao.quantidade:
+    # Atualizar estoque do produto: saídas só baixam se houver saldo (UPDATE condicional atômico)
+    delta = movimentacao.quantidade if movimentacao.tipo == "entrada" else -movimentacao.quantidade
+    if await alterar_estoque(db, movimentacao.produto_id, delta) is None:
+        situacao = await situacao_estoque(db, movimentacao.produto_id)
+        if situacao is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Produto não encontrado"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Estoque insuficiente. Disponível: {produto.quantidade}"
+            detail=f"Estoque insuficiente. Disponível: {situacao.quantidade}"
         )
     
     # Criar nova movimentação
@@ -91,28 +97,101 @@ async def criar_movimentacao(
         observacoes=movimentacao.observacoes
     )
     
-    # Atualizar estoque do produto
-    if movimentacao.tipo == "entrada":
-        produto.quantidade += movimentacao.quantidade
-    else:  # saida
-        produto.quantidade -= movimentacao.quantidade
-    
     db.add(db_movimentacao)
-    db.commit()
-    db.refresh(db_movimentacao)
+    await db.commit()
+    await publicar_versao_catalogo(db)
+    # Cruzamentos do mínimo já gravados pelo trigger: entrega imediata aos assinantes
+    monitor_alertas.notificar()
+    await db.refresh(db_movimentacao)
     
     return db_movimentacao
 
+@router.post(
+    "/batch",
+    response_model=MovimentacaoLoteResultado,
+    # Número fixo de comandos por lote, independente do número de linhas
+    dependencies=[Depends(orcamento_consultas(8, repeticoes=1))],
+)
+async def criar_movimentacoes_em_lote(
+    lote: MovimentacaoLote,
+    somente_erros: bool = False,
+    current_user: Usuario = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Registra várias entradas/saídas (recebimento, separação) numa transação: produtos
+    validados com uma consulta, estoque ajustado com um UPDATE e movimentações gravadas
+    com um INSERT em massa. Tudo ou nada por padrão; parcial=true grava as linhas válidas
+    (somente_erros=true omite as linhas gravadas)
+    """
+    inicio = time.perf_counter()
+    resultado = await gravar_movimentacoes(db, lote, current_user.id)
+    if resultado["gravadas"]:
+        monitor_alertas.notificar()
+
+    linhas = resultado["resultados"]
+    return {
+        "total": len(linhas),
+        "gravadas": resultado["gravadas"],
+        "erros": len(linhas) - resultado["gravadas"],
+        "tempo_ms": round((time.perf_counter() - inicio) * 1000, 1),
+        "estoques": resultado["estoques"],
+        "linhas": [linha for linha in linhas if linha["status"] == "erro"] if somente_erros else linhas,
+    }
+
+# Declaradas antes de /{movimentacao_id} para não serem capturadas pela rota com parâmetro
+@router.get("/export", response_class=StreamingResponse)
+async def exportar_historico(
+    formato: Literal["csv", "ndjson"] = "csv",
+    produto_id: Optional[int] = None,
+    tipo: Optional[str] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    current_user: Usuario = Depends(get_current_user),
+):
+    """
+    Exporta as movimentações filtradas (mesmos filtros da listagem, sem paginação) em CSV
+    ou NDJSON, em ordem cronológica. O arquivo é enviado em blocos à medida que as linhas
+    chegam do banco (cursor do lado do servidor), sem carregar o resultado em memória
+    """
+    sufixo = "_".join(str(data) for data in (data_inicio, data_fim) if data) or datetime.utcnow().date().isoformat()
+    return StreamingResponse(
+        exportar_movimentacoes(formato, produto_id=produto_id, tipo=tipo, data_inicio=data_inicio, data_fim=data_fim),
+        media_type=FORMATOS[formato],
+        headers={"Content-Disposition": f'attachment; filename="movimentacoes-{sufixo}.{formato}"'},
+    )
+
+@router.get(
+    "/tendencias",
+    response_model=TendenciaMovimentacoes,
+    # Uma consulta ao rollup diário, independente do número de movimentações do período
+    dependencies=[Depends(orcamento_consultas(4, repeticoes=1))],
+)
+async def obter_tendencias(
+    granularidade: Literal["dia", "semana", "mes"] = "dia",
+    data_inicio: Optional[date] = Query(None, description="Primeiro dia (UTC); padrão: 30 dias, 12 semanas ou 12 meses antes de data_fim"),
+    data_fim: Optional[date] = Query(None, description="Último dia (UTC), inclusive; padrão: hoje"),
+    produto_id: Optional[int] = None,
+    categoria_id: Optional[int] = None,
+    current_user: Usuario = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Entradas, saídas e saldo por dia, semana ou mês (gráficos de tendência), somados dos
+    totais diários mantidos junto com cada movimentação
+    """
+    return await tendencias(db, granularidade, data_inicio, data_fim, produto_id, categoria_id)
+
 @router.get("/{movimentacao_id}", response_model=MovimentacaoSchema)
 async def obter_movimentacao(
     movimentacao_id: int, 
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Obtém uma movimentação pelo ID
     """
-    movimentacao = db.query(Movimentacao).filter(Movimentacao.id == movimentacao_id).first()
+    movimentacao = await db.get(Movimentacao, movimentacao_id)
     if movimentacao is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -126,12 +205,12 @@ async def atualizar_movimentacao(
     movimentacao_id: int, 
     movimentacao_update: MovimentacaoUpdate, 
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Atualiza uma movimentação pelo ID (apenas observações)
     """
-    movimentacao = db.query(Movimentacao).filter(Movimentacao.id == movimentacao_id).first()
+    movimentacao = await db.get(Movimentacao, movimentacao_id)
     if movimentacao is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -142,8 +221,8 @@ async def atualizar_movimentacao(
     if movimentacao_update.observacoes is not None:
         movimentacao.observacoes = movimentacao_update.observacoes
     
-    db.commit()
-    db.refresh(movimentacao)
+    await db.commit()
+    await db.refresh(movimentacao)
     
     return movimentacao
 
@@ -151,7 +230,7 @@ async def atualizar_movimentacao(
 async def excluir_movimentacao(
     movimentacao_id: int, 
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Exclui uma movimentação pelo ID e reverte o estoque
@@ -163,22 +242,21 @@ async def excluir_movimentacao(
             detail="Apenas administradores podem excluir movimentações"
         )
     
-    movimentacao = db.query(Movimentacao).filter(Movimentacao.id == movimentacao_id).first()
+    movimentacao = await db.get(Movimentacao, movimentacao_id)
     if movimentacao is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Movimentação não encontrada"
         )
     
-    # Reverter o estoque
-    produto = db.query(Produto).filter(Produto.id == movimentacao.produto_id).first()
-    if movimentacao.tipo == "entrada":
-        produto.quantidade -= movimentacao.quantidade
-    else:  # saida
-        produto.quantidade += movimentacao.quantidade
+    # Reverter o estoque (sem exigir saldo, como antes: estornar uma entrada já vendida pode negativar)
+    delta = -movimentacao.quantidade if movimentacao.tipo == "entrada" else movimentacao.quantidade
+    await alterar_estoque(db, movimentacao.produto_id, delta, exigir_saldo=False)
     
-    db.delete(movimentacao)
-    db.commit()
+    await db.delete(movimentacao)
+    await db.commit()
+    await publicar_versao_catalogo(db)
+    monitor_alertas.notificar()
     
     return None
 
@@ -186,10 +264,10 @@ async def excluir_movimentacao(
 async def listar_movimentacoes_recentes(
     limit: int = 5, # Padrão para 5 mais recentes
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Lista as últimas N movimentações registradas.
     """
-    movimentacoes = db.query(Movimentacao).order_by(desc(Movimentacao.data)).limit(limit).all()
-    return movimentacoes
+    result = await db.execute(select(Movimentacao).order_by(desc(Movimentacao.data)).limit(limit))
+    return result.scalars().all()
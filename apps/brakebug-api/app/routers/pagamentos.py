@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.pagamentos import Pagamento
 from app.schemas.pagamentos import PagamentoCreate, PagamentoResponse
 from typing import List
@@ -25,11 +25,11 @@ def criar_pagamento(pagamento: PagamentoCreate, db: Session = Depends(get_db)):
     return novo_pagamento
 
 @router.get("/", response_model=List[PagamentoResponse])
-def listar_pagamentos(db: Session = Depends(get_db)):
+def listar_pagamentos(db: Session = Depends(get_read_db)):
     return db.query(Pagamento).all()
 
 @router.get("/{pagamento_id}", response_model=PagamentoResponse)
-def obter_pagamento(pagamento_id: int, db: Session = Depends(get_db)):
+def obter_pagamento(pagamento_id: int, db: Session = Depends(get_read_db)):
     pagamento = db.query(Pagamento).filter(Pagamento.id == pagamento_id).first()
     if not pagamento:
         raise HTTPException(status_code=404, detail="Pagamento não encontrado")
@@ -1,62 +1,151 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+import time
+from datetime import date
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from sqlalchemy import desc
+from sqlalchemy import desc, func, select
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.models.produto import Produto
 from app.models.categoria import Categoria
 from app.models.usuario import Usuario
+from app.models.estoque_resumo import origem_resumo
 # from app.schemas.produto import ProdutoCreate, ProdutoUpdate, Produto as ProdutoSchema
-from app.schemas.produto import ProdutoCreate, ProdutoUpdate, Produto as ProdutoSchema, ProdutoStats
+from app.schemas.produto import ProdutoCreate, ProdutoUpdate, Produto as ProdutoSchema, ProdutoStats, ProdutoSugestao
+from app.schemas.produto import ProdutoBulkResultado, ProdutoLoteAtualizacao, ProdutoLoteResultado, EstoqueEm
+from app.schemas.categoria import Categoria as CategoriaSchema
+from app.services.alertas_estoque import monitor_alertas
+from app.services.atualizacao_produtos import atualizar_em_lote
 from app.services.auth import get_current_user
+from app.services.busca_produtos import aplicar_busca
+from app.services.cache_catalogo import cache_catalogo, incrementar_versao_catalogo
+from app.services.estoque_snapshots import estoque_em
+from app.services.importacao_produtos import TAMANHO_LOTE, importar_produtos, ler_linhas, validar_linhas
+from app.services.sugestoes_produtos import indice_sugestoes
+from app.utils.consultas_sql import estatisticas_atuais, orcamento_consultas
+from app.utils.paginacao import OrdemKeyset
+from app.utils.serializacao import CodificadorLinhas, json_bytes, relacoes_solicitadas, resposta_json
 
 router = APIRouter()
 
+ORDEM_PRODUTOS = OrdemKeyset("produtos", Produto.nome, Produto.id)
+
+# Listagens grandes: colunas do ProdutoSchema serializadas direto em JSON (sem ORM/validação por linha)
+CODIFICADOR_PRODUTOS = CodificadorLinhas(ProdutoSchema, Produto)
+CODIFICADOR_CATEGORIAS = CodificadorLinhas(CategoriaSchema, Categoria)
+
+# Relações aceitas em expand= nas listagens de produtos
+RELACOES_PRODUTOS = ("categoria",)
+
+
+async def _serializar_produtos(db: AsyncSession, codificador: CodificadorLinhas, linhas, relacoes: set) -> bytes:
+    """
+    Serializa as linhas e, se pedido em expand=, embute a categoria de cada produto
+    (uma consulta extra pelos ids da página, como o selectinload).
+    """
+    itens = codificador.dicts(linhas)
+    if "categoria" in relacoes:
+        ids = {linha.categoria_id for linha in linhas if linha.categoria_id is not None}
+        categorias = {}
+        if ids:
+            result = await db.execute(CODIFICADOR_CATEGORIAS.select().where(Categoria.id.in_(ids)))
+            categorias = {categoria["id"]: categoria for categoria in CODIFICADOR_CATEGORIAS.dicts(result)}
+        for item, linha in zip(itens, linhas):
+            item["categoria"] = categorias.get(linha.categoria_id)
+    return json_bytes(itens)
+
 @router.get("/", response_model=List[ProdutoSchema])
 async def listar_produtos(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
     categoria_id: Optional[int] = None,
     search: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Campos do produto separados por vírgula (ex.: id,nome,preco_venda,quantidade)"),
+    expand: Optional[str] = Query(None, description="Relações a incluir: categoria"),
     # current_user: Usuario = Depends(get_current_user), *(removido para deixar Público)
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
-    Lista todos os produtos com opções de filtro
+    Lista todos os produtos com opções de filtro.
+    Sem busca, a próxima página é indicada pelo cabeçalho X-Next-Cursor; com busca a
+    ordem é por relevância e a paginação continua por skip.
+    Respostas validadas por ETag/Last-Modified (versão do catálogo): 304 ou corpo em cache.
+    `fields` limita as colunas consultadas e devolvidas; `expand=categoria` embute a categoria.
     """
-    query = db.query(Produto)
+    if search and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Paginação por cursor não disponível com busca; use skip"
+        )
+
+    relacoes = relacoes_solicitadas(expand, RELACOES_PRODUTOS)
+    # Colunas do cursor (e categoria_id do expand) são consultadas mesmo fora de fields
+    obrigatorias = ORDEM_PRODUTOS.colunas + ((Produto.categoria_id,) if "categoria" in relacoes else ())
+    codificador = CODIFICADOR_PRODUTOS.parcial(fields, *obrigatorias)
+
+    validacao = await cache_catalogo.validar(request, db)
+    if validacao.resposta is not None:
+        return validacao.resposta
+
+    query = codificador.select()
     
     # Aplicar filtros se fornecidos
     if categoria_id:
-        query = query.filter(Produto.categoria_id == categoria_id)
+        query = query.where(Produto.categoria_id == categoria_id)
     
+    # Busca textual ordenada por relevância (FTS5/tsvector)
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Produto.nome.ilike(search_term)) | 
-            (Produto.codigo_sku.ilike(search_term)) |
-            (Produto.descricao.ilike(search_term))
-        )
+        query = aplicar_busca(query, search, db.get_bind().dialect.name)
+        # Ordenar por nome (desempate da relevância)
+        result = await db.execute(query.order_by(Produto.nome, Produto.id).offset(skip).limit(limit))
+        return validacao.responder_json(await _serializar_produtos(db, codificador, result.all(), relacoes))
     
-    # Ordenar por nome
-    query = query.order_by(Produto.nome)
+    # Ordenar por nome e continuar após o cursor, se informado
+    query = ORDEM_PRODUTOS.aplicar(query, cursor)
+    if not cursor:
+        query = query.offset(skip)
     
     # Aplicar paginação
-    produtos = query.offset(skip).limit(limit).all()
-    return produtos
+    result = await db.execute(query.limit(limit))
+    produtos = result.all()
+    ORDEM_PRODUTOS.definir_proximo(response, produtos, limit)
+    return validacao.responder_json(await _serializar_produtos(db, codificador, produtos, relacoes), response)
+
+# Declarada antes de /{produto_id} para não ser capturada pela rota com parâmetro
+@router.get("/suggest", response_model=List[ProdutoSugestao])
+async def sugerir_produtos(
+    q: str = Query(..., min_length=1, max_length=100),
+    limite: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Autocomplete do catálogo: prefixo e correspondência aproximada em nome/SKU,
+    respondido pelo índice em memória (sem consulta ao banco)
+    """
+    if indice_sugestoes.pronto:
+        return indice_sugestoes.sugerir(q, limite)
+
+    # Índice ainda em construção (startup): usa a busca textual do banco
+    query = aplicar_busca(select(Produto.id, Produto.nome, Produto.codigo_sku), q, db.get_bind().dialect.name)
+    result = await db.execute(query.order_by(Produto.nome).limit(limite))
+    return [dict(linha._mapping) for linha in result]
 
 @router.post("/", response_model=ProdutoSchema, status_code=status.HTTP_201_CREATED)
 async def criar_produto(
     produto: ProdutoCreate, 
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Cria um novo produto
     """
     # Verificar se a categoria existe
-    categoria = db.query(Categoria).filter(Categoria.id == produto.categoria_id).first()
+    categoria = await db.get(Categoria, produto.categoria_id)
     if not categoria:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -64,7 +153,7 @@ async def criar_produto(
         )
     
     # Verificar se já existe um produto com o mesmo código SKU
-    db_produto = db.query(Produto).filter(Produto.codigo_sku == produto.codigo_sku).first()
+    db_produto = await db.scalar(select(Produto).where(Produto.codigo_sku == produto.codigo_sku))
     if db_produto:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -87,51 +176,184 @@ async def criar_produto(
     )
     
     db.add(db_produto)
-    db.commit()
-    db.refresh(db_produto)
+    await incrementar_versao_catalogo(db)
+    await db.commit()
+    await db.refresh(db_produto)
+    indice_sugestoes.atualizar(db_produto.id, db_produto.nome, db_produto.codigo_sku)
     
     return db_produto
 
+@router.post(
+    "/bulk",
+    response_model=ProdutoBulkResultado,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/ProdutoCreate"}}
+                },
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"arquivo": {"type": "string", "format": "binary"}},
+                        "required": ["arquivo"],
+                    }
+                },
+            },
+        }
+    },
+)
+async def importar_produtos_em_lote(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    somente_erros: bool = False,
+    current_user: Usuario = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Cria ou atualiza produtos pelo codigo_sku a partir de JSON (lista de produtos) ou de
+    uma planilha CSV/Excel no campo `arquivo`. Retorna o resultado de cada linha
+    (somente_erros=true omite as linhas gravadas)
+    """
+    inicio = time.perf_counter()
+    linhas = await ler_linhas(request)
+    resultados, validos = await run_in_threadpool(validar_linhas, linhas)
+
+    # Orçamento de consultas proporcional ao número de lotes (não de produtos)
+    estatisticas = estatisticas_atuais()
+    if estatisticas is not None:
+        lotes = -(-len(validos) // TAMANHO_LOTE)
+        estatisticas.maximo = max(estatisticas.maximo or 0, 10 + 4 * lotes)
+        estatisticas.repeticoes = max(estatisticas.repeticoes or 0, lotes + 1)
+
+    gravados = await importar_produtos(db, resultados, validos)
+    # Mudanças de quantidade_minima também podem cruzar o mínimo
+    monitor_alertas.notificar()
+    if gravados and indice_sugestoes.pronto:
+        # Uma recarga completa após a resposta sai mais barata que atualizar produto a produto
+        background_tasks.add_task(indice_sugestoes.recarregar)
+
+    criados = sum(resultado["status"] == "criado" for resultado in resultados)
+    atualizados = sum(resultado["status"] == "atualizado" for resultado in resultados)
+    return {
+        "total": len(resultados),
+        "criados": criados,
+        "atualizados": atualizados,
+        "erros": len(resultados) - criados - atualizados,
+        "tempo_ms": round((time.perf_counter() - inicio) * 1000, 1),
+        "linhas": [r for r in resultados if r["status"] == "erro"] if somente_erros else resultados,
+    }
+
+@router.patch(
+    "/bulk",
+    response_model=ProdutoLoteResultado,
+    dependencies=[Depends(orcamento_consultas(6, repeticoes=1))],
+)
+async def atualizar_produtos_em_lote(
+    pedido: ProdutoLoteAtualizacao,
+    current_user: Usuario = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Altera preços e quantidades mínima/máxima dos produtos do filtro com um único UPDATE
+    (percentual, somar, definir ou fórmula). simular=true retorna quantos produtos seriam
+    afetados e uma amostra antes/depois, sem gravar
+    """
+    inicio = time.perf_counter()
+    resultado = await atualizar_em_lote(db, pedido)
+    if resultado["afetados"] and not pedido.simular:
+        # Mudanças de quantidade_minima podem cruzar o mínimo
+        monitor_alertas.notificar()
+    return {
+        **resultado,
+        "simulado": pedido.simular,
+        "tempo_ms": round((time.perf_counter() - inicio) * 1000, 1),
+    }
+
 @router.get("/baixo-estoque", response_model=List[ProdutoSchema])
 async def listar_produtos_baixo_estoque(
+    fields: Optional[str] = Query(None, description="Campos do produto separados por vírgula"),
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Lista produtos com estoque abaixo do mínimo
     """
-    produtos = db.query(Produto).filter(Produto.quantidade < Produto.quantidade_minima).all()
-    return produtos
+    codificador = CODIFICADOR_PRODUTOS.parcial(fields)
+    result = await db.execute(codificador.select().where(Produto.quantidade < Produto.quantidade_minima))
+    return resposta_json(codificador.dicts(result))
+
+@router.get(
+    "/estoque-em",
+    response_model=EstoqueEm,
+    # Fotografia + saldo das movimentações: poucas consultas independente do número de produtos
+    dependencies=[Depends(orcamento_consultas(5, repeticoes=1))],
+)
+async def obter_estoque_em(
+    data: date = Query(..., description="Dia (UTC) cujo estoque ao fim do dia será retornado"),
+    categoria_id: Optional[int] = None,
+    current_user: Usuario = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Quantidade de cada produto ao fim do dia informado (inventário de fechamento), calculada
+    pela fotografia diária mais próxima mais as movimentações entre ela e a data
+    """
+    return resposta_json(await estoque_em(db, data, categoria_id))
+
+# Declarada antes de /{produto_id} para não ser capturada pela rota com parâmetro
+@router.get("/stats", response_model=ProdutoStats)
+async def get_produto_stats(
+    current_user: Usuario = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Retorna estatísticas sobre os produtos (contadores de estoque_resumo, sem varrer produtos).
+    """
+    resumo = origem_resumo(db.get_bind().dialect.name)
+    linha = (await db.execute(
+        select(func.coalesce(func.sum(resumo.c.total_produtos), 0), func.coalesce(func.sum(resumo.c.estoque_baixo), 0))
+    )).one()
+    return ProdutoStats(total_produtos=linha[0], total_estoque_baixo=linha[1])
 
 @router.get("/{produto_id}", response_model=ProdutoSchema)
 async def obter_produto(
     produto_id: int, 
+    request: Request,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
-    Obtém um produto pelo ID
+    Obtém um produto pelo ID (validado por ETag, como a listagem)
     """
-    produto = db.query(Produto).filter(Produto.id == produto_id).first()
+    validacao = await cache_catalogo.validar(request, db, publico=False)
+    if validacao.resposta is not None:
+        # 304/cache só para produto existente ("If-None-Match: *" casa com qualquer versão)
+        produto = await db.scalar(select(Produto.id).where(Produto.id == produto_id))
+    else:
+        produto = await db.get(Produto, produto_id)
     if produto is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Produto não encontrado"
         )
     
-    return produto
+    if validacao.resposta is not None:
+        return validacao.resposta
+    return validacao.responder(produto, ProdutoSchema)
 
 @router.put("/{produto_id}", response_model=ProdutoSchema)
 async def atualizar_produto(
     produto_id: int, 
     produto_update: ProdutoUpdate, 
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Atualiza um produto pelo ID
     """
-    produto = db.query(Produto).filter(Produto.id == produto_id).first()
+    produto = await db.get(Produto, produto_id)
     if produto is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -140,7 +362,7 @@ async def atualizar_produto(
     
     # Verificar se a categoria existe (se for atualizada)
     if produto_update.categoria_id is not None:
-        categoria = db.query(Categoria).filter(Categoria.id == produto_update.categoria_id).first()
+        categoria = await db.get(Categoria, produto_update.categoria_id)
         if not categoria:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -149,7 +371,7 @@ async def atualizar_produto(
     
     # Verificar se o novo código SKU já existe (se for diferente do atual)
     if produto_update.codigo_sku is not None and produto_update.codigo_sku != produto.codigo_sku:
-        db_produto = db.query(Produto).filter(Produto.codigo_sku == produto_update.codigo_sku).first()
+        db_produto = await db.scalar(select(Produto).where(Produto.codigo_sku == produto_update.codigo_sku))
         if db_produto:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -160,8 +382,11 @@ async def atualizar_produto(
     for key, value in produto_update.dict(exclude_unset=True).items():
         setattr(produto, key, value)
     
-    db.commit()
-    db.refresh(produto)
+    await incrementar_versao_catalogo(db)
+    await db.commit()
+    monitor_alertas.notificar()
+    await db.refresh(produto)
+    indice_sugestoes.atualizar(produto.id, produto.nome, produto.codigo_sku)
     
     return produto
 
@@ -169,28 +394,14 @@ async def atualizar_produto(
 async def excluir_produto(
     produto_id: int, 
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Exclui um produto pelo ID
     """
-    produto = db.query(Produto).filter(Produto.id == produto_id).first()
+    produto = await db.get(Produto, produto_id)
     if produto is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Produto não encontrado"
         )
-
-    # Inserido novo endpoint a baixo
-
-@router.get("/stats", response_model=ProdutoStats)
-async def get_produto_stats(
-    current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """
-    Retorna estatísticas sobre os produtos.
-    """
-    total_produtos = db.query(Produto).count()  # Esta linha indentada
-    total_estoque_baixo = db.query(Produto).filter(Produto.quantidade < Produto.quantidade_minima).count() # Esta linha indentada
-    return ProdutoStats(total_produtos=total_produtos, total_estoque_baixo=total_estoque_baixo) # Esta linha indentada
\ No newline at end of file
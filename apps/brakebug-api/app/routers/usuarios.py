@@ -1,39 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.models.usuario import Usuario
 from app.schemas.usuario import UsuarioCreate, UsuarioUpdate, Usuario as UsuarioSchema
 from app.services.auth import get_current_user, check_admin_user
+from app.utils.paginacao import OrdemKeyset
 from app.utils.security import get_password_hash
 
 router = APIRouter()
 
+ORDEM_USUARIOS = OrdemKeyset("usuarios", Usuario.id)
+
 @router.get("/", response_model=List[UsuarioSchema])
 async def listar_usuarios(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
-    Lista todos os usuários (apenas para administradores)
+    Lista todos os usuários (apenas para administradores).
+    A próxima página é indicada pelo cabeçalho X-Next-Cursor (use ?cursor= em vez de skip).
     """
-    usuarios = db.query(Usuario).offset(skip).limit(limit).all()
+    query = ORDEM_USUARIOS.aplicar(select(Usuario), cursor)
+    if not cursor:
+        query = query.offset(skip)
+
+    result = await db.execute(query.limit(limit))
+    usuarios = result.scalars().all()
+    ORDEM_USUARIOS.definir_proximo(response, usuarios, limit)
     return usuarios
 
 @router.post("/", response_model=UsuarioSchema, status_code=status.HTTP_201_CREATED)
 async def criar_usuario(
     usuario: UsuarioCreate, 
     current_user: Usuario = Depends(check_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Cria um novo usuário (apenas para administradores)
     """
     # Verificar se o email já existe
-    db_user = db.query(Usuario).filter(Usuario.email == usuario.email).first()
+    db_user = await db.scalar(select(Usuario).where(Usuario.email == usuario.email))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -41,7 +55,7 @@ async def criar_usuario(
         )
     
     # Criar novo usuário
-    hashed_password = get_password_hash(usuario.senha)
+    hashed_password = await run_in_threadpool(get_password_hash, usuario.senha)
     db_user = Usuario(
         nome=usuario.nome,
         email=usuario.email,
@@ -50,8 +64,8 @@ async def criar_usuario(
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
@@ -59,7 +73,7 @@ async def criar_usuario(
 async def obter_usuario(
     usuario_id: int, 
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Obtém um usuário pelo ID
@@ -71,7 +85,7 @@ async def obter_usuario(
             detail="Permissão negada"
         )
     
-    usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
+    usuario = await db.get(Usuario, usuario_id)
     if usuario is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -85,7 +99,7 @@ async def atualizar_usuario(
     usuario_id: int, 
     usuario_update: UsuarioUpdate, 
     current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Atualiza um usuário pelo ID
@@ -104,7 +118,7 @@ async def atualizar_usuario(
             detail="Apenas administradores podem alterar nível de acesso"
         )
     
-    usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
+    usuario = await db.get(Usuario, usuario_id)
     if usuario is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -118,7 +132,7 @@ async def atualizar_usuario(
     if usuario_update.email is not None:
         # Verificar se o novo email já existe
         if usuario.email != usuario_update.email:
-            db_user = db.query(Usuario).filter(Usuario.email == usuario_update.email).first()
+            db_user = await db.scalar(select(Usuario).where(Usuario.email == usuario_update.email))
             if db_user:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -127,7 +141,7 @@ async def atualizar_usuario(
         usuario.email = usuario_update.email
     
     if usuario_update.senha is not None:
-        usuario.senha_hash = get_password_hash(usuario_update.senha)
+        usuario.senha_hash = await run_in_threadpool(get_password_hash, usuario_update.senha)
     
     if usuario_update.nivel_acesso is not None:
         usuario.nivel_acesso = usuario_update.nivel_acesso
@@ -135,8 +149,8 @@ async def atualizar_usuario(
     if usuario_update.ativo is not None:
         usuario.ativo = usuario_update.ativo
     
-    db.commit()
-    db.refresh(usuario)
+    await db.commit()
+    await db.refresh(usuario)
     
     return usuario
 
@@ -144,12 +158,12 @@ async def atualizar_usuario(
 async def desativar_usuario(
     usuario_id: int, 
     current_user: Usuario = Depends(check_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Desativa um usuário pelo ID (apenas para administradores)
     """
-    usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
+    usuario = await db.get(Usuario, usuario_id)
     if usuario is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -164,6 +178,6 @@ async def desativar_usuario(
         )
     
     usuario.ativo = False
-    db.commit()
+    await db.commit()
     
     return None
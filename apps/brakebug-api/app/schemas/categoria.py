@@ -17,4 +17,4 @@ class Categoria(CategoriaBase):
     id: int
     
     class Config:
-        orm_mode = True
+        from_attributes = True
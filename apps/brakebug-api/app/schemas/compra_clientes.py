@@ -20,7 +20,7 @@ class CompraItemResponse(BaseModel):
     preco_unitario: float
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 class CompraClienteResponse(BaseModel):
     id: int
@@ -30,7 +30,7 @@ class CompraClienteResponse(BaseModel):
     valor_total: float
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class CompraCliente(BaseModel):
@@ -39,4 +39,4 @@ class CompraCliente(BaseModel):
     data_compra: datetime
 
     class Config:
-        orm_mode = True
+        from_attributes = True
@@ -14,7 +14,7 @@ class CompraItemCreate(CompraItemBase):
 class CompraItemResponse(CompraItemBase):
     id: int
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class CompraClienteCreate(BaseModel):
@@ -29,4 +29,4 @@ class CompraClienteResponse(BaseModel):
     valor_total: float
     itens: List[CompraItemResponse]
     class Config:
-        orm_mode = True
+        from_attributes = True
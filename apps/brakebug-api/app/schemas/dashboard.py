@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from decimal import Decimal
+
+class DashboardCategoria(BaseModel):
+    categoria_id: Optional[int] = None  # None = produtos sem categoria
+    nome: Optional[str] = None
+    total_produtos: int
+    estoque_baixo: int
+    quantidade_total: int
+    valor_custo: Decimal
+    valor_venda: Decimal
+
+class DashboardEstoqueBaixo(BaseModel):
+    id: int
+    nome: str
+    codigo_sku: str
+    quantidade: Optional[int] = None
+    quantidade_minima: Optional[int] = None
+
+class DashboardMovimentacao(BaseModel):
+    id: int
+    produto_id: int
+    produto_nome: str
+    tipo: str
+    quantidade: int
+    data: datetime
+
+class Dashboard(BaseModel):
+    total_produtos: int
+    total_estoque_baixo: int
+    quantidade_total: int
+    valor_estoque_custo: Decimal
+    valor_estoque_venda: Decimal
+    categorias: List[DashboardCategoria]
+    estoque_baixo: List[DashboardEstoqueBaixo]
+    movimentacoes_recentes: List[DashboardMovimentacao]
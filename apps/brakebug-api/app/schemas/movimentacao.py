@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 
 class MovimentacaoBase(BaseModel):
     produto_id: int
@@ -21,4 +21,47 @@ class Movimentacao(MovimentacaoBase):
     data: datetime
     
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+
+class MovimentacaoLote(BaseModel):
+    linhas: List[MovimentacaoCreate] = Field(..., min_length=1, max_length=5000)
+    parcial: bool = False  # false: tudo ou nada; true: grava as linhas válidas e reporta as demais
+
+
+class MovimentacaoLoteLinha(BaseModel):
+    linha: int  # posição na lista (a partir de 1)
+    produto_id: int
+    status: str  # "gravada" ou "erro"
+    erro: Optional[str] = None
+
+
+class MovimentacaoLoteEstoque(BaseModel):
+    produto_id: int
+    quantidade: int
+
+
+class MovimentacaoLoteResultado(BaseModel):
+    total: int
+    gravadas: int
+    erros: int
+    tempo_ms: float
+    estoques: List[MovimentacaoLoteEstoque]  # quantidade final dos produtos movimentados
+    linhas: List[MovimentacaoLoteLinha]
+
+
+class TendenciaPeriodo(BaseModel):
+    periodo: date  # primeiro dia do período (segunda-feira na granularidade semana)
+    entradas: int
+    saidas: int
+    saldo: int
+    movimentacoes: int
+
+
+class TendenciaMovimentacoes(BaseModel):
+    granularidade: str
+    data_inicio: date
+    data_fim: date
+    produto_id: Optional[int] = None
+    categoria_id: Optional[int] = None
+    periodos: List[TendenciaPeriodo]
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, condecimal
-from typing import Optional, List
-from datetime import datetime
+from pydantic import BaseModel, Field, condecimal, model_validator
+from typing import Literal, Optional, List
+from datetime import date, datetime
+from decimal import Decimal
 
 class ProdutoBase(BaseModel):
     nome: str
@@ -36,7 +37,7 @@ class Produto(ProdutoBase):
     data_atualizacao: Optional[datetime] = None  # <-- permitir nulo
     
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class ProdutoStats(BaseModel):
@@ -44,4 +45,91 @@ class ProdutoStats(BaseModel):
     total_estoque_baixo: int
 
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+
+class ProdutoSugestao(BaseModel):
+    id: int
+    nome: str
+    codigo_sku: str
+
+
+class ProdutoBulkLinha(BaseModel):
+    linha: int  # posição no JSON (a partir de 1) ou linha da planilha (cabeçalho = 1)
+    codigo_sku: Optional[str] = None
+    status: str  # "criado", "atualizado" ou "erro"
+    id: Optional[int] = None
+    erro: Optional[str] = None
+
+
+class ProdutoBulkResultado(BaseModel):
+    total: int
+    criados: int
+    atualizados: int
+    erros: int
+    tempo_ms: float
+    linhas: List[ProdutoBulkLinha]
+
+
+class ProdutoLoteFiltro(BaseModel):
+    categoria_id: Optional[int] = None
+    codigos_sku: Optional[List[str]] = Field(None, max_length=100_000)
+    search: Optional[str] = None
+    todos: bool = False  # exigido quando nenhum filtro é informado
+
+
+class ProdutoLoteAlteracao(BaseModel):
+    campo: Literal["preco_venda", "preco_custo", "quantidade_minima", "quantidade_maxima"]
+    operacao: Literal["percentual", "somar", "definir", "formula"]
+    valor: Optional[Decimal] = None  # percentual (10 = +10%), valor somado ou valor definido
+    formula: Optional[str] = Field(None, max_length=500)  # ex.: "round(preco_custo * 1.35, 1) - 0.01"
+
+    @model_validator(mode="after")
+    def _validar_operacao(self):
+        if self.operacao == "formula":
+            if not self.formula:
+                raise ValueError("operacao=formula exige o campo formula")
+        elif self.valor is None:
+            raise ValueError(f"operacao={self.operacao} exige o campo valor")
+        return self
+
+
+class ProdutoLoteAtualizacao(BaseModel):
+    filtro: ProdutoLoteFiltro
+    alteracoes: List[ProdutoLoteAlteracao] = Field(..., min_length=1)
+    simular: bool = False  # dry-run: só conta e mostra a amostra
+
+    @model_validator(mode="after")
+    def _campos_unicos(self):
+        campos = [alteracao.campo for alteracao in self.alteracoes]
+        if len(campos) != len(set(campos)):
+            raise ValueError("Cada campo pode ser alterado uma única vez")
+        return self
+
+
+class ProdutoLoteLinha(BaseModel):
+    id: int
+    codigo_sku: str
+    antes: Optional[dict] = None  # apenas na simulação
+    depois: dict
+
+
+class ProdutoLoteResultado(BaseModel):
+    afetados: int
+    simulado: bool
+    tempo_ms: float
+    amostra: List[ProdutoLoteLinha]
+
+
+class ProdutoEstoqueEm(BaseModel):
+    produto_id: int
+    nome: str
+    codigo_sku: str
+    categoria_id: int
+    quantidade: int
+
+
+class EstoqueEm(BaseModel):
+    data: date
+    snapshot: Optional[date] = None  # fotografia usada como base (None = estoque atual)
+    produtos: List[ProdutoEstoqueEm]
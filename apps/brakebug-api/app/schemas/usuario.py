@@ -24,7 +24,7 @@ class UsuarioInDB(UsuarioBase):
     ultimo_login: Optional[datetime] = None
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 class Usuario(UsuarioInDB):
     pass
@@ -0,0 +1,276 @@
+"""
+Distribuição dos alertas de estoque baixo para os assinantes do stream SSE.
+
+Os eventos são gravados pelo trigger de produtos (app/models/alerta_estoque.py) na
+transação da venda/movimentação. Cada worker tem um único leitor (MonitorAlertas) que
+busca os eventos novos por id e os repassa às filas dos assinantes conectados a ele:
+- os endpoints que alteram estoque chamam `notificar()` depois do commit e o leitor
+  consulta na hora (alerta em milissegundos no mesmo worker);
+- eventos gravados por outros workers chegam na leitura periódica (ALERTAS_INTERVALO_SEGUNDOS),
+  uma consulta por índice por worker, independente do número de clientes.
+
+Ao conectar, o cliente recebe um snapshot do conjunto em estoque baixo (mesmo critério
+do trigger, até SNAPSHOT_MAXIMO produtos, com "truncado": true se houver mais) ou, com
+Last-Event-ID, o replay dos eventos perdidos.
+"""
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.alerta_estoque import AlertaEstoque, abaixo_minimo
+from app.models.produto import Produto
+
+logger = logging.getLogger(__name__)
+
+# Eventos lidos por consulta do leitor
+LOTE_LEITURA = 500
+
+# Produtos enviados no snapshot inicial
+SNAPSHOT_MAXIMO = 1000
+
+# Ids pulados (transação ainda não confirmada no Postgres) são procurados por este tempo
+ESPERA_LACUNAS_SEGUNDOS = 30
+
+# Intervalo da limpeza de eventos antigos
+LIMPEZA_SEGUNDOS = 3600
+
+
+def formatar_sse(evento: str, dados, id_evento: Optional[int] = None) -> str:
+    linhas = [] if id_evento is None else [f"id: {id_evento}"]
+    linhas.append(f"event: {evento}")
+    linhas.append(f"data: {json.dumps(dados, separators=(',', ':'))}")
+    return "\n".join(linhas) + "\n\n"
+
+
+def _consulta_eventos():
+    return (
+        select(
+            AlertaEstoque.id, AlertaEstoque.produto_id, AlertaEstoque.tipo, AlertaEstoque.quantidade,
+            AlertaEstoque.quantidade_minima, AlertaEstoque.criado_em, Produto.nome, Produto.codigo_sku,
+        )
+        .outerjoin(Produto, Produto.id == AlertaEstoque.produto_id)
+        .order_by(AlertaEstoque.id)
+    )
+
+
+def _evento(linha) -> dict:
+    return {
+        "id": linha.id,
+        "produto_id": linha.produto_id,
+        "nome": linha.nome,
+        "codigo_sku": linha.codigo_sku,
+        "tipo": linha.tipo,
+        "quantidade": linha.quantidade,
+        "quantidade_minima": linha.quantidade_minima,
+        "criado_em": linha.criado_em.isoformat() if linha.criado_em else None,
+    }
+
+
+async def listar_estoque_baixo(db: AsyncSession) -> Tuple[List[dict], bool]:
+    """
+    Produtos em estoque baixo (os SNAPSHOT_MAXIMO primeiros por id) e se havia mais.
+    """
+    linhas = (await db.execute(
+        select(Produto.id, Produto.nome, Produto.codigo_sku, Produto.quantidade, Produto.quantidade_minima)
+        # O critério do trigger: quem entrou no snapshot só sai dele por um estoque_normalizado
+        .where(abaixo_minimo())
+        .order_by(Produto.id)
+        .limit(SNAPSHOT_MAXIMO + 1)
+    )).all()
+    produtos = [
+        {"produto_id": linha.id, "nome": linha.nome, "codigo_sku": linha.codigo_sku,
+         "quantidade": linha.quantidade, "quantidade_minima": linha.quantidade_minima}
+        for linha in linhas[:SNAPSHOT_MAXIMO]
+    ]
+    return produtos, len(linhas) > SNAPSHOT_MAXIMO
+
+
+class MonitorAlertas:
+    """
+    Leitor dos eventos de estoque deste worker e filas dos assinantes do stream.
+    """
+
+    def __init__(self):
+        self._assinantes: set = set()
+        self._ultimo_id = 0
+        self._lacunas: Dict[int, float] = {}  # id pulado -> até quando procurar
+        self._despertar: Optional[asyncio.Event] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self._ultima_limpeza = 0.0
+        self.entregues = 0
+        self.desconectados = 0
+
+    async def iniciar(self):
+        self._despertar = asyncio.Event()
+        try:
+            async with AsyncSessionLocal() as db:
+                self._ultimo_id = await db.scalar(select(func.max(AlertaEstoque.id))) or 0
+        except Exception as e:
+            logger.warning("Não foi possível ler a posição dos alertas de estoque: %s", e)
+        self._tarefa = asyncio.create_task(self._executar())
+
+    async def parar(self):
+        if self._tarefa:
+            self._tarefa.cancel()
+            self._tarefa = None
+        for fila in list(self._assinantes):
+            self._encerrar(fila)
+
+    def notificar(self):
+        """
+        Chamado depois do commit de uma escrita que pode ter cruzado o mínimo: o leitor
+        consulta imediatamente em vez de esperar o próximo intervalo.
+        """
+        if self._despertar is not None:
+            self._despertar.set()
+
+    async def _executar(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._despertar.wait(), timeout=settings.ALERTAS_INTERVALO_SEGUNDOS)
+            except asyncio.TimeoutError:
+                pass
+            self._despertar.clear()
+            try:
+                await self._ler_eventos()
+                if time.monotonic() - self._ultima_limpeza > LIMPEZA_SEGUNDOS:
+                    await self._limpar()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Falha ao ler alertas de estoque: %s", e)
+
+    async def _ler_eventos(self):
+        # Sem assinantes não há o que entregar, mas o leitor acompanha o fim da tabela: quem
+        # conectar depois não recebe na fila tudo o que foi gravado desde o início do worker
+        if not self._assinantes:
+            async with AsyncSessionLocal() as db:
+                maximo = await db.scalar(select(func.max(AlertaEstoque.id)))
+            self._ultimo_id = max(self._ultimo_id, maximo or 0)
+            self._lacunas.clear()
+            return
+        agora = time.monotonic()
+        self._lacunas = {id_: prazo for id_, prazo in self._lacunas.items() if prazo > agora}
+        async with AsyncSessionLocal() as db:
+            while True:
+                condicao = AlertaEstoque.id > self._ultimo_id
+                if self._lacunas:
+                    condicao = or_(condicao, AlertaEstoque.id.in_(list(self._lacunas)))
+                linhas = (await db.execute(_consulta_eventos().where(condicao).limit(LOTE_LEITURA))).all()
+                for linha in linhas:
+                    if linha.id in self._lacunas:
+                        del self._lacunas[linha.id]
+                        self._distribuir(_evento(linha), atrasado=True)
+                        continue
+                    # No Postgres, ids de transações concorrentes podem ser confirmados fora de ordem
+                    if linha.id - self._ultimo_id <= LOTE_LEITURA:
+                        for pulado in range(self._ultimo_id + 1, linha.id):
+                            self._lacunas[pulado] = agora + ESPERA_LACUNAS_SEGUNDOS
+                    self._ultimo_id = max(self._ultimo_id, linha.id)
+                    self._distribuir(_evento(linha))
+                if len(linhas) < LOTE_LEITURA:
+                    return
+
+    async def _limpar(self):
+        self._ultima_limpeza = time.monotonic()
+        limite = datetime.utcnow() - timedelta(days=settings.ALERTAS_RETENCAO_DIAS)
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(AlertaEstoque).where(AlertaEstoque.criado_em < limite))
+            await db.commit()
+
+    def _distribuir(self, evento: dict, atrasado: bool = False):
+        for fila in list(self._assinantes):
+            try:
+                fila.put_nowait((evento, atrasado))
+                self.entregues += 1
+            except asyncio.QueueFull:
+                # Cliente lento: é desconectado e recupera o que perdeu pelo Last-Event-ID
+                self.desconectados += 1
+                self._encerrar(fila)
+
+    def _encerrar(self, fila: asyncio.Queue):
+        self._assinantes.discard(fila)
+        while not fila.empty():
+            fila.get_nowait()
+        fila.put_nowait(None)
+
+    async def _inicio(self, ultimo_id: Optional[int]):
+        """
+        Replay dos eventos depois de `ultimo_id` ou, sem cursor (ou com cursor fora do
+        histórico guardado), snapshot do conjunto em estoque baixo.
+        """
+        async with AsyncSessionLocal() as db:
+            primeiro, maximo = (await db.execute(
+                select(func.min(AlertaEstoque.id), func.max(AlertaEstoque.id))
+            )).one()
+            maximo = maximo or 0
+            if ultimo_id is not None and (primeiro or 1) - 1 <= ultimo_id <= maximo:
+                linhas = (await db.execute(
+                    _consulta_eventos().where(AlertaEstoque.id > ultimo_id).limit(settings.ALERTAS_REPLAY_MAXIMO + 1)
+                )).all()
+                if len(linhas) <= settings.ALERTAS_REPLAY_MAXIMO:
+                    return None, [_evento(linha) for linha in linhas]
+            produtos, truncado = await listar_estoque_baixo(db)
+            return {"ultimo_id": maximo, "produtos": produtos, "truncado": truncado}, []
+
+    async def assinar(self, ultimo_id: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Stream SSE de um assinante: snapshot ou replay, depois os eventos ao vivo e um
+        comentário a cada ALERTAS_HEARTBEAT_SEGUNDOS. Termina quando o cliente fica para
+        trás (fila cheia) ou a aplicação para.
+        """
+        fila: asyncio.Queue = asyncio.Queue(maxsize=settings.ALERTAS_FILA)
+        # Registrado antes da leitura inicial: nada gravado depois dela é perdido
+        self._assinantes.add(fila)
+        try:
+            snapshot, replay = await self._inicio(ultimo_id)
+            yield "retry: 3000\n\n"
+            if snapshot is not None:
+                posicao = snapshot["ultimo_id"]
+                vistos = set()
+                yield formatar_sse("snapshot", snapshot, posicao)
+            else:
+                posicao = ultimo_id
+                vistos = {evento["id"] for evento in replay}
+                for evento in replay:
+                    posicao = evento["id"]
+                    yield formatar_sse(evento["tipo"], evento, posicao)
+            if len(self._assinantes) == 1:
+                self._ultimo_id = max(self._ultimo_id, posicao)
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(fila.get(), timeout=settings.ALERTAS_HEARTBEAT_SEGUNDOS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if item is None:
+                    return
+                evento, atrasado = item
+                if evento["id"] in vistos or (evento["id"] <= posicao and not atrasado):
+                    continue
+                # O id do SSE é sempre o maior já entregue (eventos atrasados não o fazem voltar)
+                posicao = max(posicao, evento["id"])
+                yield formatar_sse(evento["tipo"], evento, posicao)
+        finally:
+            self._assinantes.discard(fila)
+
+    def resumo(self) -> dict:
+        return {
+            "assinantes": len(self._assinantes),
+            "ultimo_id": self._ultimo_id,
+            "lacunas": len(self._lacunas),
+            "entregues": self.entregues,
+            "desconectados": self.desconectados,
+        }
+
+
+monitor_alertas = MonitorAlertas()
@@ -0,0 +1,267 @@
+"""
+Atualização de preços e atributos em conjunto (PATCH /api/produtos/bulk).
+
+Um filtro (categoria, lista de SKUs, busca textual) seleciona os produtos e cada
+alteração vira uma expressão SQL sobre a própria linha; a gravação é um único
+UPDATE ... SET ... WHERE ... RETURNING numa transação, sem carregar produtos no Python:
+- operações: percentual, somar, definir e formula (expressão aritmética sobre as
+  colunas numéricas do produto, compilada para SQL — nunca executada com eval);
+- todas as expressões enxergam os valores de antes da atualização (semântica do UPDATE);
+- preços são arredondados para 2 casas e quantidades para inteiros; um resultado
+  negativo, nulo ou acima do limite da coluna aborta o lote inteiro com 400;
+- `simular=true` (dry-run) retorna quantos produtos seriam afetados e uma amostra
+  antes/depois, sem gravar.
+
+A lista de SKUs vai ao banco como um único parâmetro (array no Postgres, JSON no
+SQLite), então 30 mil SKUs não esbarram no limite de variáveis do SQLite.
+"""
+import ast
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List
+
+from fastapi import HTTPException, status
+from sqlalchemy import (
+    Integer, Numeric, String, and_, any_, bindparam, case, cast, func, literal, or_, select, true, update,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.produto import Produto
+from app.schemas.produto import ProdutoLoteAlteracao, ProdutoLoteAtualizacao, ProdutoLoteFiltro
+from app.services.busca_produtos import aplicar_busca
+from app.services.cache_catalogo import incrementar_versao_catalogo
+
+# Linhas devolvidas na amostra (simulação e gravação)
+AMOSTRA_MAXIMA = 20
+
+# Campos alteráveis -> casas decimais do resultado (0 = inteiro)
+CAMPOS_ALTERAVEIS = {
+    "preco_venda": 2,
+    "preco_custo": 2,
+    "quantidade_minima": 0,
+    "quantidade_maxima": 0,
+}
+
+# Campos em que NULL é um valor válido (sem máximo); nos demais, NULL (divisão por zero numa
+# fórmula) tiraria o produto dos preços, dos alertas e dos contadores de estoque baixo
+CAMPOS_OPCIONAIS = ("quantidade_maxima",)
+
+# Colunas que podem aparecer numa fórmula
+COLUNAS_FORMULA = ("preco_custo", "preco_venda", "quantidade", "quantidade_minima", "quantidade_maxima")
+
+# Tamanho da árvore de uma fórmula: a compilação (e a do SQL gerado) é recursiva,
+# "-" * 400 + "1" estouraria a pilha do Python
+PROFUNDIDADE_MAXIMA = 32
+NOS_MAXIMOS = 200
+
+# Maior valor de uma coluna Integer (quantidades)
+INTEIRO_MAXIMO = 2 ** 31 - 1
+
+_TABELA = Produto.__table__
+_DECIMAL = Numeric(18, 6)
+
+_OPERADORES = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+    # Divisão sempre decimal (nos dois bancos inteiro / inteiro trunca); divisor zero -> NULL
+    ast.Div: lambda a, b: cast(a, _DECIMAL) / func.nullif(cast(b, _DECIMAL), 0, type_=_DECIMAL),
+}
+
+
+# ---------------------------------------------------------------------- fórmulas
+
+def _numero(no: ast.AST):
+    if isinstance(no, ast.Constant) and type(no.value) in (int, float):
+        return no.value
+    return None
+
+
+def _compilar(no: ast.AST) -> ColumnElement:
+    numero = _numero(no)
+    if numero is not None:
+        return literal(Decimal(str(numero)), _DECIMAL)
+    if isinstance(no, ast.Name) and no.id in COLUNAS_FORMULA:
+        return _TABELA.c[no.id]
+    if isinstance(no, ast.UnaryOp) and isinstance(no.op, (ast.UAdd, ast.USub)):
+        operando = _compilar(no.operand)
+        return -operando if isinstance(no.op, ast.USub) else operando
+    if isinstance(no, ast.BinOp) and type(no.op) in _OPERADORES:
+        return _OPERADORES[type(no.op)](_compilar(no.left), _compilar(no.right))
+    if isinstance(no, ast.Call) and isinstance(no.func, ast.Name) and not no.keywords:
+        nome, argumentos = no.func.id, no.args
+        if nome == "round" and len(argumentos) in (1, 2):
+            casas = _numero(argumentos[1]) if len(argumentos) == 2 else 0
+            if not isinstance(casas, int) or not 0 <= casas <= 6:
+                raise ValueError("round() aceita de 0 a 6 casas decimais")
+            return func.round(cast(_compilar(argumentos[0]), _DECIMAL), casas, type_=_DECIMAL)
+        if nome in ("min", "max") and len(argumentos) >= 2:
+            # least/greatest não existem no SQLite: CASE funciona nos dois bancos
+            resultado = _compilar(argumentos[0])
+            for argumento in argumentos[1:]:
+                outro = _compilar(argumento)
+                escolhe_outro = outro < resultado if nome == "min" else outro > resultado
+                resultado = case((escolhe_outro, outro), else_=resultado)
+            return resultado
+    raise ValueError(f"Trecho não permitido: {ast.unparse(no)}")
+
+
+def _limitar_tamanho(arvore: ast.AST):
+    # Percurso iterativo: a árvore ainda pode ser funda demais para recursão
+    pilha, nos = [(arvore, 1)], 0
+    while pilha:
+        no, profundidade = pilha.pop()
+        nos += 1
+        if profundidade > PROFUNDIDADE_MAXIMA or nos > NOS_MAXIMOS:
+            raise ValueError(
+                f"Fórmula complexa demais (até {PROFUNDIDADE_MAXIMA} níveis e {NOS_MAXIMOS} elementos)"
+            )
+        pilha.extend((filho, profundidade + 1) for filho in ast.iter_child_nodes(no))
+
+
+def compilar_formula(formula: str) -> ColumnElement:
+    """
+    Converte "preco_custo * 1.35 + 2" em expressão SQL. Aceita números, as colunas de
+    COLUNAS_FORMULA, + - * /, parênteses, round(x, casas), min(...) e max(...).
+    """
+    try:
+        arvore = ast.parse(formula.strip(), mode="eval")
+    except (SyntaxError, RecursionError, MemoryError):
+        raise ValueError("Fórmula com sintaxe inválida")
+    _limitar_tamanho(arvore)
+    return _compilar(arvore.body)
+
+
+def _arredondado(alteracao: ProdutoLoteAlteracao) -> ColumnElement:
+    """
+    Novo valor do campo, arredondado às casas do campo mas ainda decimal: os limites são
+    conferidos antes da conversão para o tipo da coluna (que falharia no Postgres).
+    """
+    coluna = _TABELA.c[alteracao.campo]
+    if alteracao.operacao == "formula":
+        bruto = compilar_formula(alteracao.formula)
+    else:
+        valor = literal(alteracao.valor, _DECIMAL)
+        if alteracao.operacao == "percentual":
+            bruto = coluna * literal(1 + alteracao.valor / 100, _DECIMAL)
+        elif alteracao.operacao == "somar":
+            bruto = coluna + valor
+        else:
+            bruto = valor
+    return func.round(cast(bruto, _DECIMAL), CAMPOS_ALTERAVEIS[alteracao.campo], type_=_DECIMAL)
+
+
+def _expressao(campo: str, arredondado: ColumnElement) -> ColumnElement:
+    return cast(arredondado, _TABELA.c[campo].type if CAMPOS_ALTERAVEIS[campo] else Integer)
+
+
+def _invalido(campo: str, expressao: ColumnElement) -> ColumnElement:
+    coluna = _TABELA.c[campo]
+    condicoes = [expressao < 0]
+    if campo not in CAMPOS_OPCIONAIS:
+        condicoes.append(expressao.is_(None))
+    if isinstance(coluna.type, Numeric) and coluna.type.precision:
+        condicoes.append(expressao >= 10 ** (coluna.type.precision - coluna.type.scale))
+    elif isinstance(coluna.type, Integer):
+        condicoes.append(expressao > INTEIRO_MAXIMO)
+    return or_(*condicoes)
+
+
+# ---------------------------------------------------------------------- filtro
+
+def _filtro_skus(codigos: List[str], dialeto: str) -> ColumnElement:
+    if dialeto == "postgresql":
+        return _TABELA.c.codigo_sku == any_(bindparam("codigos_sku", codigos, type_=postgresql.ARRAY(String)))
+    if dialeto == "sqlite":
+        valores = select(func.json_each(bindparam("codigos_sku", json.dumps(codigos))).table_valued("value").c.value)
+        return _TABELA.c.codigo_sku.in_(valores.scalar_subquery())
+    return _TABELA.c.codigo_sku.in_(codigos)
+
+
+def condicao_filtro(filtro: ProdutoLoteFiltro, dialeto: str) -> ColumnElement:
+    condicoes = []
+    if filtro.categoria_id is not None:
+        condicoes.append(_TABELA.c.categoria_id == filtro.categoria_id)
+    if filtro.codigos_sku:
+        condicoes.append(_filtro_skus(filtro.codigos_sku, dialeto))
+    if filtro.search:
+        busca = aplicar_busca(select(Produto.id), filtro.search, dialeto).order_by(None)
+        condicoes.append(_TABELA.c.id.in_(busca.scalar_subquery()))
+    if not condicoes and not filtro.todos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe um filtro (categoria_id, codigos_sku ou search) ou todos=true"
+        )
+    return and_(true(), *condicoes)
+
+
+# ---------------------------------------------------------------------- execução
+
+def _linha_amostra(linha, campos: List[str], antes: bool) -> dict:
+    mapa = linha._mapping
+    amostra = {
+        "id": mapa["id"],
+        "codigo_sku": mapa["codigo_sku"],
+        "depois": {campo: mapa[f"novo_{campo}"] for campo in campos},
+    }
+    if antes:
+        amostra["antes"] = {campo: mapa[campo] for campo in campos}
+    return amostra
+
+
+async def atualizar_em_lote(db: AsyncSession, pedido: ProdutoLoteAtualizacao) -> Dict:
+    """
+    Valida e aplica (ou simula) as alterações do pedido. Retorna afetados e amostra.
+    """
+    dialeto = db.get_bind().dialect.name
+    condicao = condicao_filtro(pedido.filtro, dialeto)
+    try:
+        arredondados = {alteracao.campo: _arredondado(alteracao) for alteracao in pedido.alteracoes}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Fórmula inválida: {e}")
+    novos = {campo: _expressao(campo, valor) for campo, valor in arredondados.items()}
+
+    # Uma consulta conta os afetados e os que ficariam com valor inválido
+    invalidos = or_(*(_invalido(campo, valor) for campo, valor in arredondados.items()))
+    afetados, rejeitados = (await db.execute(
+        select(func.count(), func.coalesce(func.sum(case((invalidos, 1), else_=0)), 0))
+        .select_from(_TABELA).where(condicao)
+    )).one()
+    if rejeitados:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{rejeitados} produto(s) ficariam com valor negativo, nulo ou fora do limite; nada foi alterado"
+        )
+
+    campos = list(novos)
+    rotulos = [expressao.label(f"novo_{campo}") for campo, expressao in novos.items()]
+    if pedido.simular or not afetados:
+        linhas = (await db.execute(
+            select(_TABELA.c.id, _TABELA.c.codigo_sku, *(_TABELA.c[campo] for campo in campos), *rotulos)
+            .where(condicao).order_by(_TABELA.c.id).limit(AMOSTRA_MAXIMA)
+        )).all()
+        return {"afetados": afetados, "amostra": [_linha_amostra(linha, campos, True) for linha in linhas]}
+
+    comando = update(_TABELA).where(condicao).values(**novos, data_atualizacao=datetime.utcnow())
+    if db.get_bind().dialect.update_returning:
+        resultado = await db.execute(comando.returning(
+            _TABELA.c.id, _TABELA.c.codigo_sku,
+            *(_TABELA.c[campo].label(f"novo_{campo}") for campo in campos),
+        ))
+        linhas = resultado.all()
+        afetados = len(linhas)
+        linhas = sorted(linhas, key=lambda linha: linha.id)[:AMOSTRA_MAXIMA]
+    else:
+        afetados = (await db.execute(comando)).rowcount
+        linhas = (await db.execute(
+            select(_TABELA.c.id, _TABELA.c.codigo_sku,
+                   *(_TABELA.c[campo].label(f"novo_{campo}") for campo in campos))
+            .where(condicao).order_by(_TABELA.c.id).limit(AMOSTRA_MAXIMA)
+        )).all()
+
+    await incrementar_versao_catalogo(db)
+    await db.commit()
+    return {"afetados": afetados, "amostra": [_linha_amostra(linha, campos, False) for linha in linhas]}
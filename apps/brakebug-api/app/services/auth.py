@@ -1,15 +1,19 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
+import logging
 from app.schemas.usuario import Token
 from app.config import settings
-from app.database import get_db
+from app.database import get_async_db
 from app.models.usuario import Usuario
 from app.assurelog.models.user import User
 from app.utils.security import verify_password
 
+logger = logging.getLogger(__name__)
+
 # Configuração do OAuth2
 # oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 oauth2_scheme = OAuth2PasswordBearer(
@@ -29,7 +33,7 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[Usuari
         return None
     return user
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Usuario:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> Usuario:
     """
     Obtém o usuário atual a partir do token JWT
     """
@@ -39,13 +43,10 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    # >>> LOG PARA DEBUG <<<
-    print("🔐 TOKEN RECEBIDO no backend:", token)
-
     try:
         # Decodificar o token JWT
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        print("🧩 PAYLOAD DECODIFICADO no backend:", payload)
+        logger.debug("Token decodificado: sub=%s exp=%s", payload.get("sub"), payload.get("exp"))
         user_id_str: str = payload.get("sub") # O subject (sub) é uma string no token
         if user_id_str is None:
             # >>> LOG PARA DEBUG <<<
@@ -60,13 +61,12 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     # except ValueError:
     # >>> LOG PARA DEBUG <<<
     except ValueError as e:
-        print("❌ ERRO ao converter sub para int:", e)
+        logger.warning("Token com 'sub' inválido: %s", e)
         # Se o 'sub' não for um inteiro válido
         raise credentials_exception
         
-    user = db.query(Usuario).filter(Usuario.id == user_id).first()
-    # >>> LOG PARA DEBUG <<<
-    print("👤 Usuário buscado no DB:", user)
+    user = await db.get(Usuario, user_id)
+    logger.debug("Usuário %s encontrado no banco: %s", user_id, user is not None)
 
     if user is None:
         raise credentials_exception
@@ -1,12 +1,13 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
 
 from app.schemas.token import Token
 from app.config import settings
-from app.database import get_db
+from app.database import get_async_db
 from app.models.clientes import Cliente
 from app.utils.security import verify_password
 
@@ -24,7 +25,7 @@ def authenticate_cliente(db: Session, email: str, password: str) -> Optional[Cli
         return None
     return cliente
 
-def get_current_cliente(token: str = Depends(oauth2_cliente), db: Session = Depends(get_db)) -> Cliente:
+async def get_current_cliente(token: str = Depends(oauth2_cliente), db: AsyncSession = Depends(get_async_db)) -> Cliente:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Credenciais inválidas",
@@ -45,7 +46,7 @@ def get_current_cliente(token: str = Depends(oauth2_cliente), db: Session = Depe
     except ValueError:
         raise credentials_exception
 
-    cliente = db.query(Cliente).filter(Cliente.id == cliente_id).first()
+    cliente = await db.get(Cliente, cliente_id)
     if cliente is None:
         raise credentials_exception
 
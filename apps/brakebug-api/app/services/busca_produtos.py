@@ -0,0 +1,83 @@
+"""
+Busca textual do catálogo de produtos (GET /api/produtos?search=).
+
+Postgres usa o tsvector com índice GIN e ranking ts_rank_cd; SQLite usa a tabela
+FTS5 com ranking bm25. Ambos ignoram acentos e casam prefixos (busca a cada tecla).
+Outros bancos, ou PRODUTOS_BUSCA_TEXTUAL=false, mantêm o ILIKE anterior.
+"""
+import re
+import unicodedata
+from typing import List
+
+from sqlalchemy import Select, func, literal_column, or_, table, column
+
+from app.config import settings
+from app.models.produto import Produto
+from app.models.produto_busca import CONFIG_BUSCA
+
+_PALAVRAS = re.compile(r"\w+", re.UNICODE)
+
+# Plurais do português reduzidos ao radical; no SQLite o radical vira busca por prefixo
+# (o FTS5 não possui stemmer para português)
+_SUFIXOS_PLURAL = ("oes", "aes", "ais", "eis", "ois", "ns", "es", "s")
+
+# Pesos do bm25 por coluna da produtos_fts: nome, codigo_sku, descricao
+_PESOS_BM25 = (10.0, 8.0, 1.0)
+
+produtos_fts = table("produtos_fts", column("rowid"))
+
+
+def remover_acentos(texto: str) -> str:
+    if texto.isascii():
+        return texto
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(caractere for caractere in decomposto if not unicodedata.combining(caractere))
+
+
+def termos_busca(texto: str) -> List[str]:
+    """
+    Palavras do texto em minúsculas e sem acento (descarta pontuação e operadores).
+    """
+    return _PALAVRAS.findall(remover_acentos(texto).lower())
+
+
+def radical(termo: str) -> str:
+    for sufixo in _SUFIXOS_PLURAL:
+        if termo.endswith(sufixo) and len(termo) - len(sufixo) >= 3:
+            return termo[: -len(sufixo)]
+    return termo
+
+
+def busca_textual_disponivel(dialeto: str) -> bool:
+    return settings.PRODUTOS_BUSCA_TEXTUAL and dialeto in ("sqlite", "postgresql")
+
+
+def filtro_ilike(query: Select, texto: str) -> Select:
+    termo = f"%{texto}%"
+    return query.where(
+        or_(Produto.nome.ilike(termo), Produto.codigo_sku.ilike(termo), Produto.descricao.ilike(termo))
+    )
+
+
+def aplicar_busca(query: Select, texto: str, dialeto: str) -> Select:
+    """
+    Filtra a consulta de produtos pelo texto e ordena por relevância.
+    """
+    termos = termos_busca(texto)
+    if not termos or not busca_textual_disponivel(dialeto):
+        return filtro_ilike(query, texto)
+
+    if dialeto == "postgresql":
+        # Todos os termos precisam aparecer; o último como prefixo (usuário ainda digitando)
+        expressao = " & ".join(termos[:-1] + [f"{termos[-1]}:*"])
+        consulta_ts = func.to_tsquery(literal_column(f"'{CONFIG_BUSCA}'::regconfig"), expressao)
+        vetor = literal_column("produtos.busca_vetor")
+        return query.where(vetor.op("@@")(consulta_ts)).order_by(func.ts_rank_cd(vetor, consulta_ts).desc())
+
+    expressao = " ".join(f"{radical(termo)}*" for termo in termos)
+    indice = literal_column("produtos_fts")
+    return (
+        query.join(produtos_fts, produtos_fts.c.rowid == Produto.id)
+        .where(indice.op("MATCH")(expressao))
+        .order_by(func.bm25(indice, *_PESOS_BM25))
+    )
@@ -0,0 +1,214 @@
+"""
+Cache HTTP das leituras do catálogo (GET /api/produtos/ e /api/produtos/{id}).
+
+O validador é a versão do catálogo (tabela catalogo_versao), incrementada na mesma
+transação das escritas de cadastro (criar/atualizar produto, lote, importação) e logo
+depois do commit das escritas de estoque (movimentações e compras), numa transação
+própria: a linha única da versão não fica travada durante cada venda. Cada leitura
+custa uma consulta por chave primária:
+- If-None-Match igual ao ETag (ou If-Modified-Since >= Last-Modified) -> 304 sem corpo;
+- resposta da mesma URL já serializada nesta versão -> devolvida da memória (LRU por worker);
+- senão a listagem é consultada, serializada uma vez e guardada.
+
+Navegadores revalidam sempre (max-age=0, custa um 304); CDNs podem guardar por
+CATALOGO_CACHE_S_MAXAGE e servir a versão anterior enquanto revalidam.
+"""
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.catalogo_versao import ID_CATALOGO, CatalogoVersao
+from app.utils.compressao import remover_codificacao_etag
+
+logger = logging.getLogger(__name__)
+
+# Respostas maiores que isso não são guardadas em memória (apenas validadas por ETag)
+TAMANHO_MAXIMO_CORPO = 1024 * 1024
+
+
+async def incrementar_versao_catalogo(db: AsyncSession):
+    """
+    Incrementa a versão do catálogo na transação corrente. Chamar logo antes do commit:
+    a linha fica bloqueada até o fim da transação.
+    """
+    await db.execute(
+        update(CatalogoVersao)
+        .where(CatalogoVersao.id == ID_CATALOGO)
+        .values(versao=CatalogoVersao.versao + 1, atualizado_em=datetime.utcnow())
+    )
+
+
+async def publicar_versao_catalogo(db: AsyncSession):
+    """
+    Incrementa a versão numa transação própria, chamada depois do commit de uma escrita de
+    estoque. A linha da versão fica travada só por este UPDATE curto, não pela compra
+    inteira (no Postgres, todas as vendas de todos os SKUs esperariam nela). Um leitor
+    entre os dois commits guarda o corpo novo com a versão anterior, substituída em seguida.
+    """
+    try:
+        await incrementar_versao_catalogo(db)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        # A escrita já foi confirmada: o cache só se atualiza na próxima escrita
+        logger.warning("Falha ao incrementar a versão do catálogo: %s", e)
+
+
+async def obter_versao_catalogo(db: AsyncSession) -> Tuple[int, Optional[datetime]]:
+    linha = (await db.execute(
+        select(CatalogoVersao.versao, CatalogoVersao.atualizado_em).where(CatalogoVersao.id == ID_CATALOGO)
+    )).first()
+    return (linha.versao, linha.atualizado_em) if linha else (0, None)
+
+
+def _etags(cabecalho: str) -> set:
+    # Comparação fraca (RFC 9110): W/"x" e "x" são equivalentes para If-None-Match;
+    # a variante comprimida ("x-br", ver app/utils/compressao.py) valida a mesma versão
+    return {
+        remover_codificacao_etag(etag.strip().removeprefix("W/"))
+        for etag in cabecalho.split(",") if etag.strip()
+    }
+
+
+class ValidacaoCatalogo:
+    """
+    Resultado da validação de uma leitura: `resposta` já pronta (304 ou corpo em cache)
+    ou None, quando o endpoint precisa consultar e chamar `responder`.
+    """
+
+    def __init__(self, cache: "CacheCatalogo", chave: Optional[str] = None, versao: int = 0,
+                 etag: Optional[str] = None, modificado_em: Optional[datetime] = None, publico: bool = True):
+        self.cache = cache
+        self.chave = chave
+        self.versao = versao
+        self.etag = etag
+        self.modificado_em = modificado_em
+        self.publico = publico
+        self.resposta: Optional[Response] = None
+
+    def cabecalhos(self) -> dict:
+        if self.etag is None:
+            return {}
+        if self.publico:
+            controle = (
+                f"public, max-age=0, s-maxage={settings.CATALOGO_CACHE_S_MAXAGE}, "
+                f"stale-while-revalidate={settings.CATALOGO_CACHE_STALE}"
+            )
+        else:
+            controle = "private, no-cache"
+        cabecalhos = {"ETag": self.etag, "Cache-Control": controle}
+        if self.modificado_em is not None:
+            cabecalhos["Last-Modified"] = format_datetime(self.modificado_em.replace(tzinfo=timezone.utc), usegmt=True)
+        return cabecalhos
+
+    def responder(self, conteudo: Any, tipo: Any, response: Optional[Response] = None) -> Response:
+        """
+        Serializa o conteúdo com o response_model do endpoint, guarda o corpo e devolve
+        a resposta com os validadores (e os cabeçalhos já definidos em `response`).
+        """
+        return self.responder_json(self.cache.serializar(conteudo, tipo), response)
+
+    def responder_json(self, corpo: bytes, response: Optional[Response] = None) -> Response:
+        """
+        Como `responder`, para um corpo já serializado (app/utils/serializacao.py).
+        """
+        cabecalhos = {**(dict(response.headers) if response is not None else {}), **self.cabecalhos()}
+        cabecalhos.pop("content-length", None)
+        if self.etag is not None:
+            self.cache.guardar(self.chave, self.versao, corpo, cabecalhos)
+        return Response(content=corpo, media_type="application/json", headers=cabecalhos)
+
+
+class CacheCatalogo:
+
+    def __init__(self, maximo: int):
+        self.maximo = maximo
+        self._respostas = OrderedDict()  # chave -> (versao, corpo, cabecalhos)
+        self._adaptadores = {}
+        self.acertos = 0
+        self.nao_modificados = 0
+        self.falhas = 0
+
+    async def validar(self, request: Request, db: AsyncSession, publico: bool = True) -> ValidacaoCatalogo:
+        if not settings.CATALOGO_CACHE_ENABLED:
+            return ValidacaoCatalogo(self)
+
+        # A versão é lida antes dos dados: uma escrita concorrente só pode deixar o corpo
+        # mais novo que a versão guardada (nunca servir dados antigos com a versão nova)
+        versao, modificado_em = await obter_versao_catalogo(db)
+        chave = f"{request.url.path}?{request.url.query}"
+        digest = hashlib.sha1(f"{settings.APP_VERSION}|{chave}".encode()).hexdigest()[:12]
+        validacao = ValidacaoCatalogo(self, chave, versao, f'"{versao}-{digest}"', modificado_em, publico)
+
+        if self._nao_modificado(request, validacao):
+            self.nao_modificados += 1
+            validacao.resposta = Response(status_code=304, headers=validacao.cabecalhos())
+            return validacao
+
+        guardada = self._respostas.get(chave)
+        if guardada is not None and guardada[0] == versao:
+            self._respostas.move_to_end(chave)
+            self.acertos += 1
+            validacao.resposta = Response(content=guardada[1], media_type="application/json", headers=guardada[2])
+            return validacao
+
+        self.falhas += 1
+        return validacao
+
+    @staticmethod
+    def _nao_modificado(request: Request, validacao: ValidacaoCatalogo) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            etags = _etags(if_none_match)
+            return "*" in etags or validacao.etag in etags
+
+        # If-Modified-Since só vale sem If-None-Match (resolução de segundos)
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and validacao.modificado_em is not None:
+            try:
+                desde = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if desde.tzinfo is None:
+                desde = desde.replace(tzinfo=timezone.utc)
+            return validacao.modificado_em.replace(tzinfo=timezone.utc, microsecond=0) <= desde
+        return False
+
+    def serializar(self, conteudo: Any, tipo: Any) -> bytes:
+        adaptador = self._adaptadores.get(tipo)
+        if adaptador is None:
+            adaptador = self._adaptadores[tipo] = TypeAdapter(tipo)
+        return adaptador.dump_json(adaptador.validate_python(conteudo, from_attributes=True))
+
+    def guardar(self, chave: str, versao: int, corpo: bytes, cabecalhos: dict):
+        if len(corpo) > TAMANHO_MAXIMO_CORPO or self.maximo <= 0:
+            return
+        self._respostas[chave] = (versao, corpo, cabecalhos)
+        self._respostas.move_to_end(chave)
+        while len(self._respostas) > self.maximo:
+            self._respostas.popitem(last=False)
+
+    def limpar(self):
+        self._respostas.clear()
+
+    def resumo(self) -> dict:
+        total = self.acertos + self.nao_modificados + self.falhas
+        return {
+            "respostas_em_memoria": len(self._respostas),
+            "acertos": self.acertos,
+            "nao_modificados": self.nao_modificados,
+            "falhas": self.falhas,
+            "taxa_acerto": round((self.acertos + self.nao_modificados) / total, 3) if total else None,
+        }
+
+
+cache_catalogo = CacheCatalogo(settings.CATALOGO_CACHE_ITENS)
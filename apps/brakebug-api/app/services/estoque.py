@@ -0,0 +1,62 @@
+"""
+Alteração atômica da quantidade em estoque (movimentações e vendas).
+
+Ler o produto, conferir a quantidade no Python e gravar o novo valor perde
+atualizações sob vendas concorrentes (duas transações leem 5 e gravam 4) e deixa
+vender além do estoque. SELECT ... FOR UPDATE resolveria, mas enfileira os checkouts.
+Aqui a conferência e a baixa são o mesmo comando:
+
+    UPDATE produtos SET quantidade = quantidade - :n
+    WHERE id = :id AND quantidade >= :n RETURNING quantidade
+
+O banco aplica a condição sobre a versão mais recente da linha (no Postgres, uma
+transação que esperou o lock reavalia o WHERE), então nunca há venda além do
+estoque e nenhuma leitura prévia do produto é necessária. Sem linha retornada, a
+baixa não aconteceu; só então o produto é consultado para montar a mensagem de erro.
+"""
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.produto import Produto
+
+_TABELA = Produto.__table__
+
+
+async def alterar_estoque(db: AsyncSession, produto_id: int, delta: int,
+                          exigir_saldo: bool = True) -> Optional[int]:
+    """
+    Soma `delta` à quantidade do produto num único UPDATE e retorna a nova quantidade.
+    Retorna None se o produto não existe ou, com `exigir_saldo`, se uma saída (delta
+    negativo) deixaria o estoque negativo — nesse caso nada é alterado.
+    """
+    comando = (
+        update(_TABELA)
+        .where(_TABELA.c.id == produto_id)
+        .values(quantidade=func.coalesce(_TABELA.c.quantidade, 0) + delta)
+    )
+    if delta < 0 and exigir_saldo:
+        comando = comando.where(_TABELA.c.quantidade >= -delta)
+
+    if db.get_bind().dialect.update_returning:
+        return await db.scalar(comando.returning(_TABELA.c.quantidade))
+    if (await db.execute(comando)).rowcount == 0:
+        return None
+    return await db.scalar(select(_TABELA.c.quantidade).where(_TABELA.c.id == produto_id))
+
+
+async def baixar_estoque(db: AsyncSession, produto_id: int, quantidade: int) -> Optional[int]:
+    """
+    Saída condicional: baixa `quantidade` apenas se houver saldo. Nova quantidade ou None.
+    """
+    return await alterar_estoque(db, produto_id, -quantidade)
+
+
+async def situacao_estoque(db: AsyncSession, produto_id: int):
+    """
+    (nome, quantidade) do produto para a mensagem de erro de uma baixa recusada; None se não existe.
+    """
+    return (await db.execute(
+        select(_TABELA.c.nome, _TABELA.c.quantidade).where(_TABELA.c.id == produto_id)
+    )).one_or_none()
@@ -0,0 +1,202 @@
+"""
+Estoque em uma data passada (GET /api/produtos/estoque-em) a partir das fotografias diárias.
+
+Sem fotografias, "quanto havia no dia X" exige somar o razão de movimentações inteiro.
+Com elas a consulta é fotografia mais próxima + saldo das movimentações entre ela e X:
+- fotografia do último dia <= X somada às movimentações seguintes até o fim de X
+  (com fotografias diárias, no máximo um dia de movimentações);
+- X anterior à primeira fotografia: a primeira fotografia depois de X menos as
+  movimentações entre as duas datas; sem fotografia alguma, o estoque atual menos
+  as movimentações posteriores a X.
+
+As fotografias são geradas por AgendadorSnapshots (tarefa do lifespan, a cada
+ESTOQUE_SNAPSHOT_INTERVALO_SEGUNDOS) ou pelo script scripts/gerar_snapshots_estoque.py:
+cada dia pendente é um INSERT ... SELECT (dia anterior + movimentações do dia). A
+primeira fotografia parte do estoque atual. Dias em UTC, como movimentacoes.data.
+"""
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+
+from sqlalchemy import Date, and_, case, delete, func, insert, literal, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.estoque_snapshot import EstoqueSnapshot
+from app.models.movimentacao import Movimentacao
+from app.models.produto import Produto
+
+logger = logging.getLogger(__name__)
+
+_SNAPSHOTS = EstoqueSnapshot.__table__
+_PRODUTOS = Produto.__table__
+
+
+def fim_do_dia(dia: date) -> datetime:
+    return datetime.combine(dia + timedelta(days=1), time.min)
+
+
+def saldo_movimentacoes(inicio: Optional[datetime], fim: Optional[datetime]):
+    """
+    Subconsulta produto_id -> entradas - saídas com data em [inicio, fim) (índice por data).
+    """
+    sinal = case((Movimentacao.tipo == "entrada", Movimentacao.quantidade), else_=-Movimentacao.quantidade)
+    consulta = select(Movimentacao.produto_id, func.sum(sinal).label("saldo")).group_by(Movimentacao.produto_id)
+    if inicio is not None:
+        consulta = consulta.where(Movimentacao.data >= inicio)
+    if fim is not None:
+        consulta = consulta.where(Movimentacao.data < fim)
+    return consulta.subquery("saldos")
+
+
+def _quantidade_em(dia: date, ancora: Optional[date]):
+    """
+    (expressão da quantidade ao fim de `dia`, FROM) partindo da fotografia `ancora`
+    (None = estoque atual).
+    """
+    fim = fim_do_dia(dia)
+    if ancora is None:
+        saldos = saldo_movimentacoes(fim, None)
+        origem = _PRODUTOS.outerjoin(saldos, saldos.c.produto_id == _PRODUTOS.c.id)
+        return func.coalesce(_PRODUTOS.c.quantidade, 0) - func.coalesce(saldos.c.saldo, 0), origem
+
+    base = _SNAPSHOTS.alias("base")
+    origem = _PRODUTOS.outerjoin(base, and_(base.c.produto_id == _PRODUTOS.c.id, base.c.data == ancora))
+    if ancora <= dia:
+        saldos = saldo_movimentacoes(fim_do_dia(ancora), fim)
+        sinal = 1
+    else:
+        saldos = saldo_movimentacoes(fim, fim_do_dia(ancora))
+        sinal = -1
+    origem = origem.outerjoin(saldos, saldos.c.produto_id == _PRODUTOS.c.id)
+    return func.coalesce(base.c.quantidade, 0) + sinal * func.coalesce(saldos.c.saldo, 0), origem
+
+
+async def _ancora(db: AsyncSession, dia: date) -> Optional[date]:
+    anterior = await db.scalar(select(func.max(_SNAPSHOTS.c.data)).where(_SNAPSHOTS.c.data <= dia))
+    if anterior is not None:
+        return anterior
+    return await db.scalar(select(func.min(_SNAPSHOTS.c.data)).where(_SNAPSHOTS.c.data > dia))
+
+
+async def estoque_em(db: AsyncSession, dia: date, categoria_id: Optional[int] = None) -> dict:
+    """
+    Quantidade de cada produto ao fim de `dia` (produtos cadastrados até lá).
+    """
+    ancora = await _ancora(db, dia)
+    quantidade, origem = _quantidade_em(dia, ancora)
+    consulta = (
+        select(_PRODUTOS.c.id, _PRODUTOS.c.nome, _PRODUTOS.c.codigo_sku, _PRODUTOS.c.categoria_id, quantidade)
+        .select_from(origem)
+        .where(or_(_PRODUTOS.c.data_criacao.is_(None), _PRODUTOS.c.data_criacao < fim_do_dia(dia)))
+        .order_by(_PRODUTOS.c.id)
+    )
+    if categoria_id is not None:
+        consulta = consulta.where(_PRODUTOS.c.categoria_id == categoria_id)
+    nomes = ("produto_id", "nome", "codigo_sku", "categoria_id", "quantidade")
+    # Conexão do Core: 50 mil linhas sem a camada de resultados do ORM
+    linhas = await (await db.connection()).execute(consulta)
+    return {"data": dia, "snapshot": ancora, "produtos": [dict(zip(nomes, linha)) for linha in linhas]}
+
+
+# ---------------------------------------------------------------------- geração
+
+async def gerar_snapshots(db: AsyncSession, ate: date, desde: Optional[date] = None) -> List[date]:
+    """
+    Gera as fotografias dos dias pendentes até `ate` (um commit por dia) e retorna os dias gerados.
+    Sem fotografia anterior, a primeira (dia `desde`, padrão `ate`) parte do estoque atual.
+    """
+    ultimo = await db.scalar(select(func.max(_SNAPSHOTS.c.data)))
+    primeiro = (desde or ate) if ultimo is None else ultimo + timedelta(days=1)
+    dias = [primeiro + timedelta(days=n) for n in range((ate - primeiro).days + 1)]
+
+    gerados = []
+    anterior = ultimo
+    for dia in dias:
+        quantidade, origem = _quantidade_em(dia, anterior)
+        try:
+            await db.execute(insert(_SNAPSHOTS).from_select(
+                ["data", "produto_id", "quantidade"],
+                select(literal(dia, Date), _PRODUTOS.c.id, quantidade).select_from(origem),
+            ))
+            await db.commit()
+        except IntegrityError:
+            # Outro worker gerou o mesmo dia primeiro
+            await db.rollback()
+            logger.info("Fotografia do estoque de %s já gerada por outro processo", dia)
+            break
+        gerados.append(dia)
+        anterior = dia
+    return gerados
+
+
+async def limpar_snapshots(db: AsyncSession, hoje: date) -> int:
+    """
+    Remove fotografias mais antigas que ESTOQUE_SNAPSHOT_RETENCAO_DIAS, exceto as de fim de mês.
+    """
+    limite = hoje - timedelta(days=settings.ESTOQUE_SNAPSHOT_RETENCAO_DIAS)
+    antigos = (await db.scalars(select(_SNAPSHOTS.c.data).where(_SNAPSHOTS.c.data < limite).distinct())).all()
+    removiveis = [dia for dia in antigos if (dia + timedelta(days=1)).day != 1]
+    if not removiveis:
+        return 0
+    await db.execute(delete(_SNAPSHOTS).where(_SNAPSHOTS.c.data.in_(removiveis)))
+    await db.commit()
+    return len(removiveis)
+
+
+class AgendadorSnapshots:
+    """
+    Tarefa periódica que mantém as fotografias em dia (até ontem, UTC).
+    """
+
+    def __init__(self):
+        self._tarefa: Optional[asyncio.Task] = None
+        self.ultimo_dia: Optional[date] = None
+        self.ultima_execucao: Optional[datetime] = None
+        self.falhas = 0
+
+    async def iniciar(self):
+        if settings.ESTOQUE_SNAPSHOTS_ENABLED:
+            self._tarefa = asyncio.create_task(self._executar())
+
+    async def parar(self):
+        if self._tarefa:
+            self._tarefa.cancel()
+            self._tarefa = None
+
+    async def executar(self, ate: Optional[date] = None, desde: Optional[date] = None) -> List[date]:
+        ontem = datetime.utcnow().date() - timedelta(days=1)
+        ate = ate or ontem
+        async with AsyncSessionLocal() as db:
+            gerados = await gerar_snapshots(db, ate, desde)
+            await limpar_snapshots(db, ontem)
+        self.ultima_execucao = datetime.utcnow()
+        if gerados:
+            self.ultimo_dia = gerados[-1]
+            logger.info("Fotografias do estoque geradas: %s a %s", gerados[0], gerados[-1])
+        return gerados
+
+    async def _executar(self):
+        while True:
+            try:
+                await self.executar()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.falhas += 1
+                logger.warning("Falha ao gerar as fotografias do estoque: %s", e)
+            await asyncio.sleep(settings.ESTOQUE_SNAPSHOT_INTERVALO_SEGUNDOS)
+
+    def resumo(self) -> dict:
+        return {
+            "ativo": self._tarefa is not None,
+            "ultimo_dia": self.ultimo_dia.isoformat() if self.ultimo_dia else None,
+            "ultima_execucao": self.ultima_execucao.isoformat() if self.ultima_execucao else None,
+            "falhas": self.falhas,
+        }
+
+
+agendador_snapshots = AgendadorSnapshots()
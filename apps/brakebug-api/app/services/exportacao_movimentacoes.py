@@ -0,0 +1,107 @@
+"""
+Exportação do histórico de movimentações (GET /api/movimentacoes/export) em CSV ou NDJSON.
+
+Um ano inteiro de movimentações não cabe na listagem paginada nem deve ser carregado de
+uma vez: a consulta (colunas do Core, sem ORM) roda com cursor do lado do servidor
+(`stream` + yield_per) e cada bloco de EXPORTACAO_LOTE linhas vira um pedaço da
+StreamingResponse assim que chega do banco. A memória fica limitada a um bloco,
+qualquer que seja o número de linhas exportadas.
+
+O gerador abre a própria sessão de leitura: a sessão da dependência é fechada quando o
+endpoint retorna, antes de o corpo começar a ser enviado.
+"""
+import csv
+import io
+from datetime import date, datetime
+from typing import AsyncIterator, Optional
+
+import orjson
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import AsyncReadSessionLocal
+from app.models.movimentacao import Movimentacao
+from app.models.produto import Produto
+
+FORMATOS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+COLUNAS = ("id", "data", "produto_id", "codigo_sku", "produto", "tipo", "quantidade", "usuario_id", "observacoes")
+
+# Planilhas interpretam células iniciadas por estes caracteres como fórmula
+_INICIO_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+
+
+def filtrar_movimentacoes(
+    query,
+    produto_id: Optional[int] = None,
+    tipo: Optional[str] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+):
+    """
+    Filtros comuns da listagem e da exportação (datas inclusivas, dias inteiros).
+    """
+    if produto_id:
+        query = query.where(Movimentacao.produto_id == produto_id)
+    if tipo:
+        query = query.where(Movimentacao.tipo == tipo)
+    if data_inicio:
+        query = query.where(Movimentacao.data >= datetime.combine(data_inicio, datetime.min.time()))
+    if data_fim:
+        query = query.where(Movimentacao.data <= datetime.combine(data_fim, datetime.max.time()))
+    return query
+
+
+def consulta_exportacao(**filtros):
+    consulta = (
+        select(
+            Movimentacao.id, Movimentacao.data, Movimentacao.produto_id, Produto.codigo_sku, Produto.nome,
+            Movimentacao.tipo, Movimentacao.quantidade, Movimentacao.usuario_id, Movimentacao.observacoes,
+        )
+        .select_from(Movimentacao.__table__.outerjoin(Produto.__table__, Produto.id == Movimentacao.produto_id))
+        # Ordem cronológica (índice por data), como num livro-razão
+        .order_by(Movimentacao.data, Movimentacao.id)
+    )
+    return filtrar_movimentacoes(consulta, **filtros)
+
+
+def _texto(valor: Optional[str]) -> Optional[str]:
+    if valor and valor.startswith(_INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def _csv(linhas, cabecalho: bool = False) -> bytes:
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    if cabecalho:
+        escritor.writerow(COLUNAS)
+    # Só os campos de texto livre podem começar com fórmula; data sai como "AAAA-MM-DD HH:MM:SS"
+    escritor.writerows(
+        (id_, data, produto_id, _texto(sku), _texto(nome), tipo, quantidade, usuario_id, _texto(observacoes))
+        for id_, data, produto_id, sku, nome, tipo, quantidade, usuario_id, observacoes in linhas
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+def _ndjson(linhas) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(COLUNAS, linha))) + b"\n" for linha in linhas)
+
+
+async def exportar_movimentacoes(formato: str, **filtros) -> AsyncIterator[bytes]:
+    """
+    Gera o arquivo em blocos de EXPORTACAO_LOTE linhas (CSV com cabeçalho mesmo sem linhas).
+    """
+    consulta = consulta_exportacao(**filtros).execution_options(yield_per=settings.EXPORTACAO_LOTE)
+    if formato == "csv":
+        # BOM: o Excel só reconhece UTF-8 (acentos) com ele
+        yield "\ufeff".encode("utf-8") + _csv([], cabecalho=True)
+
+    async with AsyncReadSessionLocal() as db:
+        # Conexão do Core: linhas direto do cursor, sem a camada de resultados do ORM
+        resultado = await (await db.connection()).stream(consulta)
+        async for bloco in resultado.partitions():
+            yield _csv(bloco) if formato == "csv" else _ndjson(bloco)
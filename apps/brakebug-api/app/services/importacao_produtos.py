@@ -0,0 +1,315 @@
+"""
+Importação de produtos em lote (POST /api/produtos/bulk).
+
+Aceita JSON (lista de produtos) ou planilha (CSV ou Excel) e cria/atualiza pelo
+codigo_sku com SQL em conjunto, em vez de três idas ao banco por produto:
+- categorias validadas com uma consulta para o lote inteiro;
+- a cada TAMANHO_LOTE linhas, uma consulta descobre os SKUs já existentes e um único
+  INSERT ... ON CONFLICT (codigo_sku) DO UPDATE ... RETURNING grava o lote
+  (Postgres e SQLite; outros bancos usam INSERT + UPDATE em massa pela chave primária);
+- cada lote é confirmado em sua própria transação, com o resultado por linha.
+
+A quantidade em estoque não é alterada por aqui (novos produtos começam com zero,
+como em criar_produto); o estoque continua sendo movimentado por /movimentacoes.
+"""
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.categoria import Categoria
+from app.models.produto import Produto
+from app.schemas.produto import ProdutoCreate
+from app.services.busca_produtos import termos_busca
+from app.services.cache_catalogo import incrementar_versao_catalogo
+from app.utils.recursos import carregar
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 1000
+
+# Colunas sobrescritas quando o SKU já existe (quantidade e data_criacao são preservadas)
+COLUNAS_ATUALIZADAS = (
+    "nome", "descricao", "categoria_id", "unidade_medida", "preco_custo", "preco_venda",
+    "quantidade_minima", "quantidade_maxima", "imagem_url",
+)
+
+# Cabeçalhos de planilha aceitos além dos nomes dos campos (sem acento, minúsculos)
+_APELIDOS = {
+    "sku": "codigo_sku",
+    "codigo": "codigo_sku",
+    "categoria": "categoria_id",
+    "unidade": "unidade_medida",
+    "unidade_de_medida": "unidade_medida",
+    "preco_de_custo": "preco_custo",
+    "preco_de_venda": "preco_venda",
+    "estoque_minimo": "quantidade_minima",
+    "estoque_maximo": "quantidade_maxima",
+}
+_CAMPOS = set(ProdutoCreate.model_fields)
+_CAMPOS_DECIMAIS = {"preco_custo", "preco_venda"}
+_CAMPOS_INTEIROS = {"categoria_id", "quantidade_minima", "quantidade_maxima"}
+# Limites das colunas String(n) da tabela produtos
+_TAMANHOS = {
+    campo: Produto.__table__.c[campo].type.length
+    for campo in sorted(_CAMPOS)
+    if getattr(Produto.__table__.c[campo].type, "length", None)
+}
+
+
+# ---------------------------------------------------------------------- leitura
+
+def _nome_campo(cabecalho: str) -> Optional[str]:
+    nome = "_".join(termos_busca(str(cabecalho)))
+    nome = _APELIDOS.get(nome, nome)
+    return nome if nome in _CAMPOS else None
+
+
+def _normalizar_celula(campo: str, valor) -> Optional[str]:
+    """
+    Células de planilha chegam como texto: vazias viram ausentes, "1.234,56" vira
+    "1234.56" e inteiros exportados como "5.0" voltam a "5".
+    """
+    if valor is None:
+        return None
+    valor = str(valor).strip()
+    if not valor:
+        return None
+    if campo in _CAMPOS_DECIMAIS and "," in valor:
+        valor = valor.replace(".", "").replace(",", ".")
+    elif campo in _CAMPOS_INTEIROS and valor.endswith(".0"):
+        valor = valor[:-2]
+    return valor
+
+
+def _linhas_planilha(cabecalho: Iterable, linhas: Iterable[Tuple[int, Iterable]]) -> List[Tuple[int, dict]]:
+    campos = [_nome_campo(coluna) for coluna in cabecalho]
+    if "codigo_sku" not in campos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A planilha precisa de um cabeçalho com a coluna codigo_sku"
+        )
+    resultado = []
+    for numero, valores in linhas:
+        dados = {}
+        for campo, valor in zip(campos, valores):
+            if campo:
+                valor = _normalizar_celula(campo, valor)
+                if valor is not None:
+                    dados[campo] = valor
+        if dados:
+            resultado.append((numero, dados))
+    return resultado
+
+
+def ler_csv(conteudo: bytes) -> List[Tuple[int, dict]]:
+    try:
+        texto = conteudo.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        texto = conteudo.decode("latin-1")  # planilhas exportadas pelo Excel em português
+
+    try:
+        dialeto = csv.Sniffer().sniff(texto[:8192], delimiters=";,\t")
+    except csv.Error:
+        dialeto = csv.excel
+    leitor = csv.reader(io.StringIO(texto), dialeto)
+    cabecalho = next(leitor, [])
+    return _linhas_planilha(cabecalho, ((leitor.line_num, valores) for valores in leitor))
+
+
+def ler_excel(conteudo: bytes) -> List[Tuple[int, dict]]:
+    pd = carregar("excel")
+    tabela = pd.read_excel(io.BytesIO(conteudo), dtype=str, keep_default_na=False)
+    # Linha 1 da planilha é o cabeçalho
+    return _linhas_planilha(tabela.columns, enumerate(tabela.itertuples(index=False, name=None), start=2))
+
+
+def ler_json(conteudo: bytes) -> List[Tuple[int, dict]]:
+    try:
+        dados = json.loads(conteudo)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="JSON inválido")
+    if isinstance(dados, dict):
+        dados = dados.get("produtos")
+    if not isinstance(dados, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Envie uma lista de produtos (ou {\"produtos\": [...]})"
+        )
+    return list(enumerate(dados, start=1))
+
+
+async def ler_linhas(request: Request) -> List[Tuple[int, dict]]:
+    """
+    Lê o corpo da requisição: JSON ou multipart com o campo `arquivo` (.csv, .xlsx, .xls).
+    A conversão roda fora do event loop.
+    """
+    tipo = request.headers.get("content-type", "")
+    if not tipo.startswith("multipart/form-data"):
+        return await run_in_threadpool(ler_json, await request.body())
+
+    formulario = await request.form()
+    arquivo = formulario.get("arquivo")
+    if arquivo is None or isinstance(arquivo, str):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Envie a planilha no campo 'arquivo'"
+        )
+    nome = (arquivo.filename or "").lower()
+    conteudo = await arquivo.read()
+    if nome.endswith((".csv", ".txt")):
+        return await run_in_threadpool(ler_csv, conteudo)
+    if nome.endswith((".xlsx", ".xls")):
+        return await run_in_threadpool(ler_excel, conteudo)
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Formato não suportado; use .csv, .xlsx ou .xls"
+    )
+
+
+# ---------------------------------------------------------------------- validação
+
+def _mensagem_validacao(erro: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(parte) for parte in detalhe['loc'])}: {detalhe['msg']}" for detalhe in erro.errors()
+    )
+
+
+def _excede_tamanho(produto: ProdutoCreate) -> Optional[str]:
+    # O Postgres rejeitaria o lote inteiro; o SQLite gravaria o texto sem truncar
+    for campo, tamanho in _TAMANHOS.items():
+        valor = getattr(produto, campo)
+        if valor is not None and len(valor) > tamanho:
+            return f"{campo}: máximo de {tamanho} caracteres"
+    return None
+
+
+def validar_linhas(linhas: List[Tuple[int, dict]]) -> Tuple[List[dict], Dict[str, Tuple[int, ProdutoCreate]]]:
+    """
+    Valida cada linha com o schema de criação. Retorna o resultado por linha (na ordem
+    recebida) e os produtos válidos por SKU; em SKUs repetidos prevalece a última linha
+    (o upsert não pode alterar o mesmo registro duas vezes no mesmo comando).
+    """
+    resultados, validos = [], {}
+    for numero, dados in linhas:
+        resultado = {"linha": numero, "codigo_sku": None, "status": "erro", "id": None, "erro": None}
+        resultados.append(resultado)
+        if not isinstance(dados, dict):
+            resultado["erro"] = "Cada item deve ser um objeto"
+            continue
+        if dados.get("codigo_sku") is not None:
+            resultado["codigo_sku"] = str(dados["codigo_sku"])
+
+        try:
+            produto = ProdutoCreate.model_validate(dados)
+        except ValidationError as e:
+            resultado["erro"] = _mensagem_validacao(e)
+            continue
+        problema = _excede_tamanho(produto)
+        if problema:
+            resultado["erro"] = problema
+            continue
+
+        anterior = validos.pop(produto.codigo_sku, None)
+        if anterior is not None:
+            resultados[anterior[0]]["erro"] = f"SKU repetido no lote; prevalece a linha {numero}"
+        validos[produto.codigo_sku] = (len(resultados) - 1, produto)
+    return resultados, validos
+
+
+# ---------------------------------------------------------------------- gravação
+
+async def _upsert(db: AsyncSession, dialeto: str, valores: List[dict], agora: datetime) -> Dict[str, int]:
+    tabela = Produto.__table__
+    comando = (postgresql.insert if dialeto == "postgresql" else sqlite.insert)(tabela)
+    comando = comando.on_conflict_do_update(
+        index_elements=[tabela.c.codigo_sku],
+        set_={**{coluna: comando.excluded[coluna] for coluna in COLUNAS_ATUALIZADAS}, "data_atualizacao": agora},
+    ).returning(tabela.c.codigo_sku, tabela.c.id)
+    # executemany com RETURNING: o SQLAlchemy agrupa as linhas em INSERTs de múltiplos VALUES
+    return dict((await db.execute(comando, valores)).all())
+
+
+async def _inserir_e_atualizar(db: AsyncSession, valores: List[dict], existentes: Dict[str, int],
+                               agora: datetime) -> Dict[str, int]:
+    novos = [linha for linha in valores if linha["codigo_sku"] not in existentes]
+    alterados = [
+        {"id": existentes[linha["codigo_sku"]], "data_atualizacao": agora,
+         **{coluna: linha[coluna] for coluna in COLUNAS_ATUALIZADAS}}
+        for linha in valores if linha["codigo_sku"] in existentes
+    ]
+    ids = dict(existentes)
+    if alterados:
+        await db.execute(update(Produto), alterados)  # UPDATE em massa pela chave primária
+    if novos:
+        await db.execute(insert(Produto.__table__), novos)
+        ids.update((await db.execute(
+            select(Produto.codigo_sku, Produto.id).where(Produto.codigo_sku.in_([linha["codigo_sku"] for linha in novos]))
+        )).all())
+    return ids
+
+
+async def _gravar_lote(db: AsyncSession, dialeto: str, lote: List[Tuple[int, ProdutoCreate]], resultados: List[dict]):
+    agora = datetime.utcnow()
+    skus = [produto.codigo_sku for _, produto in lote]
+    existentes = dict((await db.execute(
+        select(Produto.codigo_sku, Produto.id).where(Produto.codigo_sku.in_(skus))
+    )).all())
+
+    valores = [
+        {**produto.model_dump(), "quantidade": 0, "data_criacao": agora, "data_atualizacao": agora}
+        for _, produto in lote
+    ]
+    if dialeto in ("postgresql", "sqlite"):
+        ids = await _upsert(db, dialeto, valores, agora)
+    else:
+        ids = await _inserir_e_atualizar(db, valores, existentes, agora)
+
+    for indice, produto in lote:
+        resultados[indice].update(
+            status="atualizado" if produto.codigo_sku in existentes else "criado",
+            id=ids[produto.codigo_sku],
+        )
+
+
+async def importar_produtos(db: AsyncSession, resultados: List[dict],
+                            validos: Dict[str, Tuple[int, ProdutoCreate]]) -> int:
+    """
+    Grava os produtos válidos em lotes e preenche `resultados`. Retorna quantos foram gravados.
+    """
+    ids_categorias = {produto.categoria_id for _, produto in validos.values()}
+    categorias = set((await db.scalars(select(Categoria.id).where(Categoria.id.in_(ids_categorias)))).all()) \
+        if ids_categorias else set()
+
+    pendentes = []
+    for indice, produto in validos.values():
+        if produto.categoria_id in categorias:
+            pendentes.append((indice, produto))
+        else:
+            resultados[indice]["erro"] = "Categoria não encontrada"
+
+    dialeto = db.get_bind().dialect.name
+    gravados = 0
+    for inicio in range(0, len(pendentes), TAMANHO_LOTE):
+        lote = pendentes[inicio:inicio + TAMANHO_LOTE]
+        try:
+            await _gravar_lote(db, dialeto, lote, resultados)
+            await incrementar_versao_catalogo(db)
+            await db.commit()
+            gravados += len(lote)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.warning("Falha ao gravar lote de %d produtos: %s", len(lote), e)
+            for indice, _ in lote:
+                resultados[indice].update(status="erro", id=None, erro=f"Falha ao gravar o lote: {e.__class__.__name__}")
+    return gravados
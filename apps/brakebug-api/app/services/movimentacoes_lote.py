@@ -0,0 +1,134 @@
+"""
+Movimentações de estoque em lote (POST /api/movimentacoes/batch).
+
+Recebimento e separação enviam dezenas a milhares de linhas de uma vez; em vez de
+uma requisição (autenticação, leitura do produto, commit) por linha, o lote inteiro
+é gravado numa transação com um número fixo de comandos:
+- uma consulta IN valida os produtos de todas as linhas;
+- as linhas são somadas por produto (saldo do lote) e um único UPDATE com
+  CASE id WHEN ... aplica os saldos, condicionado a não negativar o estoque
+  (mesma garantia da baixa atômica de app/services/estoque.py), com RETURNING;
+- as movimentações são gravadas com um INSERT em massa.
+
+Modos: tudo ou nada (padrão; qualquer erro desfaz o lote e responde 400 com as
+linhas recusadas) ou parcial (grava as linhas válidas; um produto sem saldo para o
+lote recusa todas as linhas dele).
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.movimentacao import Movimentacao
+from app.models.produto import Produto
+from app.schemas.movimentacao import MovimentacaoLote
+from app.services.cache_catalogo import publicar_versao_catalogo
+
+TIPOS = ("entrada", "saida")
+
+_PRODUTOS = Produto.__table__
+
+
+def _validar_linhas(pedido: MovimentacaoLote, existentes: set) -> List[dict]:
+    resultados = []
+    for indice, linha in enumerate(pedido.linhas, start=1):
+        erro = None
+        if linha.tipo not in TIPOS:
+            erro = "Tipo deve ser 'entrada' ou 'saida'"
+        elif linha.quantidade <= 0:
+            erro = "A quantidade deve ser maior que zero"
+        elif linha.produto_id not in existentes:
+            erro = "Produto não encontrado"
+        resultados.append({"linha": indice, "produto_id": linha.produto_id,
+                           "status": "erro" if erro else "pendente", "erro": erro})
+    return resultados
+
+
+async def _aplicar_saldos(db: AsyncSession, saldos: Dict[int, int]) -> Dict[int, int]:
+    """
+    Soma o saldo de cada produto num único UPDATE; produtos que ficariam negativos não
+    são alterados. Retorna produto_id -> nova quantidade dos produtos alterados.
+    """
+    quantidade = func.coalesce(_PRODUTOS.c.quantidade, 0)
+    if db.get_bind().dialect.update_returning:
+        delta = case(saldos, value=_PRODUTOS.c.id)
+        return dict((await db.execute(
+            update(_PRODUTOS)
+            .where(_PRODUTOS.c.id.in_(list(saldos)), quantidade + delta >= 0)
+            .values(quantidade=quantidade + delta)
+            .returning(_PRODUTOS.c.id, _PRODUTOS.c.quantidade)
+        )).all())
+
+    # Sem RETURNING: as linhas são travadas e a condição é conferida aqui
+    atuais = dict((await db.execute(
+        select(_PRODUTOS.c.id, quantidade).where(_PRODUTOS.c.id.in_(list(saldos))).with_for_update()
+    )).all())
+    aplicaveis = {produto_id: delta for produto_id, delta in saldos.items() if atuais[produto_id] + delta >= 0}
+    if aplicaveis:
+        await db.execute(
+            update(_PRODUTOS)
+            .where(_PRODUTOS.c.id.in_(list(aplicaveis)))
+            .values(quantidade=quantidade + case(aplicaveis, value=_PRODUTOS.c.id))
+        )
+    return {produto_id: atuais[produto_id] + delta for produto_id, delta in aplicaveis.items()}
+
+
+def _recusar(erros: List[dict]):
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={"mensagem": f"{len(erros)} linha(s) recusada(s); nenhuma movimentação foi gravada",
+                "linhas": erros},
+    )
+
+
+async def gravar_movimentacoes(db: AsyncSession, pedido: MovimentacaoLote, usuario_id: int) -> Dict:
+    """
+    Valida e grava o lote. Retorna os resultados por linha e o estoque final dos produtos alterados.
+    """
+    ids = {linha.produto_id for linha in pedido.linhas}
+    disponiveis = dict((await db.execute(
+        select(_PRODUTOS.c.id, _PRODUTOS.c.quantidade).where(_PRODUTOS.c.id.in_(ids))
+    )).all())
+    resultados = _validar_linhas(pedido, set(disponiveis))
+    if not pedido.parcial and any(resultado["status"] == "erro" for resultado in resultados):
+        _recusar([resultado for resultado in resultados if resultado["status"] == "erro"])
+
+    saldos: Dict[int, int] = defaultdict(int)
+    for resultado, linha in zip(resultados, pedido.linhas):
+        if resultado["status"] == "pendente":
+            saldos[linha.produto_id] += linha.quantidade if linha.tipo == "entrada" else -linha.quantidade
+
+    estoques = await _aplicar_saldos(db, dict(saldos)) if saldos else {}
+    for resultado in resultados:
+        if resultado["status"] == "pendente" and resultado["produto_id"] not in estoques:
+            disponivel = disponiveis[resultado["produto_id"]] or 0
+            resultado.update(status="erro", erro=f"Estoque insuficiente para o saldo do lote. Disponível: {disponivel}")
+
+    erros = [resultado for resultado in resultados if resultado["status"] == "erro"]
+    if erros and not pedido.parcial:
+        await db.rollback()
+        _recusar(erros)
+
+    agora = datetime.utcnow()
+    valores = [
+        {"produto_id": linha.produto_id, "usuario_id": usuario_id, "tipo": linha.tipo,
+         "quantidade": linha.quantidade, "data": agora, "observacoes": linha.observacoes}
+        for resultado, linha in zip(resultados, pedido.linhas) if resultado["status"] == "pendente"
+    ]
+    if valores:
+        await db.execute(insert(Movimentacao.__table__), valores)
+        await db.commit()
+        await publicar_versao_catalogo(db)
+    for resultado in resultados:
+        if resultado["status"] == "pendente":
+            resultado["status"] = "gravada"
+
+    return {
+        "resultados": resultados,
+        "gravadas": len(valores),
+        "estoques": [{"produto_id": produto_id, "quantidade": quantidade}
+                     for produto_id, quantidade in sorted(estoques.items())],
+    }
@@ -0,0 +1,164 @@
+"""
+Tendências de movimentações (GET /api/movimentacoes/tendencias) a partir do rollup diário.
+
+Os triggers de app/models/movimentacao_rollup.py mantêm um total por produto/dia/tipo;
+a tendência soma essas linhas por dia (no máximo uma por produto, dia e tipo, em vez
+de todas as movimentações do período) e agrupa os dias em semanas (segunda a domingo)
+ou meses aqui, preenchendo com zero os períodos sem movimento.
+
+reconstruir_rollup refaz os totais a partir do histórico em lotes de dias (um commit
+por lote), para a carga inicial de bases grandes ou para reparar o rollup.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.movimentacao import Movimentacao
+from app.models.movimentacao_rollup import DIALETOS_ROLLUP, MovimentacaoRollup, origem_rollup, recalcular_rollup
+from app.models.produto import Produto
+
+logger = logging.getLogger(__name__)
+
+GRANULARIDADES = ("dia", "semana", "mes")
+
+# Intervalo padrão (quando data_inicio não é informada) e máximo de períodos por consulta
+PERIODOS_PADRAO = {"dia": 30, "semana": 12, "mes": 12}
+MAXIMO_PERIODOS = 400
+
+
+def inicio_periodo(dia: date, granularidade: str) -> date:
+    if granularidade == "semana":
+        return dia - timedelta(days=dia.weekday())
+    if granularidade == "mes":
+        return dia.replace(day=1)
+    return dia
+
+
+def proximo_periodo(inicio: date, granularidade: str) -> date:
+    if granularidade == "semana":
+        return inicio + timedelta(days=7)
+    if granularidade == "mes":
+        return (inicio + timedelta(days=32)).replace(day=1)
+    return inicio + timedelta(days=1)
+
+
+def _recuar_periodos(fim: date, granularidade: str, periodos: int) -> date:
+    inicio = inicio_periodo(fim, granularidade)
+    for _ in range(periodos - 1):
+        inicio = inicio_periodo(inicio - timedelta(days=1), granularidade)
+    return inicio
+
+
+async def tendencias(
+    db: AsyncSession,
+    granularidade: str,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    produto_id: Optional[int] = None,
+    categoria_id: Optional[int] = None,
+) -> dict:
+    """
+    Entradas e saídas por período entre data_inicio e data_fim (dias UTC, inclusive).
+    """
+    data_fim = data_fim or datetime.utcnow().date()
+    data_inicio = data_inicio or _recuar_periodos(data_fim, granularidade, PERIODOS_PADRAO[granularidade])
+    if data_inicio > data_fim:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="data_inicio posterior a data_fim")
+
+    periodos = []
+    inicio = inicio_periodo(data_inicio, granularidade)
+    while inicio <= data_fim:
+        periodos.append(inicio)
+        if len(periodos) > MAXIMO_PERIODOS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Intervalo acima de {MAXIMO_PERIODOS} períodos; use uma granularidade maior",
+            )
+        inicio = proximo_periodo(inicio, granularidade)
+
+    rollup = origem_rollup(db.get_bind().dialect.name)
+    consulta = (
+        select(rollup.c.dia, rollup.c.tipo, func.sum(rollup.c.quantidade), func.sum(rollup.c.movimentacoes))
+        .where(rollup.c.dia >= data_inicio, rollup.c.dia <= data_fim)
+        .group_by(rollup.c.dia, rollup.c.tipo)
+    )
+    if produto_id is not None:
+        consulta = consulta.where(rollup.c.produto_id == produto_id)
+    if categoria_id is not None:
+        consulta = consulta.where(rollup.c.produto_id.in_(select(Produto.id).where(Produto.categoria_id == categoria_id)))
+
+    totais = defaultdict(lambda: {"entradas": 0, "saidas": 0, "movimentacoes": 0})
+    for dia, tipo, quantidade, movimentacoes in await db.execute(consulta):
+        total = totais[inicio_periodo(dia, granularidade)]
+        total["entradas" if tipo == "entrada" else "saidas"] += int(quantidade or 0)
+        total["movimentacoes"] += int(movimentacoes or 0)
+
+    return {
+        "granularidade": granularidade,
+        "data_inicio": data_inicio,
+        "data_fim": data_fim,
+        "produto_id": produto_id,
+        "categoria_id": categoria_id,
+        "periodos": [
+            {"periodo": periodo, **totais[periodo],
+             "saldo": totais[periodo]["entradas"] - totais[periodo]["saidas"]}
+            for periodo in periodos
+        ],
+    }
+
+
+# ---------------------------------------------------------------------- reconstrução
+
+async def reconstruir_rollup(
+    db: AsyncSession,
+    desde: Optional[date] = None,
+    ate: Optional[date] = None,
+    dias_por_lote: int = 31,
+) -> List[Tuple[date, date]]:
+    """
+    Refaz os totais dos dias entre `desde` e `ate` (padrão: todo o histórico) a partir de
+    movimentacoes, `dias_por_lote` dias por transação. Retorna os lotes processados.
+    """
+    dialeto = db.get_bind().dialect.name
+    if dialeto not in DIALETOS_ROLLUP:
+        # Sem triggers não há rollup: as tendências já agregam direto de movimentacoes
+        return []
+
+    if desde is None or ate is None:
+        primeira, ultima = (await db.execute(
+            select(func.min(Movimentacao.data), func.max(Movimentacao.data))
+        )).one()
+        if primeira is None:
+            await db.execute(MovimentacaoRollup.__table__.delete())
+            await db.commit()
+            return []
+        if desde is None:
+            # Totais anteriores ao histórico (movimentações já removidas) deixam de valer
+            desde = primeira.date()
+            tabela = MovimentacaoRollup.__table__
+            await db.execute(tabela.delete().where(tabela.c.dia < desde))
+        ate = ate or ultima.date()
+
+    lotes = []
+    inicio = desde
+    while inicio <= ate:
+        fim = min(inicio + timedelta(days=dias_por_lote - 1), ate)
+        if dialeto == "postgresql":
+            # Escritas concorrentes esperam o lote (o trigger não pode somar numa linha
+            # que o lote acabou de apagar e ainda vai reinserir)
+            await db.execute(text("LOCK TABLE movimentacoes IN SHARE MODE"))
+        await db.run_sync(lambda sessao: recalcular_rollup(
+            sessao.connection(),
+            datetime.combine(inicio, time.min),
+            datetime.combine(fim + timedelta(days=1), time.min),
+        ))
+        await db.commit()
+        logger.info("Rollup de movimentações reconstruído: %s a %s", inicio, fim)
+        lotes.append((inicio, fim))
+        inicio = fim + timedelta(days=1)
+    return lotes
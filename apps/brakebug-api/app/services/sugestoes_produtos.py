@@ -0,0 +1,277 @@
+"""
+Índice em memória para o autocomplete do catálogo (GET /api/produtos/suggest).
+
+Estruturas (todas sem acento e em minúsculas):
+- nomes completos ordenados: "ração gat" encontra primeiro os nomes que começam assim;
+- palavras do nome e do SKU ordenadas (chaves + ids em listas paralelas): o prefixo
+  digitado é localizado com bisect e a varredura para ao completar o limite;
+- vocabulário das palavras dos nomes com índice de trigramas (como o pg_trgm): um
+  termo sem nenhum prefixo conhecido é corrigido para a palavra mais parecida.
+Nenhuma consulta ao banco por tecla.
+
+O índice é montado no startup, atualizado quando criar_produto/atualizar_produto
+fazem commit e recarregado periodicamente (SUGESTOES_RECARGA_SEGUNDOS) para
+incorporar alterações feitas por outros workers.
+"""
+import logging
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.models.produto import Produto
+from app.services.busca_produtos import termos_busca
+
+logger = logging.getLogger(__name__)
+
+# Tamanho máximo de uma faixa de prefixo convertida em conjunto (mantém a latência estável)
+LIMITE_CANDIDATOS = 30000
+# Similaridade mínima (trigramas em comum / união) para corrigir um termo digitado errado
+SIMILARIDADE_MINIMA = 0.4
+TAMANHO_MINIMO_CORRECAO = 3
+
+_FIM = "\uffff"
+
+
+def trigramas(palavra: str) -> set:
+    """
+    Trigramas no formato do pg_trgm: a palavra com dois espaços antes e um depois.
+    """
+    texto = f"  {palavra} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _normalizar_produto(nome: str, codigo_sku: str) -> Tuple[str, Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Nome normalizado, palavras do nome e chaves indexadas (nome + SKU + SKU sem separadores).
+    """
+    # Palavras se repetem muito entre produtos: intern compartilha as strings
+    palavras_nome = [sys.intern(palavra) for palavra in termos_busca(nome or "")]
+    palavras_sku = termos_busca(codigo_sku or "")
+    if len(palavras_sku) > 1:
+        palavras_sku.append("".join(palavras_sku))
+    chaves = tuple(dict.fromkeys(palavras_nome + [sys.intern(palavra) for palavra in palavras_sku]))
+    return " ".join(palavras_nome), tuple(palavras_nome), chaves
+
+
+def _faixa(ordenadas: List[str], prefixo: str) -> Tuple[int, int]:
+    inicio = bisect_left(ordenadas, prefixo)
+    return inicio, bisect_left(ordenadas, prefixo + _FIM, inicio)
+
+
+def _posicao(ordenadas: List[str], ids: List[int], chave: str, produto_id: int) -> int:
+    # Entradas ordenadas por (chave, id): bisect na chave e depois no id dentro do bloco
+    inicio = bisect_left(ordenadas, chave)
+    return bisect_left(ids, produto_id, inicio, bisect_right(ordenadas, chave, inicio))
+
+
+def _inserir(ordenadas: List[str], ids: List[int], chave: str, produto_id: int):
+    posicao = _posicao(ordenadas, ids, chave, produto_id)
+    ordenadas.insert(posicao, chave)
+    ids.insert(posicao, produto_id)
+
+
+def _excluir(ordenadas: List[str], ids: List[int], chave: str, produto_id: int):
+    posicao = _posicao(ordenadas, ids, chave, produto_id)
+    if posicao < len(ids) and ids[posicao] == produto_id and ordenadas[posicao] == chave:
+        del ordenadas[posicao]
+        del ids[posicao]
+
+
+class _Estado:
+    """
+    Estruturas de um índice completo; trocadas atomicamente em cada recarga.
+    """
+
+    __slots__ = ("produtos", "nomes", "ids_nomes", "chaves", "ids_chaves", "vocabulario", "trigramas")
+
+    def __init__(self):
+        self.produtos = {}  # id -> (nome, codigo_sku, nome_normalizado, chaves)
+        self.nomes: List[str] = []
+        # ids em listas (e não array): reaproveitam os mesmos objetos int das chaves de
+        # produtos, ocupam o mesmo espaço e não precisam ser convertidos a cada consulta
+        self.ids_nomes: List[int] = []
+        self.chaves: List[str] = []
+        self.ids_chaves: List[int] = []
+        self.vocabulario = set()
+        self.trigramas = {}  # trigrama -> palavras do vocabulário
+
+    def adicionar_vocabulario(self, palavras: Iterable[str]):
+        for palavra in palavras:
+            if palavra in self.vocabulario or len(palavra) < TAMANHO_MINIMO_CORRECAO or palavra.isdigit():
+                continue
+            self.vocabulario.add(palavra)
+            for trigrama in trigramas(palavra):
+                self.trigramas.setdefault(trigrama, []).append(palavra)
+
+
+class IndiceSugestoes:
+
+    def __init__(self):
+        self._estado = _Estado()
+        self.pronto = False
+        self.atualizado_em: Optional[float] = None
+
+    def __len__(self):
+        return len(self._estado.produtos)
+
+    # ------------------------------------------------------------------ construção
+
+    def construir(self, produtos: Iterable[Tuple[int, str, str]]):
+        """
+        Monta um índice novo a partir de (id, nome, codigo_sku) e o publica de uma vez.
+        """
+        inicio = time.perf_counter()
+        estado = _Estado()
+        nomes, chaves = [], []
+        for produto_id, nome, codigo_sku in produtos:
+            nome_normalizado, palavras_nome, chaves_produto = _normalizar_produto(nome, codigo_sku)
+            estado.produtos[produto_id] = (nome, codigo_sku, nome_normalizado, chaves_produto)
+            nomes.append((nome_normalizado, produto_id))
+            chaves.extend((chave, produto_id) for chave in chaves_produto)
+            estado.adicionar_vocabulario(palavras_nome)
+
+        nomes.sort()
+        chaves.sort()
+        estado.nomes = [nome for nome, _ in nomes]
+        estado.ids_nomes = [produto_id for _, produto_id in nomes]
+        estado.chaves = [chave for chave, _ in chaves]
+        estado.ids_chaves = [produto_id for _, produto_id in chaves]
+
+        self._estado = estado
+        self.pronto = True
+        self.atualizado_em = time.time()
+        logger.info(
+            "Índice de sugestões montado: %d produtos em %.0f ms",
+            len(estado.produtos), (time.perf_counter() - inicio) * 1000,
+        )
+
+    def recarregar(self):
+        """
+        Relê id/nome/SKU de todos os produtos (réplica de leitura, quando configurada).
+        """
+        from app.database import ReadSessionLocal
+
+        with ReadSessionLocal() as db:
+            linhas = db.execute(select(Produto.id, Produto.nome, Produto.codigo_sku)).all()
+        self.construir(linhas)
+
+    # ------------------------------------------------------------ atualização incremental
+
+    def atualizar(self, produto_id: int, nome: str, codigo_sku: str):
+        """
+        Insere ou substitui um produto (chamado após o commit de criar/atualizar).
+        """
+        if not self.pronto:
+            return
+        estado = self._estado
+        nome_normalizado, palavras_nome, chaves = _normalizar_produto(nome, codigo_sku)
+        atual = estado.produtos.get(produto_id)
+        if atual is not None and atual[2] == nome_normalizado and atual[3] == chaves:
+            estado.produtos[produto_id] = (nome, codigo_sku, nome_normalizado, chaves)
+            return
+
+        self.remover(produto_id)
+        estado.produtos[produto_id] = (nome, codigo_sku, nome_normalizado, chaves)
+        _inserir(estado.nomes, estado.ids_nomes, nome_normalizado, produto_id)
+        for chave in chaves:
+            _inserir(estado.chaves, estado.ids_chaves, chave, produto_id)
+        estado.adicionar_vocabulario(palavras_nome)
+
+    def remover(self, produto_id: int):
+        estado = self._estado
+        atual = estado.produtos.pop(produto_id, None)
+        if atual is None:
+            return
+        _excluir(estado.nomes, estado.ids_nomes, atual[2], produto_id)
+        for chave in atual[3]:
+            _excluir(estado.chaves, estado.ids_chaves, chave, produto_id)
+
+    # ------------------------------------------------------------------ consulta
+
+    def sugerir(self, texto: str, limite: int = 10) -> List[dict]:
+        """
+        Produtos cujo nome começa com o texto, depois os que têm palavras (nome/SKU)
+        começando com cada termo; termos desconhecidos são corrigidos por trigramas.
+        """
+        termos = termos_busca(texto)
+        if not termos:
+            return []
+        estado = self._estado
+
+        encontrados = self._por_prefixo(estado, termos, limite)
+        if len(encontrados) < limite:
+            corrigidos = self._corrigir(estado, termos)
+            if corrigidos != termos:
+                for produto_id in self._por_prefixo(estado, corrigidos, limite):
+                    encontrados.setdefault(produto_id, None)
+
+        return [
+            {"id": produto_id, "nome": estado.produtos[produto_id][0], "codigo_sku": estado.produtos[produto_id][1]}
+            for produto_id in list(encontrados)[:limite]
+        ]
+
+    @staticmethod
+    def _por_prefixo(estado: _Estado, termos: List[str], limite: int) -> dict:
+        encontrados = {}  # dict preserva a ordem de relevância
+
+        # 1. nomes que começam com o texto digitado
+        inicio, fim = _faixa(estado.nomes, " ".join(termos))
+        for produto_id in estado.ids_nomes[inicio:min(fim, inicio + limite)]:
+            encontrados[produto_id] = None
+        if len(encontrados) >= limite:
+            return encontrados
+
+        # 2. produtos com alguma palavra começando por cada termo: as faixas menores são
+        # intersectadas como conjuntos (em C); termos muito genéricos filtram no final
+        faixas = sorted(
+            (_faixa(estado.chaves, termo) + (termo,) for termo in termos),
+            key=lambda faixa: faixa[1] - faixa[0],
+        )
+        inicio, fim, _ = faixas[0]
+        candidatos = set(estado.ids_chaves[inicio:min(fim, inicio + LIMITE_CANDIDATOS)])
+        genericos = []
+        for inicio, fim, termo in faixas[1:]:
+            if fim - inicio <= LIMITE_CANDIDATOS:
+                candidatos.intersection_update(estado.ids_chaves[inicio:fim])
+            else:
+                genericos.append(termo)
+
+        for produto_id in candidatos:
+            if produto_id in encontrados:
+                continue
+            chaves = estado.produtos[produto_id][3]
+            if all(any(chave.startswith(termo) for chave in chaves) for termo in genericos):
+                encontrados[produto_id] = None
+                if len(encontrados) >= limite:
+                    break
+        return encontrados
+
+    @staticmethod
+    def _corrigir(estado: _Estado, termos: List[str]) -> List[str]:
+        """
+        Troca cada termo sem prefixo conhecido pela palavra do vocabulário mais parecida.
+        """
+        corrigidos = []
+        for termo in termos:
+            inicio, fim = _faixa(estado.chaves, termo)
+            if fim > inicio or len(termo) < TAMANHO_MINIMO_CORRECAO:
+                corrigidos.append(termo)
+                continue
+            grupo = trigramas(termo)
+            contagem = Counter()
+            for trigrama in grupo:
+                contagem.update(estado.trigramas.get(trigrama, ()))
+            melhor, maior = termo, SIMILARIDADE_MINIMA
+            for palavra, comuns in contagem.most_common(20):
+                similaridade = comuns / (len(grupo) + len(trigramas(palavra)) - comuns)
+                if similaridade > maior:
+                    melhor, maior = palavra, similaridade
+            corrigidos.append(melhor)
+        return corrigidos
+
+
+indice_sugestoes = IndiceSugestoes()
@@ -0,0 +1,333 @@
+"""
+Compressão das respostas HTTP (zstd, br ou gzip, conforme o Accept-Encoding).
+
+Middleware ASGI:
+- respostas completas abaixo de COMPRESSAO_MINIMO_BYTES saem sem compressão; acima,
+  são comprimidas de uma vez (corpos grandes numa thread, sem travar o event loop);
+- StreamingResponse (exportações) é comprimida bloco a bloco, sem Content-Length;
+- text/event-stream não é comprimido (cada alerta precisa sair na hora);
+- respostas com ETag forte (catálogo) têm os bytes comprimidos guardados por
+  (ETag, codificação): o payload quente é comprimido uma vez por worker, não por requisição.
+
+A representação comprimida recebe ETag próprio ("<etag>-br"), como exige o RFC 9110;
+a validação do catálogo remove o sufixo antes de comparar (`remover_codificacao_etag`).
+zstd e br usam os pacotes `zstandard` e `brotli` (requirements.txt); numa instalação sem
+eles, só gzip. Razão de compressão e tempo de CPU por rota em /api/diagnostico/compressao;
+por codificação, com conferência da descompressão, em scripts/benchmark_compressao.py.
+"""
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import settings
+from app.utils.consultas_sql import rota_requisicao
+
+try:
+    import brotli
+except ImportError:  # pacote opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pacote opcional
+    zstandard = None
+
+# Preferência do servidor quando o cliente aceita mais de uma com o mesmo q
+CODIFICACOES = tuple(
+    nome for nome, modulo in (("zstd", zstandard), ("br", brotli), ("gzip", zlib)) if modulo is not None
+)
+
+TIPOS_COMPRIMIVEIS = {
+    "application/json", "application/javascript", "application/xml", "application/x-ndjson",
+    "application/problem+json", "image/svg+xml",
+}
+
+# Corpos acima disso são comprimidos numa thread
+TAMANHO_COMPRESSAO_THREAD = 256 * 1024
+
+# Corpos comprimidos acima disso não são guardados
+TAMANHO_MAXIMO_CACHE = 2 * 1024 * 1024
+
+
+def negociar(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Codificação escolhida para o Accept-Encoding (q-values e "*"), ou None.
+    """
+    if not accept_encoding:
+        return None
+    pesos = {}
+    for item in accept_encoding.lower().split(","):
+        nome, _, parametros = item.strip().partition(";")
+        q = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                q = float(parametros[2:])
+            except ValueError:
+                q = 0.0
+        pesos[nome.strip()] = q
+    curinga = pesos.get("*", 0.0)
+    candidatas = [(pesos.get(nome, curinga), -ordem, nome) for ordem, nome in enumerate(CODIFICACOES)]
+    q, _, nome = max(candidatas, default=(0.0, 0, None))
+    return nome if q > 0 else None
+
+
+def _comprimivel(tipo_conteudo: str) -> bool:
+    tipo = tipo_conteudo.split(";")[0].strip().lower()
+    if tipo == "text/event-stream":
+        return False
+    return tipo.startswith("text/") or tipo in TIPOS_COMPRIMIVEIS or tipo.endswith(("+json", "+xml"))
+
+
+def etag_codificado(etag: str, codificacao: str) -> str:
+    return f'{etag[:-1]}-{codificacao}"' if etag.endswith('"') else etag
+
+
+def remover_codificacao_etag(etag: str) -> str:
+    """
+    '"5-abc-br"' -> '"5-abc"': ETag da representação sem compressão.
+    """
+    for codificacao in ("zstd", "br", "gzip"):
+        sufixo = f'-{codificacao}"'
+        if etag.endswith(sufixo):
+            return etag[:-len(sufixo)] + '"'
+    return etag
+
+
+class _Compressor:
+    """
+    Interface única para os compressores incrementais (comprimir + finalizar).
+    """
+
+    def __init__(self, codificacao: str):
+        if codificacao == "gzip":
+            self._objeto = zlib.compressobj(settings.COMPRESSAO_NIVEL_GZIP, zlib.DEFLATED, 31)
+            self.comprimir, self.finalizar = self._objeto.compress, self._objeto.flush
+        elif codificacao == "br":
+            self._objeto = brotli.Compressor(quality=settings.COMPRESSAO_NIVEL_BROTLI)
+            self.comprimir, self.finalizar = self._objeto.process, self._objeto.finish
+        else:
+            self._objeto = zstandard.ZstdCompressor(level=settings.COMPRESSAO_NIVEL_ZSTD).compressobj()
+            self.comprimir, self.finalizar = self._objeto.compress, self._objeto.flush
+
+
+def comprimir(corpo: bytes, codificacao: str):
+    """
+    Comprime o corpo inteiro; devolve (bytes, segundos de CPU).
+    """
+    inicio = time.thread_time()
+    compressor = _Compressor(codificacao)
+    resultado = compressor.comprimir(corpo) + compressor.finalizar()
+    return resultado, time.thread_time() - inicio
+
+
+class CacheCompressao:
+    """
+    Corpos já comprimidos por (ETag, codificação), LRU por worker.
+    """
+
+    def __init__(self, maximo: int):
+        self.maximo = maximo
+        self._lock = threading.Lock()
+        self._corpos = OrderedDict()
+
+    def obter(self, etag: str, codificacao: str) -> Optional[bytes]:
+        with self._lock:
+            corpo = self._corpos.get((etag, codificacao))
+            if corpo is not None:
+                self._corpos.move_to_end((etag, codificacao))
+            return corpo
+
+    def guardar(self, etag: str, codificacao: str, corpo: bytes):
+        if self.maximo <= 0 or len(corpo) > TAMANHO_MAXIMO_CACHE:
+            return
+        with self._lock:
+            self._corpos[(etag, codificacao)] = corpo
+            self._corpos.move_to_end((etag, codificacao))
+            while len(self._corpos) > self.maximo:
+                self._corpos.popitem(last=False)
+
+    def __len__(self):
+        return len(self._corpos)
+
+
+class MetricasCompressao:
+    """
+    Bytes antes/depois e tempo de CPU de compressão acumulados por rota.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rotas = {}
+
+    def registrar(self, rota: str, codificacao: Optional[str], original: int, enviado: int,
+                  cpu_segundos: float = 0.0, reaproveitada: bool = False):
+        with self._lock:
+            dados = self._rotas.setdefault(rota, {
+                "respostas": 0, "comprimidas": 0, "reaproveitadas": 0,
+                "bytes_originais": 0, "bytes_enviados": 0, "cpu_ms": 0.0, "codificacoes": {},
+            })
+            dados["respostas"] += 1
+            dados["bytes_originais"] += original
+            dados["bytes_enviados"] += enviado
+            dados["cpu_ms"] += cpu_segundos * 1000
+            if codificacao is not None:
+                dados["comprimidas"] += 1
+                dados["reaproveitadas"] += reaproveitada
+                dados["codificacoes"][codificacao] = dados["codificacoes"].get(codificacao, 0) + 1
+
+    def resumo(self) -> list:
+        with self._lock:
+            rotas = [
+                {
+                    "rota": rota,
+                    "respostas": dados["respostas"],
+                    "comprimidas": dados["comprimidas"],
+                    "reaproveitadas": dados["reaproveitadas"],
+                    "codificacoes": dict(dados["codificacoes"]),
+                    "bytes_originais": dados["bytes_originais"],
+                    "bytes_enviados": dados["bytes_enviados"],
+                    "razao": round(dados["bytes_originais"] / dados["bytes_enviados"], 2) if dados["bytes_enviados"] else None,
+                    "cpu_ms": round(dados["cpu_ms"], 3),
+                    "cpu_medio_ms": round(dados["cpu_ms"] / dados["comprimidas"], 3) if dados["comprimidas"] else 0.0,
+                }
+                for rota, dados in self._rotas.items()
+            ]
+        return sorted(rotas, key=lambda r: r["bytes_originais"], reverse=True)
+
+
+cache_compressao = CacheCompressao(settings.COMPRESSAO_CACHE_ITENS)
+metricas_compressao = MetricasCompressao()
+
+
+class CompressaoMiddleware:
+    """
+    Middleware ASGI de compressão (ver docstring do módulo).
+    """
+
+    def __init__(self, app, minimo: Optional[int] = None):
+        self.app = app
+        self.minimo = settings.COMPRESSAO_MINIMO_BYTES if minimo is None else minimo
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cabecalhos_requisicao = Headers(scope=scope)
+        codificacao = negociar(cabecalhos_requisicao.get("accept-encoding"))
+        inicio_resposta = None
+        compressor = None  # streaming em andamento
+        passar = False  # resposta enviada como veio
+        totais = {"original": 0, "enviado": 0, "cpu": 0.0}
+
+        async def enviar(mensagem):
+            nonlocal inicio_resposta, compressor, passar
+
+            if mensagem["type"] == "http.response.start":
+                # Segurado até o primeiro bloco do corpo: os cabeçalhos dependem dele
+                inicio_resposta = {**mensagem, "headers": list(mensagem.get("headers", []))}
+                return
+            if mensagem["type"] != "http.response.body" or passar:
+                await send(mensagem)
+                return
+
+            corpo = mensagem.get("body", b"")
+            mais = mensagem.get("more_body", False)
+
+            if compressor is not None:
+                inicio = time.thread_time()
+                saida = compressor.comprimir(corpo) if corpo else b""
+                if not mais:
+                    saida += compressor.finalizar()
+                totais["cpu"] += time.thread_time() - inicio
+                totais["original"] += len(corpo)
+                totais["enviado"] += len(saida)
+                if not mais:
+                    metricas_compressao.registrar(rota_requisicao(scope), codificacao, totais["original"],
+                                                  totais["enviado"], totais["cpu"])
+                await send({"type": "http.response.body", "body": saida, "more_body": mais})
+                return
+
+            cabecalhos = MutableHeaders(raw=inicio_resposta["headers"])
+            status = inicio_resposta["status"]
+
+            if status == 304:
+                self._etag_304(cabecalhos, cabecalhos_requisicao)
+                passar = True
+                await send(inicio_resposta)
+                await send(mensagem)
+                return
+
+            if "content-encoding" in cabecalhos or not _comprimivel(cabecalhos.get("content-type", "")):
+                passar = True
+                await send(inicio_resposta)
+                await send(mensagem)
+                return
+
+            cabecalhos.add_vary_header("Accept-Encoding")
+            if codificacao is None or (not mais and len(corpo) < self.minimo):
+                passar = True
+                if not mais:
+                    metricas_compressao.registrar(rota_requisicao(scope), None, len(corpo), len(corpo))
+                await send(inicio_resposta)
+                await send(mensagem)
+                return
+
+            cabecalhos["Content-Encoding"] = codificacao
+            etag = cabecalhos.get("etag")
+            if etag:
+                cabecalhos["ETag"] = etag_codificado(etag, codificacao)
+
+            if mais:
+                # Streaming: comprimido bloco a bloco
+                del cabecalhos["Content-Length"]
+                compressor = _Compressor(codificacao)
+                await send(inicio_resposta)
+                await enviar(mensagem)
+                return
+
+            passar = True
+            comprimido = await self._comprimir_corpo(scope, corpo, codificacao, etag if status == 200 else None)
+            cabecalhos["Content-Length"] = str(len(comprimido))
+            await send(inicio_resposta)
+            await send({"type": "http.response.body", "body": comprimido})
+
+        await self.app(scope, receive, enviar)
+
+    async def _comprimir_corpo(self, scope, corpo: bytes, codificacao: str, etag: Optional[str]) -> bytes:
+        # Só ETags fortes identificam bytes exatos
+        guardavel = etag is not None and not etag.startswith("W/")
+        if guardavel:
+            comprimido = cache_compressao.obter(etag, codificacao)
+            if comprimido is not None:
+                metricas_compressao.registrar(rota_requisicao(scope), codificacao, len(corpo), len(comprimido),
+                                              reaproveitada=True)
+                return comprimido
+
+        if len(corpo) >= TAMANHO_COMPRESSAO_THREAD:
+            comprimido, cpu = await anyio.to_thread.run_sync(comprimir, corpo, codificacao)
+        else:
+            comprimido, cpu = comprimir(corpo, codificacao)
+        metricas_compressao.registrar(rota_requisicao(scope), codificacao, len(corpo), len(comprimido), cpu)
+        if guardavel:
+            cache_compressao.guardar(etag, codificacao, comprimido)
+        return comprimido
+
+    @staticmethod
+    def _etag_304(cabecalhos: MutableHeaders, cabecalhos_requisicao: Headers):
+        # 304 devolve o ETag da variante que o cliente validou (com o sufixo da codificação)
+        etag = cabecalhos.get("etag")
+        if not etag:
+            return
+        for candidato in cabecalhos_requisicao.get("if-none-match", "").split(","):
+            candidato = candidato.strip()
+            if candidato != etag and remover_codificacao_etag(candidato.removeprefix("W/")) == etag.removeprefix("W/"):
+                cabecalhos["ETag"] = candidato
+                break
+        cabecalhos.add_vary_header("Accept-Encoding")
@@ -0,0 +1,202 @@
+"""
+Registro de consultas lentas com captura automática do plano de execução.
+
+Toda instrução acima de SLOW_QUERY_MS é registrada com parâmetros, rota e handler
+que a originou. Para SELECTs também é capturado o plano: EXPLAIN (ANALYZE, BUFFERS)
+no Postgres, EXPLAIN QUERY PLAN no SQLite (no máximo uma vez por formato de SQL a
+cada EXPLAIN_INTERVALO segundos, já que o ANALYZE executa a consulta novamente).
+
+Os registros ficam em memória (últimos SLOW_QUERY_BUFFER, vistos em
+/api/diagnostico/consultas-lentas) e em um arquivo rotativo (SLOW_QUERY_LOG_FILE).
+"""
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.utils.consultas_sql import estatisticas_atuais, formato_sql
+
+logger = logging.getLogger(__name__)
+
+# Logger dedicado ao arquivo rotativo (uma linha JSON por consulta lenta)
+logger_arquivo = logging.getLogger("brakebug.consultas_lentas")
+logger_arquivo.propagate = False
+
+EXPLAIN_INTERVALO = 300
+TAMANHO_MAXIMO_SQL = 4000
+TAMANHO_MAXIMO_PARAMETROS = 1000
+
+
+class RegistroConsultasLentas:
+    """
+    Buffer circular (thread-safe) com as últimas consultas lentas.
+    """
+
+    def __init__(self, capacidade: int):
+        self._lock = threading.Lock()
+        self._registros = deque(maxlen=capacidade)
+        self._ultimo_explain = {}
+
+    def adicionar(self, registro: dict):
+        with self._lock:
+            self._registros.append(registro)
+
+    def deve_explicar(self, formato: str) -> bool:
+        agora = time.monotonic()
+        with self._lock:
+            if agora - self._ultimo_explain.get(formato, -EXPLAIN_INTERVALO) < EXPLAIN_INTERVALO:
+                return False
+            self._ultimo_explain[formato] = agora
+            return True
+
+    def listar(self, limite: int = 50) -> list:
+        with self._lock:
+            return list(self._registros)[-limite:][::-1]
+
+    def limpar(self):
+        with self._lock:
+            self._registros.clear()
+            self._ultimo_explain.clear()
+
+
+consultas_lentas = RegistroConsultasLentas(settings.SLOW_QUERY_BUFFER)
+
+
+_lock_arquivo = threading.Lock()
+_arquivo_configurado = False
+
+
+def configurar_arquivo():
+    """
+    Adiciona o RotatingFileHandler ao logger de consultas lentas (uma única vez, na primeira
+    consulta lenta: importar a aplicação não cria diretórios nem arquivos).
+    """
+    global _arquivo_configurado
+    if _arquivo_configurado:
+        return
+    with _lock_arquivo:
+        if _arquivo_configurado:
+            return
+        _arquivo_configurado = True
+        if not settings.SLOW_QUERY_LOG_FILE or logger_arquivo.handlers:
+            return
+        caminho = Path(settings.SLOW_QUERY_LOG_FILE)
+        try:
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(caminho, maxBytes=5 * 1024 * 1024, backupCount=5, encoding="utf-8")
+        except OSError as erro:
+            logger.warning("Arquivo de consultas lentas indisponível (%s): %s", caminho, erro)
+            return
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger_arquivo.addHandler(handler)
+        logger_arquivo.setLevel(logging.INFO)
+
+
+def _origem() -> tuple:
+    """
+    Rota e handler da requisição atual (via middleware de consultas); fora de uma
+    requisição, a primeira função do pacote app na pilha de chamadas.
+    """
+    estatisticas = estatisticas_atuais()
+    scope = getattr(estatisticas, "scope", None)
+    if scope is not None:
+        rota = getattr(scope.get("route"), "path", scope.get("path"))
+        endpoint = scope.get("endpoint")
+        handler = f"{endpoint.__module__}.{endpoint.__qualname__}" if endpoint else None
+        return f"{scope.get('method', '')} {rota}", handler
+
+    frame = sys._getframe(2)
+    while frame is not None:
+        modulo = frame.f_globals.get("__name__", "")
+        if (modulo == "app" or modulo.startswith("app.")) and not modulo.startswith("app.utils."):
+            return None, f"{modulo}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None, None
+
+
+def _parametros(parameters, executemany: bool) -> str:
+    if executemany:
+        parameters = list(parameters[:3]) + (["..."] if len(parameters) > 3 else [])
+    texto = repr(parameters)
+    return texto if len(texto) <= TAMANHO_MAXIMO_PARAMETROS else texto[:TAMANHO_MAXIMO_PARAMETROS] + "..."
+
+
+def capturar_plano(conn, statement: str, parameters) -> str:
+    """
+    Executa o EXPLAIN na mesma conexão (cursor DBAPI, fora dos eventos do SQLAlchemy).
+    No Postgres roda dentro de um SAVEPOINT para não abortar a transação em caso de erro.
+    """
+    dialeto = conn.dialect.name
+    cursor = conn.connection.cursor()
+    try:
+        if dialeto == "postgresql":
+            cursor.execute("SAVEPOINT explain_consulta_lenta")
+            try:
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                linhas = [linha[0] for linha in cursor.fetchall()]
+            finally:
+                cursor.execute("ROLLBACK TO SAVEPOINT explain_consulta_lenta")
+                cursor.execute("RELEASE SAVEPOINT explain_consulta_lenta")
+        elif dialeto == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            linhas = [str(linha[-1]) for linha in cursor.fetchall()]
+        else:
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            linhas = [" | ".join(str(coluna) for coluna in linha) for linha in cursor.fetchall()]
+    finally:
+        cursor.close()
+    return "\n".join(linhas)
+
+
+def registrar_consultas_lentas(engine):
+    """
+    Registra os eventos de execução que medem cada instrução e guardam as lentas.
+    """
+
+    # Início no contexto da execução, não na conexão: instruções que falham não deixam resíduo
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        context._inicio_consulta_lenta = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        duracao_ms = (time.perf_counter() - context._inicio_consulta_lenta) * 1000
+        if duracao_ms < settings.SLOW_QUERY_MS:
+            return
+
+        rota, handler = _origem()
+        registro = {
+            "data": datetime.utcnow().isoformat(timespec="milliseconds"),
+            "duracao_ms": round(duracao_ms, 3),
+            "engine": conn.engine.url.render_as_string(hide_password=True),
+            "rota": rota,
+            "handler": handler,
+            "sql": statement[:TAMANHO_MAXIMO_SQL],
+            "parametros": _parametros(parameters, executemany),
+            "plano": None,
+        }
+
+        # EXPLAIN ANALYZE executa a instrução: apenas SELECTs, nunca escritas
+        if (
+            settings.SLOW_QUERY_EXPLAIN
+            and not executemany
+            and statement.lstrip()[:6].upper() == "SELECT"
+            and consultas_lentas.deve_explicar(formato_sql(statement))
+        ):
+            try:
+                registro["plano"] = capturar_plano(conn, statement, parameters)
+            except Exception as erro:
+                registro["plano"] = f"EXPLAIN falhou: {erro}"
+
+        consultas_lentas.adicionar(registro)
+        logger.warning("Consulta lenta (%.1f ms) em %s: %s", duracao_ms, handler or rota, statement[:200])
+        configurar_arquivo()
+        logger_arquivo.info(json.dumps(registro, ensure_ascii=False, default=str))
@@ -0,0 +1,241 @@
+"""
+Contador de consultas SQL por requisição e detector de N+1.
+
+Os eventos before/after_cursor_execute de cada engine registram, no contexto da
+requisição atual (contextvar), quantas instruções foram executadas, o tempo total
+no banco e quantas vezes cada "formato" de SQL se repetiu. O middleware devolve
+os números nos cabeçalhos X-DB-Queries / X-DB-Time-ms e acumula métricas por rota.
+
+Modo estrito (SQL_STRICT_MODE=true, pensado para testes): a requisição falha quando
+a rota passa do orçamento de consultas ou repete o mesmo formato de SQL muitas vezes.
+Fora do modo estrito as violações apenas geram um aviso no log.
+
+    @router.get("/", dependencies=[Depends(orcamento_consultas(4))])
+
+    with contar_consultas(maximo=3, repeticoes=1) as estatisticas:
+        ...  # levanta OrcamentoConsultasExcedido ao sair se o limite for ultrapassado
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Listas de parâmetros (IN (?, ?, ?)) viram um único marcador para comparar formatos
+_LISTA_PARAMETROS = re.compile(
+    r"\(\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+))*\s*\)"
+)
+_NUMEROS = re.compile(r"\b\d+\b")
+_ESPACOS = re.compile(r"\s+")
+
+
+class OrcamentoConsultasExcedido(AssertionError):
+    """
+    Levantada (modo estrito) quando uma requisição ultrapassa o orçamento de consultas.
+    """
+
+
+def formato_sql(statement: str) -> str:
+    """
+    Normaliza a instrução para detectar repetições (mesma consulta, parâmetros diferentes).
+    """
+    sql = _ESPACOS.sub(" ", statement).strip()
+    sql = _LISTA_PARAMETROS.sub("(?)", sql)
+    return _NUMEROS.sub("N", sql)
+
+
+class EstatisticasConsultas:
+    """
+    Consultas executadas dentro de uma requisição (ou de um bloco contar_consultas).
+    """
+
+    def __init__(self, maximo: Optional[int] = None, repeticoes: Optional[int] = None):
+        self._lock = threading.Lock()
+        self.total = 0
+        self.tempo = 0.0
+        self.formatos = Counter()
+        self.maximo = maximo
+        self.repeticoes = repeticoes
+        # scope ASGI da requisição (rota/handler para o registro de consultas lentas)
+        self.scope = None
+
+    def registrar(self, statement: str, segundos: float):
+        formato = formato_sql(statement)
+        with self._lock:
+            self.total += 1
+            self.tempo += segundos
+            self.formatos[formato] += 1
+
+    @property
+    def tempo_ms(self) -> float:
+        return round(self.tempo * 1000, 3)
+
+    def violacoes(self) -> list:
+        """
+        Lista (texto) das regras ultrapassadas: orçamento total e formatos repetidos.
+        """
+        problemas = []
+        if self.maximo is not None and self.total > self.maximo:
+            problemas.append(f"{self.total} consultas (orçamento: {self.maximo})")
+        if self.repeticoes is not None:
+            for formato, quantidade in self.formatos.most_common():
+                if quantidade <= self.repeticoes:
+                    break
+                problemas.append(f"{quantidade}x (limite: {self.repeticoes}) {formato[:200]}")
+        return problemas
+
+
+_estatisticas_atuais: ContextVar[Optional[EstatisticasConsultas]] = ContextVar(
+    "estatisticas_consultas", default=None
+)
+
+
+def estatisticas_atuais() -> Optional[EstatisticasConsultas]:
+    return _estatisticas_atuais.get()
+
+
+def instrumentar_consultas(engine):
+    """
+    Registra os eventos de execução na engine (síncrona ou a sync_engine de uma AsyncEngine).
+    """
+
+    # Início guardado no contexto da execução (um por instrução): uma instrução que falha
+    # não deixa nada para trás na conexão devolvida ao pool
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        context._inicio_consulta = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        inicio = context._inicio_consulta
+        estatisticas = _estatisticas_atuais.get()
+        if estatisticas is not None:
+            estatisticas.registrar(statement, time.perf_counter() - inicio)
+
+
+@contextmanager
+def contar_consultas(maximo: Optional[int] = None, repeticoes: Optional[int] = None):
+    """
+    Conta as consultas executadas dentro do bloco; com limites, falha ao sair se excedidos.
+    """
+    estatisticas = EstatisticasConsultas(maximo, repeticoes)
+    token = _estatisticas_atuais.set(estatisticas)
+    try:
+        yield estatisticas
+    finally:
+        _estatisticas_atuais.reset(token)
+
+    problemas = estatisticas.violacoes()
+    if problemas:
+        raise OrcamentoConsultasExcedido("; ".join(problemas))
+
+
+def orcamento_consultas(maximo: int, repeticoes: Optional[int] = None):
+    """
+    Dependência que define o orçamento de consultas da rota (inclui as dependências,
+    como a autenticação). Sem o middleware ativo não tem efeito.
+    """
+
+    def _definir_orcamento():
+        estatisticas = _estatisticas_atuais.get()
+        if estatisticas is not None:
+            estatisticas.maximo = maximo
+            if repeticoes is not None:
+                estatisticas.repeticoes = repeticoes
+
+    return _definir_orcamento
+
+
+class MetricasRotas:
+    """
+    Consultas acumuladas por rota (thread-safe), expostas em /api/diagnostico/consultas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rotas = {}
+
+    def registrar(self, rota: str, estatisticas: EstatisticasConsultas, violou: bool):
+        with self._lock:
+            dados = self._rotas.setdefault(rota, {
+                "requisicoes": 0, "consultas": 0, "consultas_max": 0, "tempo_ms": 0.0, "violacoes": 0,
+            })
+            dados["requisicoes"] += 1
+            dados["consultas"] += estatisticas.total
+            dados["consultas_max"] = max(dados["consultas_max"], estatisticas.total)
+            dados["tempo_ms"] += estatisticas.tempo_ms
+            dados["violacoes"] += violou
+
+    def resumo(self) -> list:
+        with self._lock:
+            rotas = [
+                {
+                    "rota": rota,
+                    "requisicoes": dados["requisicoes"],
+                    "consultas_media": round(dados["consultas"] / dados["requisicoes"], 2),
+                    "consultas_max": dados["consultas_max"],
+                    "tempo_medio_ms": round(dados["tempo_ms"] / dados["requisicoes"], 3),
+                    "violacoes": dados["violacoes"],
+                }
+                for rota, dados in self._rotas.items()
+            ]
+        return sorted(rotas, key=lambda r: r["consultas_media"], reverse=True)
+
+
+metricas_rotas = MetricasRotas()
+
+
+class ContadorConsultasMiddleware:
+    """
+    Middleware ASGI: abre as estatísticas da requisição e adiciona os cabeçalhos
+    X-DB-Queries / X-DB-Time-ms. Consultas feitas depois do início da resposta
+    (streaming) entram nas métricas da rota, mas não nos cabeçalhos.
+    """
+
+    def __init__(self, app, estrito: Optional[bool] = None):
+        self.app = app
+        self.estrito = settings.SQL_STRICT_MODE if estrito is None else estrito
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estatisticas = EstatisticasConsultas(settings.SQL_QUERY_BUDGET, settings.SQL_MAX_REPEATED)
+        estatisticas.scope = scope
+        token = _estatisticas_atuais.set(estatisticas)
+        problemas = []
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                problemas.extend(estatisticas.violacoes())
+                if problemas and self.estrito:
+                    raise OrcamentoConsultasExcedido(f"{rota_requisicao(scope)}: " + "; ".join(problemas))
+                cabecalhos = list(mensagem.get("headers", []))
+                cabecalhos.append((b"x-db-queries", str(estatisticas.total).encode()))
+                cabecalhos.append((b"x-db-time-ms", str(estatisticas.tempo_ms).encode()))
+                mensagem = {**mensagem, "headers": cabecalhos}
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _estatisticas_atuais.reset(token)
+            if problemas:
+                logger.warning("Orçamento de consultas excedido em %s: %s", rota_requisicao(scope), "; ".join(problemas))
+            metricas_rotas.registrar(rota_requisicao(scope), estatisticas, bool(problemas))
+
+
+def rota_requisicao(scope) -> str:
+    rota = scope.get("route")
+    caminho = getattr(rota, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {caminho}"
@@ -0,0 +1,122 @@
+"""
+Paginação por cursor (keyset) para as listagens.
+
+Em vez de OFFSET (o banco lê e descarta todas as linhas puladas), a próxima página
+começa logo após a última linha da anterior: WHERE (chave, id) > (:chave, :id).
+O cursor é opaco para o cliente (base64 de um JSON com os valores da ordenação) e
+volta no cabeçalho X-Next-Cursor quando existe uma próxima página. Inserções
+durante a navegação não duplicam nem pulam linhas.
+
+    ordem = OrdemKeyset("movimentacoes", Movimentacao.data, Movimentacao.id, descendente=True)
+    query = ordem.aplicar(query, cursor)
+    ...
+    ordem.definir_proximo(response, itens, limit)
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, and_, tuple_
+
+CABECALHO_PROXIMO_CURSOR = "X-Next-Cursor"
+
+# Tipos aceitos no cursor quando a coluna não informa o seu (datetime é subclasse de date)
+TIPOS_CURSOR = (str, int, float, Decimal, date)
+
+
+def _serializar(valor):
+    if isinstance(valor, datetime):
+        return {"dt": valor.isoformat()}
+    if isinstance(valor, date):
+        return {"d": valor.isoformat()}
+    if isinstance(valor, Decimal):
+        return {"dec": str(valor)}
+    return valor
+
+
+def _desserializar(valor):
+    if isinstance(valor, dict):
+        if "dt" in valor:
+            return datetime.fromisoformat(valor["dt"])
+        if "d" in valor:
+            return date.fromisoformat(valor["d"])
+        if "dec" in valor:
+            return Decimal(valor["dec"])
+    return valor
+
+
+def codificar_cursor(nome: str, valores: Sequence) -> str:
+    conteudo = json.dumps({"o": nome, "v": [_serializar(valor) for valor in valores]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(conteudo.encode()).decode().rstrip("=")
+
+
+def _tipo_coluna(coluna):
+    try:
+        return coluna.type.python_type
+    except NotImplementedError:
+        return TIPOS_CURSOR
+
+
+def decodificar_cursor(nome: str, cursor: str, tipos: Sequence) -> list:
+    """
+    Valida e decodifica o cursor (um valor do tipo de cada coluna da ordenação); cursores
+    de outra listagem ou adulterados (nulos, listas, objetos, tipo trocado) geram 400.
+    """
+    try:
+        conteudo = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        valores = [_desserializar(valor) for valor in conteudo["v"]]
+        if conteudo["o"] != nome or len(valores) != len(tipos):
+            raise ValueError
+        for valor, tipo in zip(valores, tipos):
+            # bool é subclasse de int; None, listas e objetos não são de nenhum tipo aceito
+            if isinstance(valor, bool) or not isinstance(valor, tipo):
+                raise ValueError
+        return valores
+    except (ValueError, KeyError, TypeError, InvalidOperation, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor de paginação inválido")
+
+
+class OrdemKeyset:
+    """
+    Ordenação estável de uma listagem (colunas + id como desempate) e seu cursor.
+    """
+
+    def __init__(self, nome: str, *colunas, descendente: bool = False):
+        self.nome = nome
+        self.colunas = colunas
+        self.descendente = descendente
+
+    def aplicar(self, query: Select, cursor: Optional[str] = None) -> Select:
+        """
+        Adiciona o ORDER BY e, com cursor, o filtro que começa após a última linha vista.
+        """
+        if cursor:
+            valores = decodificar_cursor(self.nome, cursor, [_tipo_coluna(coluna) for coluna in self.colunas])
+            chave = tuple_(*self.colunas)
+            primeira = self.colunas[0]
+            if self.descendente:
+                # A condição redundante na primeira coluna permite usar índices de uma só coluna
+                filtro = and_(primeira <= valores[0], chave < tuple(valores))
+            else:
+                filtro = and_(primeira >= valores[0], chave > tuple(valores))
+            query = query.where(filtro)
+
+        return query.order_by(*(coluna.desc() if self.descendente else coluna.asc() for coluna in self.colunas))
+
+    def proximo_cursor(self, itens: Sequence, limite: int) -> Optional[str]:
+        if not itens or len(itens) < limite:
+            return None
+        ultimo = itens[-1]
+        return codificar_cursor(self.nome, [getattr(ultimo, coluna.key) for coluna in self.colunas])
+
+    def definir_proximo(self, response: Response, itens: Sequence, limite: int):
+        """
+        Publica o cursor da próxima página (ausente na última página).
+        """
+        cursor = self.proximo_cursor(itens, limite)
+        if cursor:
+            response.headers[CABECALHO_PROXIMO_CURSOR] = cursor
@@ -0,0 +1,112 @@
+"""
+Instrumentação do pool de conexões do SQLAlchemy.
+
+Coleta, por engine, quantas conexões estão em uso, o overflow atual e o
+tempo que as requisições esperaram por uma conexão livre. Os números são
+usados para dimensionar DB_POOL_SIZE/DB_MAX_OVERFLOW e a quantidade de workers.
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+
+class PoolMetrics:
+    """
+    Contadores acumulados de um pool de conexões (thread-safe).
+    """
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.conexoes_criadas = 0
+        self.invalidacoes = 0
+        self.timeouts = 0
+        self.esperas = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+
+    def registrar_espera(self, segundos: float):
+        with self._lock:
+            self.esperas += 1
+            self.espera_total += segundos
+            if segundos > self.espera_max:
+                self.espera_max = segundos
+
+    def registrar_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def _incrementar(self, campo: str):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + 1)
+
+    def resumo(self, pool) -> dict:
+        """
+        Retorna o estado atual do pool junto com os contadores acumulados.
+        """
+        # Pools sem fila (ex.: SQLite em memória) não expõem size/overflow
+        def _status(metodo):
+            funcao = getattr(pool, metodo, None)
+            return funcao() if funcao else None
+
+        # overflow() fica negativo enquanto o pool ainda não abriu pool_size conexões
+        overflow = _status("overflow")
+
+        with self._lock:
+            espera_media = self.espera_total / self.esperas if self.esperas else 0.0
+            return {
+                "engine": self.nome,
+                "pool": type(pool).__name__,
+                "tamanho": _status("size"),
+                "em_uso": _status("checkedout"),
+                "ociosas": _status("checkedin"),
+                "overflow": max(overflow, 0) if overflow is not None else None,
+                "checkouts": self.checkouts,
+                "conexoes_criadas": self.conexoes_criadas,
+                "invalidacoes": self.invalidacoes,
+                "timeouts": self.timeouts,
+                "espera_media_ms": round(espera_media * 1000, 3),
+                "espera_max_ms": round(self.espera_max * 1000, 3),
+            }
+
+
+def pool_instrumentado(pool_base, metricas: PoolMetrics):
+    """
+    Cria uma subclasse do pool que mede o tempo de espera por uma conexão.
+    Não existe evento "antes do checkout", por isso a medição fica no _do_get.
+    """
+
+    class PoolInstrumentado(pool_base):
+        def _do_get(self):
+            inicio = time.perf_counter()
+            try:
+                return super()._do_get()
+            except PoolTimeoutError:
+                metricas.registrar_timeout()
+                raise
+            finally:
+                metricas.registrar_espera(time.perf_counter() - inicio)
+
+    PoolInstrumentado.__name__ = pool_base.__name__
+    return PoolInstrumentado
+
+
+def instrumentar_pool(engine, metricas: PoolMetrics):
+    """
+    Registra os eventos de pool (connect/checkout/invalidate) na engine.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        metricas._incrementar("conexoes_criadas")
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        metricas._incrementar("checkouts")
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(dbapi_connection, connection_record, exception):
+        metricas._incrementar("invalidacoes")
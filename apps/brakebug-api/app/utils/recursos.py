@@ -0,0 +1,69 @@
+"""
+Registro de subsistemas pesados e opcionais (WeasyPrint, pandas).
+
+Esses módulos levam segundos para importar e ocupam dezenas de MB de memória,
+por isso são carregados apenas no primeiro uso. Opcionalmente podem ser
+pré-aquecidos em uma thread de fundo após o startup (PREWARM_FEATURES).
+"""
+import importlib
+import logging
+import threading
+import time
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# nome do recurso -> módulo importado sob demanda
+RECURSOS = {
+    "pdf": "weasyprint",
+    "excel": "pandas",
+}
+
+_carregados = {}
+_lock = threading.Lock()
+
+
+def registrar_recurso(nome: str, modulo: str):
+    """
+    Registra um novo subsistema opcional carregado sob demanda.
+    """
+    RECURSOS[nome] = modulo
+
+
+def carregar(nome: str):
+    """
+    Importa (uma única vez) e retorna o módulo do recurso.
+    """
+    modulo = _carregados.get(nome)
+    if modulo is not None:
+        return modulo
+
+    with _lock:
+        if nome not in _carregados:
+            inicio = time.perf_counter()
+            _carregados[nome] = importlib.import_module(RECURSOS[nome])
+            logger.info("Recurso '%s' carregado em %.0f ms", nome, (time.perf_counter() - inicio) * 1000)
+        return _carregados[nome]
+
+
+def carregado(nome: str) -> bool:
+    return nome in _carregados
+
+
+def preaquecer(nomes: Optional[Iterable[str]] = None) -> threading.Thread:
+    """
+    Carrega os recursos em uma thread de fundo para que o primeiro uso não pague o import.
+    Recursos não instalados são apenas registrados no log.
+    """
+    nomes = list(nomes) if nomes is not None else list(RECURSOS)
+
+    def _carregar_todos():
+        for nome in nomes:
+            try:
+                carregar(nome)
+            except Exception as e:
+                logger.warning("Não foi possível pré-carregar o recurso '%s': %s", nome, e)
+
+    thread = threading.Thread(target=_carregar_todos, name="preaquecer-recursos", daemon=True)
+    thread.start()
+    return thread
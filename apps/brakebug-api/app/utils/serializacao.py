@@ -0,0 +1,109 @@
+"""
+Serialização das listagens grandes direto para bytes JSON (orjson).
+
+O caminho padrão (objetos ORM -> response_model validado linha a linha -> JSON) custa
+caro em coleções grandes: cada linha vira uma instância ORM e passa pela validação
+de todos os campos (condecimal inclusive). Aqui o endpoint consulta apenas as colunas
+do schema (linhas do Core, sem ORM) e a lista inteira é serializada numa chamada:
+- `CodificadorLinhas` resolve uma vez, a partir do schema de resposta, as colunas do
+  select e os nomes das chaves (o JSON sai com os mesmos campos do response_model);
+- Decimal sai como string, igual ao Pydantic (orjson não serializa Decimal).
+
+Os dados vêm do banco já tipados pelas colunas: não há o que validar na saída. Onde a
+validação ainda é necessária (objetos montados em Python), use um TypeAdapter do
+Pydantic v2 (ver CacheCatalogo.serializar).
+
+Os parâmetros `fields=` (colunas do SELECT e chaves do JSON) e `expand=` (relações
+carregadas só quando pedidas) são interpretados aqui: nomes desconhecidos -> 400.
+"""
+import copy
+from decimal import Decimal
+from typing import Iterable, Optional, Sequence
+
+import orjson
+from fastapi import HTTPException, Response, status
+from sqlalchemy import null, select
+
+
+def _padrao(valor):
+    if isinstance(valor, Decimal):
+        return str(valor)
+    raise TypeError(f"Tipo não serializável em JSON: {type(valor).__name__}")
+
+
+def json_bytes(conteudo) -> bytes:
+    return orjson.dumps(conteudo, default=_padrao)
+
+
+def lista_parametro(valor: Optional[str]) -> tuple:
+    """
+    "a, b,a" -> ("a", "b"): itens de um parâmetro separado por vírgulas, sem repetição.
+    """
+    return tuple(dict.fromkeys(item.strip() for item in (valor or "").split(",") if item.strip()))
+
+
+def _rejeitar_desconhecidos(parametro: str, itens: Sequence[str], permitidos) -> None:
+    desconhecidos = [item for item in itens if item not in permitidos]
+    if desconhecidos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Valores inválidos em {parametro}: {', '.join(desconhecidos)}. "
+                   f"Permitidos: {', '.join(permitidos)}"
+        )
+
+
+def relacoes_solicitadas(expand: Optional[str], permitidas: Sequence[str]) -> set:
+    relacoes = lista_parametro(expand)
+    _rejeitar_desconhecidos("expand", relacoes, permitidas)
+    return set(relacoes)
+
+
+def resposta_json(conteudo, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    return Response(content=json_bytes(conteudo), status_code=status_code,
+                    media_type="application/json", headers=headers)
+
+
+class CodificadorLinhas:
+    """
+    Colunas de `modelo` correspondentes aos campos de `schema`, na ordem do schema.
+    Campos sem coluna na tabela saem como null (exceto os de `excluir`, preenchidos
+    pelo endpoint, como relacionamentos); `adicionais` são expressões calculadas
+    no SELECT (nome -> expressão).
+    """
+
+    def __init__(self, schema, modelo, excluir: Sequence[str] = (), adicionais: Optional[dict] = None):
+        tabela = modelo.__table__
+        self._por_nome = {
+            nome: getattr(modelo, nome) if nome in tabela.c else null().label(nome)
+            for nome in schema.model_fields if nome not in excluir
+        }
+        self._por_nome.update({nome: expressao.label(nome) for nome, expressao in (adicionais or {}).items()})
+        self.nomes = tuple(self._por_nome)
+        self.colunas = tuple(self._por_nome.values())
+
+    def parcial(self, fields: Optional[str], *obrigatorias) -> "CodificadorLinhas":
+        """
+        Codificador restrito aos campos de `fields` (sparse fieldset). As colunas
+        `obrigatorias` (chaves do cursor, ids usados no expand) entram no SELECT depois
+        dos campos pedidos e ficam fora do JSON.
+        """
+        campos = lista_parametro(fields)
+        if not campos:
+            return self
+        _rejeitar_desconhecidos("fields", campos, self.nomes)
+        parcial = copy.copy(self)
+        parcial.nomes = campos
+        parcial.colunas = tuple(self._por_nome[nome] for nome in campos) + tuple(
+            coluna for coluna in obrigatorias if coluna.key not in campos
+        )
+        return parcial
+
+    def select(self):
+        return select(*self.colunas)
+
+    def dicts(self, linhas: Iterable) -> list:
+        nomes = self.nomes
+        return [dict(zip(nomes, linha)) for linha in linhas]
+
+    def json(self, linhas: Iterable) -> bytes:
+        return json_bytes(self.dicts(linhas))
@@ -0,0 +1,156 @@
+"""
+Benchmark da compressão das respostas (app/utils/compressao.py) em cada codificação.
+
+Passa pelo CompressaoMiddleware, sem HTTP nem banco, as duas formas de corpo que a API
+envia:
+- catalogo: JSON inteiro (listagem de produtos), comprimido de uma vez;
+- exportacao: NDJSON em --blocos blocos (StreamingResponse), comprimido bloco a bloco.
+Para cada codificação (zstd, br, gzip) descomprime o que saiu, confere que é igual ao
+original e mede razão de compressão e tempo. Sai com código 1 se uma codificação
+faltar (pacotes brotli/zstandard de requirements.txt) ou não voltar ao original.
+
+    python scripts/benchmark_compressao.py --produtos 5000 --blocos 20
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import zlib
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path para importações
+sys.path.append(str(Path(__file__).parent.parent))
+
+import orjson
+from starlette.responses import Response, StreamingResponse
+
+from app.utils.compressao import CODIFICACOES, CompressaoMiddleware
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ESPERADAS = ("zstd", "br", "gzip")
+
+
+def gerar_catalogo(produtos: int) -> bytes:
+    return orjson.dumps([
+        {"id": i, "nome": f"Produto {i:05d}", "codigo_sku": f"SKU-{i:06d}", "descricao": "Produto do benchmark",
+         "categoria_id": i % 12, "unidade_medida": "un", "preco_custo": f"{10 + i % 90}.25",
+         "preco_venda": f"{20 + i % 90}.90", "quantidade": i % 50, "quantidade_minima": 5,
+         "quantidade_maxima": None, "imagem_url": None, "data_criacao": "2025-01-01T10:00:00"}
+        for i in range(produtos)
+    ])
+
+
+def gerar_exportacao(produtos: int, blocos: int) -> list:
+    linhas = [
+        orjson.dumps({"id": i, "data": f"2025-01-{1 + i % 28:02d} 10:00:00", "produto_id": i % 500,
+                      "codigo_sku": f"SKU-{i % 500:06d}", "tipo": "saida" if i % 3 else "entrada",
+                      "quantidade": 1 + i % 7, "usuario_id": 1, "observacoes": None}) + b"\n"
+        for i in range(produtos)
+    ]
+    tamanho = max(1, len(linhas) // blocos)
+    return [b"".join(linhas[i:i + tamanho]) for i in range(0, len(linhas), tamanho)]
+
+
+def descomprimir(corpo: bytes, codificacao: str) -> bytes:
+    if codificacao == "gzip":
+        return zlib.decompress(corpo, 31)
+    if codificacao == "br":
+        return brotli.decompress(corpo)
+    # O streaming não grava o tamanho no quadro: descompressão de fluxo
+    return zstandard.ZstdDecompressor().decompressobj().decompress(corpo)
+
+
+async def requisitar(app, codificacao: str):
+    """
+    Uma requisição GET ao app ASGI; devolve (cabeçalhos, corpo enviado, mensagens do corpo).
+    """
+    escopo = {"type": "http", "method": "GET", "path": "/benchmark", "raw_path": b"/benchmark",
+              "query_string": b"", "headers": [(b"accept-encoding", codificacao.encode())]}
+    mensagens = []
+    pedido = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receber():
+        if pedido:
+            return pedido.pop()
+        # A StreamingResponse fica ouvindo a desconexão enquanto envia
+        await asyncio.Event().wait()
+
+    async def enviar(mensagem):
+        mensagens.append(mensagem)
+
+    await app(escopo, receber, enviar)
+    cabecalhos = {nome.decode().lower(): valor.decode() for nome, valor in mensagens[0]["headers"]}
+    corpos = [m for m in mensagens[1:] if m["type"] == "http.response.body"]
+    return cabecalhos, b"".join(m.get("body", b"") for m in corpos), len(corpos)
+
+
+def app_catalogo(corpo: bytes):
+    async def app(escopo, receber, enviar):
+        await Response(corpo, media_type="application/json")(escopo, receber, enviar)
+    return CompressaoMiddleware(app)
+
+
+def app_exportacao(blocos: list):
+    async def gerar():
+        for bloco in blocos:
+            yield bloco
+
+    async def app(escopo, receber, enviar):
+        await StreamingResponse(gerar(), media_type="application/x-ndjson")(escopo, receber, enviar)
+    return CompressaoMiddleware(app)
+
+
+async def medir(nome: str, fabrica, original: bytes, repeticoes: int) -> bool:
+    ok = True
+    for codificacao in ESPERADAS:
+        if codificacao not in CODIFICACOES:
+            print(f"{nome:<11} {codificacao:<5} INDISPONÍVEL (instale requirements.txt)")
+            ok = False
+            continue
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            cabecalhos, enviado, mensagens = await requisitar(fabrica(), codificacao)
+            tempos.append(time.perf_counter() - inicio)
+        igual = (cabecalhos.get("content-encoding") == codificacao
+                 and descomprimir(enviado, codificacao) == original)
+        ok = ok and igual
+        mediana = statistics.median(tempos)
+        print(f"{nome:<11} {codificacao:<5} {len(original):>11,} {len(enviado):>11,} "
+              f"{len(original) / max(len(enviado), 1):>6.1f}x {mediana * 1000:>8.1f} "
+              f"{len(original) / mediana / 1e6:>7.0f} {mensagens:>5}  {'ok' if igual else 'DIFERENTE'}")
+    return ok
+
+
+async def executar(args) -> bool:
+    catalogo = gerar_catalogo(args.produtos)
+    blocos = gerar_exportacao(args.produtos * 4, args.blocos)
+    print(f"{'corpo':<11} {'cod.':<5} {'original':>11} {'enviado':>11} {'razão':>7} {'ms':>8} {'MB/s':>7} "
+          f"{'msgs':>5}  resultado")
+    ok = await medir("catalogo", lambda: app_catalogo(catalogo), catalogo, args.repeticoes)
+    ok = await medir("exportacao", lambda: app_exportacao(blocos), b"".join(blocos), args.repeticoes) and ok
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=5000)
+    parser.add_argument("--blocos", type=int, default=20, help="blocos da exportação em streaming")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+    if not asyncio.run(executar(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark do estoque em uma data passada (GET /api/produtos/estoque-em), sem HTTP.
+
+Gera --produtos SKUs e --movimentacoes movimentações espalhadas pelos últimos --dias
+dias, fotografa o estoque dia a dia (gerar_snapshots) e compara, para o fechamento
+do mês anterior e para um dia do mês corrente:
+- antes: somar o razão inteiro até a data (GROUP BY em movimentacoes);
+- depois: estoque_em (fotografia diária + saldo do intervalo).
+Confere que as quantidades são iguais e sai com código 1 se estoque_em passar de --limite-ms.
+
+    python scripts/benchmark_estoque_em.py --produtos 50000 --movimentacoes 2000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path para importações
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import bindparam, create_engine, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.database import Base
+from app import models  # noqa: F401 - registra todas as tabelas (e triggers) no metadata
+from app.models.categoria import Categoria
+from app.models.movimentacao import Movimentacao
+from app.models.produto import Produto
+from app.models.usuario import Usuario
+from app.services.estoque_snapshots import estoque_em, fim_do_dia, gerar_snapshots, saldo_movimentacoes
+
+LOTE = 50_000
+
+
+def popular(url: str, produtos: int, movimentacoes: int, inicio: datetime, dias: int):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    aleatorio = random.Random(42)
+    quantidades = [0] * produtos
+    with engine.begin() as conn:
+        conn.execute(Usuario.__table__.insert(), [{"nome": "Bench", "email": "bench@bench", "senha_hash": "-",
+                                                   "nivel_acesso": "admin", "ativo": True}])
+        conn.execute(Categoria.__table__.insert(), [{"nome": "Inventário"}])
+        conn.execute(Produto.__table__.insert(), [
+            {"nome": f"Produto {i}", "codigo_sku": f"INV-{i}", "categoria_id": 1, "unidade_medida": "un",
+             "preco_custo": 10, "preco_venda": 20, "quantidade": 0, "quantidade_minima": 0,
+             "data_criacao": inicio, "data_atualizacao": inicio}
+            for i in range(produtos)
+        ])
+        # Em ordem de data, para que nenhuma saída negative o estoque
+        segundos = sorted(random.Random(7).randrange(dias * 86400) for _ in range(movimentacoes))
+        for lote in range(0, movimentacoes, LOTE):
+            linhas = []
+            for segundo in segundos[lote:lote + LOTE]:
+                indice = aleatorio.randrange(produtos)
+                saida = quantidades[indice] > 0 and aleatorio.random() < 0.45
+                quantidade = aleatorio.randint(1, min(5, quantidades[indice])) if saida else aleatorio.randint(1, 10)
+                quantidades[indice] += -quantidade if saida else quantidade
+                linhas.append({"produto_id": indice + 1, "usuario_id": 1, "tipo": "saida" if saida else "entrada",
+                               "quantidade": quantidade, "observacoes": None,
+                               "data": inicio + timedelta(seconds=segundo)})
+            conn.execute(Movimentacao.__table__.insert(), linhas)
+        # Estoque atual coerente com o razão (a primeira fotografia parte dele)
+        tabela = Produto.__table__
+        conn.execute(
+            update(tabela).where(tabela.c.id == bindparam("pid")).values(quantidade=bindparam("qtd")),
+            [{"pid": indice + 1, "qtd": quantidade} for indice, quantidade in enumerate(quantidades)],
+        )
+    engine.dispose()
+
+
+async def razao_completo(db: AsyncSession, dia: date) -> dict:
+    saldos = saldo_movimentacoes(None, fim_do_dia(dia))
+    consulta = (
+        select(Produto.id, func.coalesce(saldos.c.saldo, 0))
+        .select_from(Produto.__table__.outerjoin(saldos, saldos.c.produto_id == Produto.id))
+        .order_by(Produto.id)
+    )
+    return dict((await db.execute(consulta)).all())
+
+
+async def com_snapshot(db: AsyncSession, dia: date) -> dict:
+    resultado = await estoque_em(db, dia)
+    return {linha["produto_id"]: linha["quantidade"] for linha in resultado["produtos"]}
+
+
+async def medir(engine, funcao, dia: date, repeticoes: int):
+    tempos = []
+    for _ in range(repeticoes):
+        async with AsyncSession(engine) as db:
+            inicio = time.perf_counter()
+            quantidades = await funcao(db, dia)
+            tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), quantidades
+
+
+async def executar(url_async: str, primeiro_dia: date, ultimo_dia: date, args) -> bool:
+    engine = create_async_engine(url_async)
+    ok = True
+    try:
+        inicio = time.perf_counter()
+        async with AsyncSession(engine) as db:
+            gerados = await gerar_snapshots(db, ultimo_dia, desde=primeiro_dia - timedelta(days=1))
+        print(f"fotografias: {len(gerados)} dias em {time.perf_counter() - inicio:.1f}s")
+
+        fechamento = ultimo_dia.replace(day=1) - timedelta(days=1)
+        for nome, dia in (("fechamento do mês", fechamento), ("dia corrente", ultimo_dia + timedelta(days=1))):
+            tempo_antes, antes = await medir(engine, razao_completo, dia, args.repeticoes)
+            tempo_depois, depois = await medir(engine, com_snapshot, dia, args.repeticoes)
+            print(f"{nome:<18} {dia} | razão completo {tempo_antes * 1000:8.1f} ms | "
+                  f"fotografia + delta {tempo_depois * 1000:7.1f} ms | {tempo_antes / tempo_depois:5.1f}x")
+            if antes != depois:
+                print(f"FALHA: quantidades diferentes em {dia}")
+                ok = False
+            if tempo_depois * 1000 > args.limite_ms:
+                print(f"FALHA: estoque_em acima de {args.limite_ms} ms")
+                ok = False
+    finally:
+        await engine.dispose()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=50_000)
+    parser.add_argument("--movimentacoes", type=int, default=1_000_000)
+    parser.add_argument("--dias", type=int, default=60)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--limite-ms", type=float, default=1000)
+    parser.add_argument("--database-url", help="banco descartável (padrão: SQLite temporário)")
+    args = parser.parse_args()
+
+    # Histórico terminando ontem; o dia corrente é medido com fotografia de ontem + delta de hoje
+    ultimo_dia = datetime.utcnow().date() - timedelta(days=1)
+    primeiro_dia = ultimo_dia - timedelta(days=args.dias - 1)
+
+    diretorio = tempfile.TemporaryDirectory()
+    url = args.database_url or f"sqlite:///{Path(diretorio.name) / 'estoque_em.db'}"
+    inicio = time.perf_counter()
+    popular(url, args.produtos, args.movimentacoes, datetime.combine(primeiro_dia, datetime.min.time()), args.dias)
+    print(f"carga: {args.produtos} produtos, {args.movimentacoes} movimentações em {time.perf_counter() - inicio:.1f}s")
+
+    url_async = url.replace("sqlite://", "sqlite+aiosqlite://").replace("postgresql://", "postgresql+asyncpg://")
+    ok = asyncio.run(executar(url_async, primeiro_dia, ultimo_dia, args))
+    diretorio.cleanup()
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
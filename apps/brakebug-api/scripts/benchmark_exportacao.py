@@ -0,0 +1,151 @@
+"""
+Benchmark da exportação de movimentações (GET /api/movimentacoes/export), sem HTTP.
+
+Gera um SQLite temporário com --movimentacoes movimentações e mede, para CSV e NDJSON,
+tempo e pico de memória Python (tracemalloc) de:
+- antes: carregar tudo pelo ORM (select(Movimentacao).all()) e montar o arquivo;
+- depois: exportar_movimentacoes (cursor do servidor, blocos de EXPORTACAO_LOTE linhas).
+Repete a exportação com um quarto das linhas: o pico do caminho em streaming deve ser o
+mesmo (constante), enquanto o do ORM cresce com o resultado. Sai com código 1 se o pico
+do streaming passar de --limite-mb ou se o número de linhas exportadas divergir.
+
+    python scripts/benchmark_exportacao.py --movimentacoes 500000
+"""
+import argparse
+import asyncio
+import csv
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Banco temporário definido antes de importar a aplicação (as sessões leem DATABASE_URL)
+_diretorio = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_diretorio.name) / 'exportacao.db'}"
+os.environ.pop("DATABASE_READ_URL", None)
+os.environ["SLOW_QUERY_MS"] = "3600000"  # a carga e as exportações não são consultas lentas a registrar
+
+# Adicionar o diretório raiz ao path para importações
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal, Base, async_engine, engine
+from app import models  # noqa: F401 - registra todas as tabelas (e triggers) no metadata
+from app.models.categoria import Categoria
+from app.models.movimentacao import Movimentacao
+from app.models.produto import Produto
+from app.services.estoque_snapshots import fim_do_dia
+from app.services.exportacao_movimentacoes import exportar_movimentacoes
+
+LOTE = 50_000
+
+
+def popular(movimentacoes: int, produtos: int = 1000):
+    Base.metadata.create_all(engine)
+    aleatorio = random.Random(42)
+    inicio = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(Categoria.__table__.insert(), [{"nome": "Exportação"}])
+        conn.execute(Produto.__table__.insert(), [
+            {"nome": f"Produto {i}", "codigo_sku": f"EXP-{i}", "categoria_id": 1, "unidade_medida": "un",
+             "preco_custo": 10, "preco_venda": 20, "quantidade": 0, "quantidade_minima": 0}
+            for i in range(produtos)
+        ])
+        for lote in range(0, movimentacoes, LOTE):
+            conn.execute(Movimentacao.__table__.insert(), [
+                {"produto_id": aleatorio.randrange(produtos) + 1, "usuario_id": None,
+                 "tipo": "entrada" if aleatorio.random() < 0.5 else "saida",
+                 "quantidade": aleatorio.randint(1, 10), "observacoes": "conferido no recebimento",
+                 "data": inicio + timedelta(minutes=n)}
+                for n in range(lote, min(lote + LOTE, movimentacoes))
+            ])
+
+
+async def pelo_orm(formato: str, data_fim) -> int:
+    async with AsyncSessionLocal() as db:
+        movimentacoes = (await db.execute(
+            select(Movimentacao).where(Movimentacao.data < fim_do_dia(data_fim.date())).order_by(Movimentacao.data, Movimentacao.id)
+        )).scalars().all()
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for movimentacao in movimentacoes:
+            escritor.writerow([movimentacao.id, movimentacao.data, movimentacao.produto_id, movimentacao.tipo,
+                               movimentacao.quantidade, movimentacao.usuario_id, movimentacao.observacoes])
+        return len(movimentacoes)
+
+
+async def em_streaming(formato: str, data_fim) -> int:
+    linhas = 0
+    async for bloco in exportar_movimentacoes(formato, data_fim=data_fim.date()):
+        linhas += bloco.count(b"\n")
+    return linhas - (1 if formato == "csv" else 0)
+
+
+async def medir(funcao, formato: str, data_fim):
+    """
+    Tempo numa execução sem rastreamento (tracemalloc deixa o Python bem mais lento) e pico
+    de memória numa segunda execução.
+    """
+    inicio = time.perf_counter()
+    linhas = await funcao(formato, data_fim)
+    duracao = time.perf_counter() - inicio
+    tracemalloc.start()
+    await funcao(formato, data_fim)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return linhas, duracao, pico / 1024 / 1024
+
+
+async def executar(args) -> bool:
+    ok = True
+    try:
+        async with AsyncSessionLocal() as db:
+            ultima = await db.scalar(select(func.max(Movimentacao.data)))
+            quarto = await db.scalar(select(Movimentacao.data).order_by(Movimentacao.data)
+                                     .offset(args.movimentacoes // 4 - 1).limit(1))
+            # Dias inteiros, como o filtro data_fim do endpoint
+            esperados = {dia: await db.scalar(select(func.count()).where(Movimentacao.data < fim_do_dia(dia.date())))
+                         for dia in (quarto, ultima)}
+        for nome, data_fim in (("1/4", quarto), ("tudo", ultima)):
+            esperado = esperados[data_fim]
+            linhas, duracao, pico = await medir(pelo_orm, "csv", data_fim)
+            print(f"{nome:<5} orm+csv  {linhas:>9} linhas {duracao:6.1f}s pico {pico:8.1f} MB")
+            for formato in ("csv", "ndjson"):
+                linhas, duracao, pico = await medir(em_streaming, formato, data_fim)
+                print(f"{nome:<5} {formato:<8} {linhas:>9} linhas {duracao:6.1f}s pico {pico:8.1f} MB "
+                      f"({linhas / duracao:,.0f} linhas/s)")
+                if linhas != esperado:
+                    print(f"FALHA: {linhas} linhas exportadas, esperadas {esperado}")
+                    ok = False
+                if pico > args.limite_mb:
+                    print(f"FALHA: pico de memória acima de {args.limite_mb} MB")
+                    ok = False
+    finally:
+        await async_engine.dispose()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movimentacoes", type=int, default=500_000)
+    parser.add_argument("--limite-mb", type=float, default=20)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    popular(args.movimentacoes)
+    print(f"carga: {args.movimentacoes} movimentações em {time.perf_counter() - inicio:.1f}s")
+    ok = asyncio.run(executar(args))
+    engine.dispose()
+    _diretorio.cleanup()
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark de tempo de import da API (python -X importtime).
+
+Importa os módulos em um processo novo, soma o tempo acumulado e falha (exit 1) quando:
+- algum subsistema pesado carregado sob demanda (weasyprint, pandas) aparece no import;
+- o tempo acumulado passa do limite informado.
+
+Uso:
+    python scripts/benchmark_import_time.py --limite-ms 1500 --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+MODULOS_PADRAO = ["app.main", "app.assurelog.routers.excel_import", "app.analyze_excel"]
+
+# Módulos que só podem ser importados sob demanda (app.utils.recursos)
+PROIBIDOS = ["weasyprint", "pandas"]
+
+
+def medir_imports(modulos: list) -> list:
+    """
+    Retorna [(modulo, self_us, cumulativo_us)] a partir da saída do -X importtime.
+    """
+    codigo = "; ".join(f"import {modulo}" for modulo in modulos)
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=BASE_DIR, capture_output=True, text=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if processo.returncode != 0:
+        print(processo.stderr[-2000:])
+        raise SystemExit("Falha ao importar os módulos")
+
+    resultado = []
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        self_us, cumulativo_us, nome = linha[len("import time:"):].split("|")
+        # o nome vem após um espaço separador; a indentação restante indica o nível
+        resultado.append((nome.rstrip()[1:], int(self_us), int(cumulativo_us)))
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modulos", nargs="*", default=MODULOS_PADRAO)
+    parser.add_argument("--limite-ms", type=float, default=None, help="tempo máximo de import (soma)")
+    parser.add_argument("--top", type=int, default=15, help="módulos mais lentos a exibir")
+    args = parser.parse_args()
+
+    imports = medir_imports(args.modulos)
+    # Entradas sem indentação são imports de nível superior; a soma delas é o tempo total
+    total_us = sum(cumulativo for nome, _, cumulativo in imports if not nome.startswith(" "))
+    print(f"Tempo total de import: {total_us / 1000:.1f} ms ({len(imports)} módulos)")
+
+    print(f"\nTop {args.top} por tempo acumulado:")
+    for nome, _, cumulativo in sorted(imports, key=lambda item: item[2], reverse=True)[:args.top]:
+        print(f"  {cumulativo / 1000:9.1f} ms  {nome.strip()}")
+
+    falhas = []
+    carregados = {nome.strip().split(".")[0] for nome, _, _ in imports}
+    for modulo in PROIBIDOS:
+        if modulo in carregados:
+            falhas.append(f"'{modulo}' importado no startup (deve ser carregado via app.utils.recursos)")
+    if args.limite_ms is not None and total_us / 1000 > args.limite_ms:
+        falhas.append(f"tempo de import {total_us / 1000:.1f} ms acima do limite de {args.limite_ms} ms")
+
+    if falhas:
+        print("\nREGRESSÃO:")
+        for falha in falhas:
+            print(f"  - {falha}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
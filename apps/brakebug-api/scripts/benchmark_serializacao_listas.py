@@ -0,0 +1,135 @@
+"""
+Benchmark da serialização das listagens grandes: listar_produtos e get_reports.
+
+Compara, no mesmo banco (SQLite temporário), o caminho anterior com o atual:
+- antes: objetos ORM validados pelo response_model (TypeAdapter from_attributes) em
+  listar_produtos; ORM + selectinload + jsonable_encoder em get_reports;
+- depois: linhas do Core serializadas direto em JSON (app/utils/serializacao.py).
+Mede consulta + serialização (sem HTTP) e confere que os produtos saem iguais.
+
+    python scripts/benchmark_serializacao_listas.py --linhas 10000
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import List
+
+# Adicionar o diretório raiz ao path para importações
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.database import Base
+from app import models  # noqa: F401 - registra todas as tabelas no metadata
+from app.assurelog.models.report import Report
+from app.assurelog.models.test_case import TestCase
+from app.assurelog.models.user import User
+from app.assurelog.routers.report_secure import get_reports
+from app.models.categoria import Categoria
+from app.models.produto import Produto
+from app.models.usuario import Usuario
+from app.routers.produtos import CODIFICADOR_PRODUTOS
+from app.schemas.produto import Produto as ProdutoSchema
+
+
+def popular(engine, linhas: int, casos: int):
+    agora = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(Categoria.__table__.insert(), [{"nome": "Benchmark"}])
+        conn.execute(Produto.__table__.insert(), [
+            {"nome": f"Produto {i:05d}", "codigo_sku": f"BENCH-{i}", "descricao": "Produto do benchmark",
+             "categoria_id": 1, "unidade_medida": "un", "preco_custo": Decimal(f"{10 + i % 90}.25"),
+             "preco_venda": Decimal(f"{20 + i % 90}.90"), "quantidade": i % 50, "quantidade_minima": 5,
+             "data_criacao": agora, "data_atualizacao": agora}
+            for i in range(linhas)
+        ])
+        conn.execute(User.__table__.insert(), [{"portal_user_id": "bench", "username": "bench", "role": "admin"}])
+        conn.execute(Report.__table__.insert(), [
+            {"title": f"Relatório {i}", "date": date.today(), "made_by": "qa", "test_environment": "Homologação",
+             "link": "", "feature_scenario": f"Feature {i % 20}", "user_id": 1, "created_at": agora, "updated_at": agora}
+            for i in range(linhas)
+        ])
+        conn.execute(TestCase.__table__.insert(), [
+            {"report_id": 1 + i // casos, "tc_number": f"TC-{i}", "title": f"Caso {i}", "scenario_description": "Cenário",
+             "expected_result": "OK", "actual_result": "OK", "status": "PASS", "evidence_files": ["evidencia.png"],
+             "created_at": agora, "updated_at": agora}
+            for i in range(linhas * casos)
+        ])
+
+
+def produtos_antes(db: Session, linhas: int) -> bytes:
+    produtos = db.scalars(select(Produto).order_by(Produto.nome, Produto.id).limit(linhas)).all()
+    adaptador = TypeAdapter(List[ProdutoSchema])
+    return adaptador.dump_json(adaptador.validate_python(produtos, from_attributes=True))
+
+
+def produtos_depois(db: Session, linhas: int) -> bytes:
+    query = CODIFICADOR_PRODUTOS.select().order_by(Produto.nome, Produto.id).limit(linhas)
+    return CODIFICADOR_PRODUTOS.json(db.execute(query))
+
+
+def reports_antes(db: Session, usuario: Usuario) -> bytes:
+    results = db.query(Report).options(selectinload(Report.test_cases)).order_by(Report.created_at.desc()).all()
+    return json.dumps(jsonable_encoder({"reports": results, "total": len(results)})).encode()
+
+
+def reports_depois(db: Session, usuario: Usuario) -> bytes:
+    return get_reports(
+        search=None, responsible=None, date_from=None, date_to=None, status_filter=None, feature=None,
+        environment=None, sort_by="created_at", sort_order="desc", fields=None, expand="test_cases",
+        current_user=usuario, db=db,
+    ).body
+
+
+def medir(funcao, engine, argumento, repeticoes: int):
+    tempos = []
+    for _ in range(repeticoes):
+        # Sessão nova a cada rodada: nada reaproveitado do identity map
+        with Session(engine) as db:
+            inicio = time.perf_counter()
+            corpo = funcao(db, argumento)
+            tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), corpo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=10_000)
+    parser.add_argument("--casos-por-relatorio", type=int, default=2)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    diretorio = tempfile.TemporaryDirectory()
+    engine = create_engine(f"sqlite:///{Path(diretorio.name) / 'serializacao.db'}")
+    Base.metadata.create_all(engine)
+    popular(engine, args.linhas, args.casos_por_relatorio)
+    admin = Usuario(id=1, nome="Admin", email="admin@bench", senha_hash="-", nivel_acesso="admin", ativo=True)
+
+    comparacoes = [
+        ("listar_produtos", produtos_antes, produtos_depois, args.linhas),
+        ("get_reports", reports_antes, reports_depois, admin),
+    ]
+    for nome, antes, depois, argumento in comparacoes:
+        tempo_antes, corpo_antes = medir(antes, engine, argumento, args.repeticoes)
+        tempo_depois, corpo_depois = medir(depois, engine, argumento, args.repeticoes)
+        print(f"{nome:<16} antes {tempo_antes * 1000:8.1f} ms | depois {tempo_depois * 1000:8.1f} ms | "
+              f"{tempo_antes / tempo_depois:4.1f}x | {len(corpo_depois) / 1024:,.0f} KiB")
+        if nome == "listar_produtos" and json.loads(corpo_antes) != json.loads(corpo_depois):
+            print("FALHA: o JSON dos produtos mudou")
+            sys.exit(1)
+
+    engine.dispose()
+    diretorio.cleanup()
+
+
+if __name__ == "__main__":
+    main()
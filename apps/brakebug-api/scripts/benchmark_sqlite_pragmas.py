@@ -0,0 +1,130 @@
+"""
+Benchmark do perfil SQLite (WAL, synchronous=NORMAL, mmap, cache) no workload de movimentações.
+
+Compara o SQLite padrão (rollback journal) com o perfil de app.database.pragmas_sqlite():
+escritores registram movimentações e atualizam o estoque do produto (como criar_movimentacao)
+enquanto leitores executam a listagem de movimentações ordenada por data.
+
+Uso:
+    python scripts/benchmark_sqlite_pragmas.py --duracao 10 --escritores 2 --leitores 8
+"""
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path para importações
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, desc, select, update
+from sqlalchemy.exc import OperationalError
+
+from app.database import Base, configurar_sqlite, pragmas_sqlite
+from app import models  # noqa: F401 - registra todas as tabelas no metadata
+from app.models.categoria import Categoria
+from app.models.movimentacao import Movimentacao
+from app.models.produto import Produto
+from app.models.usuario import Usuario
+
+TOTAL_PRODUTOS = 500
+HISTORICO_INICIAL = 20000
+
+
+def preparar_banco(caminho: str, pragmas: dict):
+    engine = create_engine(f"sqlite:///{caminho}", connect_args={"check_same_thread": False, "timeout": 30})
+    if pragmas:
+        configurar_sqlite(engine, pragmas)
+    Base.metadata.create_all(engine)
+
+    with engine.begin() as conn:
+        conn.execute(Categoria.__table__.insert(), [{"nome": "Benchmark"}])
+        conn.execute(Usuario.__table__.insert(), [{
+            "nome": "bench", "email": "bench@brakebuglabs.com", "senha_hash": "x", "nivel_acesso": "admin"
+        }])
+        conn.execute(Produto.__table__.insert(), [{
+            "nome": f"Produto {i}", "codigo_sku": f"BENCH-{i}", "categoria_id": 1, "unidade_medida": "un",
+            "preco_custo": 1, "preco_venda": 2, "quantidade": 1000, "quantidade_minima": 10,
+        } for i in range(TOTAL_PRODUTOS)])
+        conn.execute(Movimentacao.__table__.insert(), [{
+            "produto_id": random.randint(1, TOTAL_PRODUTOS), "usuario_id": 1, "tipo": "entrada",
+            "quantidade": 1, "data": datetime.utcnow(),
+        } for _ in range(HISTORICO_INICIAL)])
+    return engine
+
+
+def escritor(engine, parar: threading.Event, contadores: dict):
+    while not parar.is_set():
+        produto_id = random.randint(1, TOTAL_PRODUTOS)
+        try:
+            with engine.begin() as conn:
+                conn.execute(Movimentacao.__table__.insert().values(
+                    produto_id=produto_id, usuario_id=1, tipo="saida", quantidade=1, data=datetime.utcnow()
+                ))
+                conn.execute(
+                    update(Produto).where(Produto.id == produto_id).values(quantidade=Produto.quantidade - 1)
+                )
+            contadores["escritas"] += 1
+        except OperationalError:
+            contadores["erros"] += 1
+
+
+def leitor(engine, parar: threading.Event, contadores: dict):
+    consulta = select(Movimentacao).order_by(desc(Movimentacao.data)).limit(100)
+    while not parar.is_set():
+        try:
+            with engine.connect() as conn:
+                conn.execute(consulta).all()
+            contadores["leituras"] += 1
+        except OperationalError:
+            contadores["erros"] += 1
+
+
+def executar(nome: str, pragmas: dict, args) -> dict:
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = preparar_banco(str(Path(diretorio) / "bench.db"), pragmas)
+        parar = threading.Event()
+        contadores = {"escritas": 0, "leituras": 0, "erros": 0}
+        threads = [threading.Thread(target=escritor, args=(engine, parar, contadores)) for _ in range(args.escritores)]
+        threads += [threading.Thread(target=leitor, args=(engine, parar, contadores)) for _ in range(args.leitores)]
+
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duracao)
+        parar.set()
+        for thread in threads:
+            thread.join()
+        duracao = time.perf_counter() - inicio
+        engine.dispose()
+
+    resultado = {
+        "perfil": nome,
+        "escritas/s": round(contadores["escritas"] / duracao, 1),
+        "leituras/s": round(contadores["leituras"] / duracao, 1),
+        "erros": contadores["erros"],
+    }
+    print(resultado)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duracao", type=float, default=10.0, help="segundos por perfil")
+    parser.add_argument("--escritores", type=int, default=2)
+    parser.add_argument("--leitores", type=int, default=8)
+    args = parser.parse_args()
+
+    padrao = executar("padrao (rollback journal)", {}, args)
+    perfil = executar("perfil WAL", pragmas_sqlite(), args)
+
+    for metrica in ("escritas/s", "leituras/s"):
+        base = padrao[metrica] or 1
+        print(f"{metrica}: {padrao[metrica]} -> {perfil[metrica]} ({perfil[metrica] / base:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
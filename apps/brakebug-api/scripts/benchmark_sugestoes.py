@@ -0,0 +1,87 @@
+"""
+Benchmark do índice de autocomplete (/api/produtos/suggest), sem banco de dados.
+
+Monta o índice em memória com um catálogo sintético e simula a digitação (uma
+consulta por tecla, incluindo erros de digitação). Sai com código 1 se o p99
+passar de --limite-ms.
+
+Uso:
+    python scripts/benchmark_sugestoes.py --produtos 200000 --limite-ms 5
+"""
+import argparse
+import random
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path para importações
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.sugestoes_produtos import IndiceSugestoes
+
+TIPOS = ["Ração", "Petisco", "Coleira", "Brinquedo", "Areia", "Shampoo", "Comedouro", "Caminha", "Arranhador", "Guia"]
+ALVOS = ["cães", "gatos", "filhotes", "pássaros", "peixes", "roedores", "adultos", "idosos"]
+DETALHES = ["premium", "natural", "sabor frango", "sabor carne", "hipoalergênico", "médio porte",
+            "pequeno porte", "grande porte", "antipulgas", "lavanda", "couro", "nylon", "pelúcia"]
+MARCAS = ["Brakebug", "PetMax", "Focinho Feliz", "VidaPet", "Patinhas"]
+
+DIGITACOES = [
+    "ração gatos filhotes",
+    "coleira couro",
+    "arranhador",
+    "PET-123456",
+    "shampoo lavanda",
+    "raçao premiun",  # erro de digitação
+    "brinqedo",       # erro de digitação
+]
+
+
+def gerar_produtos(total: int):
+    aleatorio = random.Random(42)
+    for i in range(1, total + 1):
+        nome = f"{aleatorio.choice(TIPOS)} {aleatorio.choice(MARCAS)} {aleatorio.choice(ALVOS)} {aleatorio.choice(DETALHES)}"
+        yield i, nome, f"PET-{i}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=200_000)
+    parser.add_argument("--rodadas", type=int, default=20, help="repetições de cada sequência de digitação")
+    parser.add_argument("--limite-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    memoria_antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    indice = IndiceSugestoes()
+    inicio = time.perf_counter()
+    indice.construir(gerar_produtos(args.produtos))
+    print(f"Índice: {len(indice)} produtos em {time.perf_counter() - inicio:.1f}s, "
+          f"~{(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memoria_antes) / 1024:.0f} MB")
+
+    tempos = []
+    for _ in range(args.rodadas):
+        for texto in DIGITACOES:
+            for tamanho in range(1, len(texto) + 1):
+                inicio = time.perf_counter()
+                indice.sugerir(texto[:tamanho], 10)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+
+    inicio = time.perf_counter()
+    for produto_id in range(1, 101):
+        indice.atualizar(produto_id, f"Produto atualizado {produto_id}", f"UPD-{produto_id}")
+    atualizacao_ms = (time.perf_counter() - inicio) * 1000 / 100
+
+    tempos.sort()
+    p99 = tempos[int(len(tempos) * 0.99) - 1]
+    print(f"{len(tempos)} consultas: p50 {statistics.median(tempos):.3f} ms | p99 {p99:.3f} ms | max {tempos[-1]:.3f} ms")
+    print(f"Atualização incremental: {atualizacao_ms:.2f} ms por produto")
+    print("Exemplo:", [p["nome"] for p in indice.sugerir("raçao premiun", 3)])
+
+    if p99 > args.limite_ms:
+        print(f"FALHA: p99 acima de {args.limite_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
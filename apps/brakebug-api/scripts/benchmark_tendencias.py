@@ -0,0 +1,164 @@
+"""
+Benchmark das tendências de movimentações (GET /api/movimentacoes/tendencias), sem HTTP.
+
+Gera --produtos SKUs e --movimentacoes movimentações nos últimos --dias dias (gravadas
+com os triggers ativos, que mantêm o rollup) e compara, por dia, semana e mês:
+- antes: agregar movimentacoes do período (GROUP BY data, tipo);
+- depois: tendencias (soma dos totais diários do rollup).
+Em seguida reconstrói o rollup em lotes (reconstruir_rollup) e confere que os totais
+são os mesmos mantidos pelos triggers. Sai com código 1 se algum resultado divergir.
+
+    python scripts/benchmark_tendencias.py --produtos 20000 --movimentacoes 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path para importações
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.database import Base
+from app import models  # noqa: F401 - registra todas as tabelas (e triggers) no metadata
+from app.models.categoria import Categoria
+from app.models.movimentacao import Movimentacao
+from app.models.movimentacao_rollup import MovimentacaoRollup, dia_movimentacao
+from app.models.produto import Produto
+from app.services.rollup_movimentacoes import inicio_periodo, reconstruir_rollup, tendencias
+
+LOTE = 50_000
+
+
+def popular(url: str, produtos: int, movimentacoes: int, inicio: datetime, dias: int):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    aleatorio = random.Random(42)
+    # Poucos SKUs concentram a maior parte do giro (distribuição de Zipf)
+    pesos = [1 / posicao for posicao in range(1, produtos + 1)]
+    with engine.begin() as conn:
+        conn.execute(Categoria.__table__.insert(), [{"nome": "Tendências"}])
+        conn.execute(Produto.__table__.insert(), [
+            {"nome": f"Produto {i}", "codigo_sku": f"TEND-{i}", "categoria_id": 1, "unidade_medida": "un",
+             "preco_custo": 10, "preco_venda": 20, "quantidade": 0, "quantidade_minima": 0}
+            for i in range(produtos)
+        ])
+        for lote in range(0, movimentacoes, LOTE):
+            ids = aleatorio.choices(range(1, produtos + 1), weights=pesos, k=min(LOTE, movimentacoes - lote))
+            conn.execute(Movimentacao.__table__.insert(), [
+                {"produto_id": produto_id, "usuario_id": None,
+                 "tipo": "entrada" if aleatorio.random() < 0.55 else "saida",
+                 "quantidade": aleatorio.randint(1, 10), "observacoes": None,
+                 "data": inicio + timedelta(seconds=aleatorio.randrange(dias * 86400))}
+                for produto_id in ids
+            ])
+    engine.dispose()
+
+
+async def agregando_movimentacoes(db: AsyncSession, granularidade: str, data_inicio, data_fim, produto_id) -> dict:
+    dia = dia_movimentacao(db.get_bind().dialect.name)
+    consulta = (
+        select(dia, Movimentacao.tipo, func.sum(Movimentacao.quantidade), func.count())
+        .where(Movimentacao.data >= datetime.combine(data_inicio, datetime.min.time()),
+               Movimentacao.data < datetime.combine(data_fim + timedelta(days=1), datetime.min.time()))
+        .group_by(dia, Movimentacao.tipo)
+    )
+    if produto_id is not None:
+        consulta = consulta.where(Movimentacao.produto_id == produto_id)
+    totais = defaultdict(lambda: [0, 0, 0])
+    for valor, tipo, quantidade, contagem in await db.execute(consulta):
+        valor = valor if not isinstance(valor, str) else datetime.strptime(valor, "%Y-%m-%d").date()
+        total = totais[inicio_periodo(valor, granularidade)]
+        total[0 if tipo == "entrada" else 1] += quantidade
+        total[2] += contagem
+    return {periodo: tuple(total) for periodo, total in totais.items()}
+
+
+async def com_rollup(db: AsyncSession, granularidade: str, data_inicio, data_fim, produto_id) -> dict:
+    resultado = await tendencias(db, granularidade, data_inicio, data_fim, produto_id)
+    return {linha["periodo"]: (linha["entradas"], linha["saidas"], linha["movimentacoes"])
+            for linha in resultado["periodos"] if linha["movimentacoes"]}
+
+
+async def medir(engine, funcao, repeticoes: int, *args):
+    tempos = []
+    for _ in range(repeticoes):
+        async with AsyncSession(engine) as db:
+            inicio = time.perf_counter()
+            resultado = await funcao(db, *args)
+            tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), resultado
+
+
+async def totais_rollup(engine) -> list:
+    async with AsyncSession(engine) as db:
+        return (await db.execute(select(MovimentacaoRollup.__table__).order_by(
+            MovimentacaoRollup.produto_id, MovimentacaoRollup.dia, MovimentacaoRollup.tipo))).all()
+
+
+async def executar(url_async: str, data_inicio, data_fim, args) -> bool:
+    engine = create_async_engine(url_async)
+    ok = True
+    try:
+        # Todos os produtos (gráfico do dashboard) e o SKU de maior giro (tela do produto)
+        for nome, produto_id in (("todos", None), ("produto 1", 1)):
+            for granularidade in ("dia", "semana", "mes"):
+                parametros = (granularidade, data_inicio, data_fim, produto_id)
+                tempo_antes, antes = await medir(engine, agregando_movimentacoes, args.repeticoes, *parametros)
+                tempo_depois, depois = await medir(engine, com_rollup, args.repeticoes, *parametros)
+                print(f"{nome:<9} {granularidade:<7} | movimentacoes {tempo_antes * 1000:8.1f} ms | "
+                      f"rollup {tempo_depois * 1000:7.1f} ms | {tempo_antes / tempo_depois:6.1f}x")
+                if antes != depois:
+                    print(f"FALHA: totais diferentes ({nome}, {granularidade})")
+                    ok = False
+
+        mantidos = await totais_rollup(engine)
+        inicio = time.perf_counter()
+        async with AsyncSession(engine) as db:
+            lotes = await reconstruir_rollup(db, dias_por_lote=args.dias_por_lote)
+        print(f"reconstrução: {len(lotes)} lotes de {args.dias_por_lote} dias em {time.perf_counter() - inicio:.1f}s")
+        if await totais_rollup(engine) != mantidos:
+            print("FALHA: rollup reconstruído difere do mantido pelos triggers")
+            ok = False
+    finally:
+        await engine.dispose()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=20_000)
+    parser.add_argument("--movimentacoes", type=int, default=1_000_000)
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--dias-por-lote", type=int, default=31)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--database-url", help="banco descartável (padrão: SQLite temporário)")
+    args = parser.parse_args()
+
+    data_fim = datetime.utcnow().date()
+    data_inicio = data_fim - timedelta(days=args.dias - 1)
+
+    diretorio = tempfile.TemporaryDirectory()
+    url = args.database_url or f"sqlite:///{Path(diretorio.name) / 'tendencias.db'}"
+    inicio = time.perf_counter()
+    popular(url, args.produtos, args.movimentacoes, datetime.combine(data_inicio, datetime.min.time()), args.dias)
+    print(f"carga (com triggers): {args.produtos} produtos, {args.movimentacoes} movimentações "
+          f"em {time.perf_counter() - inicio:.1f}s")
+
+    url_async = url.replace("sqlite://", "sqlite+aiosqlite://").replace("postgresql://", "postgresql+asyncpg://")
+    ok = asyncio.run(executar(url_async, data_inicio, data_fim, args))
+    diretorio.cleanup()
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Gera as fotografias diárias do estoque pendentes (as mesmas da tarefa do lifespan).
+
+Para rodar por cron com ESTOQUE_SNAPSHOTS_ENABLED=false nos workers, ou para gerar a
+primeira fotografia logo após o deploy. Sem fotografias no banco, --desde preenche o
+histórico dia a dia a partir dessa data. Usa a DATABASE_URL da aplicação:
+    python scripts/gerar_snapshots_estoque.py              # até ontem (UTC)
+    python scripts/gerar_snapshots_estoque.py --desde 2026-01-01 --ate 2026-09-30
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path para importações
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.database import async_engine
+from app.services.estoque_snapshots import agendador_snapshots
+
+
+async def gerar(ate, desde):
+    try:
+        return await agendador_snapshots.executar(ate, desde)
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ate", type=date.fromisoformat, help="último dia a fotografar (padrão: ontem)")
+    parser.add_argument("--desde", type=date.fromisoformat, help="primeiro dia, quando ainda não há fotografias")
+    args = parser.parse_args()
+
+    gerados = asyncio.run(gerar(args.ate, args.desde))
+    if gerados:
+        print(f"✅ {len(gerados)} dia(s) fotografado(s): {gerados[0]} a {gerados[-1]}")
+    else:
+        print("Nenhum dia pendente")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Reconstrói os totais diários de movimentações (movimentacoes_rollup) a partir do histórico.
+
+Os triggers mantêm o rollup a cada escrita; este comando serve para a carga inicial de
+bases grandes (a migração faz o mesmo cálculo numa única transação) ou para reparar os
+totais depois de correções feitas direto no banco. Processa --dias-por-lote dias por
+transação, para não segurar locks longos. Usa a DATABASE_URL da aplicação:
+    python scripts/reconstruir_rollup_movimentacoes.py                  # todo o histórico
+    python scripts/reconstruir_rollup_movimentacoes.py --desde 2026-09-01 --ate 2026-09-30
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path para importações
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.database import AsyncSessionLocal, async_engine
+from app.services.rollup_movimentacoes import reconstruir_rollup
+
+
+async def reconstruir(desde, ate, dias_por_lote):
+    try:
+        async with AsyncSessionLocal() as db:
+            return await reconstruir_rollup(db, desde, ate, dias_por_lote)
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--desde", type=date.fromisoformat, help="primeiro dia (padrão: primeira movimentação)")
+    parser.add_argument("--ate", type=date.fromisoformat, help="último dia (padrão: última movimentação)")
+    parser.add_argument("--dias-por-lote", type=int, default=31)
+    args = parser.parse_args()
+    if args.dias_por_lote < 1:
+        parser.error("--dias-por-lote deve ser maior que zero")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    inicio = time.perf_counter()
+    lotes = asyncio.run(reconstruir(args.desde, args.ate, args.dias_por_lote))
+    if lotes:
+        print(f"✅ {len(lotes)} lote(s) reconstruído(s): {lotes[0][0]} a {lotes[-1][1]} "
+              f"em {time.perf_counter() - inicio:.1f}s")
+    else:
+        print("Nenhuma movimentação a consolidar")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Compara os contadores de estoque_resumo (mantidos por triggers) com a agregação
+direta de produtos e, com --corrigir, recalcula o resumo.
+
+Usa o banco configurado em DATABASE_URL:
+    python scripts/verificar_resumo_estoque.py
+    python scripts/verificar_resumo_estoque.py --corrigir
+
+Sai com código 1 se encontrar divergências (e --corrigir não foi informado).
+"""
+import argparse
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path para importações
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+
+from app.database import engine
+from app.models.estoque_resumo import EstoqueResumo, agregado_produtos, recalcular_resumo
+
+COLUNAS = ("total_produtos", "estoque_baixo", "quantidade_total", "valor_custo", "valor_venda")
+
+
+def _normalizar(linha) -> tuple:
+    # SQLite soma valores decimais em ponto flutuante: compara em centavos
+    return tuple(Decimal(str(getattr(linha, coluna) or 0)).quantize(Decimal("0.01")) for coluna in COLUNAS)
+
+
+def divergencias(conn) -> list:
+    resumo = {linha.categoria_id: _normalizar(linha) for linha in conn.execute(select(EstoqueResumo.__table__))}
+    esperado = {linha.categoria_id: _normalizar(linha) for linha in conn.execute(agregado_produtos())}
+    vazio = (Decimal("0.00"),) * len(COLUNAS)
+    return [
+        (categoria_id, resumo.get(categoria_id, vazio), esperado.get(categoria_id, vazio))
+        for categoria_id in sorted(resumo.keys() | esperado.keys())
+        if resumo.get(categoria_id, vazio) != esperado.get(categoria_id, vazio)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corrigir", action="store_true", help="recalcula o resumo a partir de produtos")
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        encontradas = divergencias(conn)
+        for categoria_id, atual, esperado in encontradas:
+            print(f"categoria {categoria_id}: resumo {dict(zip(COLUNAS, atual))} | produtos {dict(zip(COLUNAS, esperado))}")
+        if not encontradas:
+            print("Resumo do estoque consistente com produtos")
+        elif args.corrigir:
+            recalcular_resumo(conn)
+            print(f"{len(encontradas)} categorias divergentes; resumo recalculado")
+    engine.dispose()
+
+    if encontradas and not args.corrigir:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()